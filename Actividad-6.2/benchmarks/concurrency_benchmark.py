@@ -0,0 +1,97 @@
+"""
+Prueba de estrés con varios procesos (o hilos) creando y cancelando
+reservas al mismo tiempo sobre los mismos archivos. Al final verifica que
+no se perdió ninguna escritura.
+
+Uso (desde Actividad-6.2):
+    python -m benchmarks.concurrency_benchmark [operaciones] [--threads]
+        [--durable]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Process
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+
+WORKERS = (1, 2, 4, 8)
+
+
+def worker(directory, worker_id, operations, durable):
+    """
+    Crea reservas y cancela una de cada cuatro.
+
+    :param directory: Directorio de trabajo con los archivos de datos.
+    :param worker_id: Identificador del trabajador.
+    :param operations: Número de reservas a crear.
+    :param durable: Si las escrituras esperan a estar en disco.
+    """
+    os.chdir(directory)
+    datasets.configure(durable=durable)
+    hotel = f"Hotel {worker_id}"
+    for room in range(operations):
+        Reservation.create_reservation(f"Cliente {worker_id}", hotel, room,
+                                       "2024-01-01", "2024-01-02")
+        if room % 4 == 3:
+            Reservation.cancel_reservation(f"Cliente {worker_id}", hotel,
+                                           room, "2024-01-01")
+
+
+def run(workers, operations, use_threads, durable):
+    """
+    Ejecuta una ronda con varios trabajadores.
+
+    :param workers: Número de trabajadores.
+    :param operations: Reservas por trabajador.
+    :param use_threads: Si se usan hilos en lugar de procesos.
+    :param durable: Si las escrituras esperan a estar en disco.
+    :return: Tupla (segundos, reservas esperadas, reservas guardadas).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        kind = threading.Thread if use_threads else Process
+        cwd = os.getcwd()
+        os.chdir(directory)
+        tasks = [kind(target=worker,
+                      args=(directory, index, operations, durable))
+                 for index in range(workers)]
+        start = time.perf_counter()
+        for task in tasks:
+            task.start()
+        for task in tasks:
+            task.join()
+        elapsed = time.perf_counter() - start
+        stored = len(Reservation.load_reservations_data())
+        os.chdir(cwd)
+    expected = workers * (operations - operations // 4)
+    return elapsed, expected, stored
+
+
+def main(operations, use_threads, durable):
+    """
+    Ejecuta las rondas y muestra el rendimiento.
+
+    :param operations: Reservas por trabajador.
+    :param use_threads: Si se usan hilos en lugar de procesos.
+    :param durable: Si las escrituras esperan a estar en disco.
+    """
+    lost = False
+    for workers in WORKERS:
+        elapsed, expected, stored = run(workers, operations, use_threads,
+                                        durable)
+        total = workers * (operations + operations // 4)
+        print(f"trabajadores={workers} operaciones={total} "
+              f"tiempo={elapsed:.2f}s ops/s={total / elapsed:.0f} "
+              f"esperadas={expected} guardadas={stored}")
+        lost = lost or stored != expected
+    if lost:
+        print("ERROR: se perdieron escrituras")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:]
+                 if not argument.startswith("--")]
+    main(int(arguments[0]) if arguments else 500,
+         "--threads" in sys.argv, "--durable" in sys.argv)
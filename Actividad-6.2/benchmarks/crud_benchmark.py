@@ -0,0 +1,432 @@
+"""
+Pruebas de rendimiento de las operaciones de clientes, hoteles y reservas
+sobre conjuntos de datos sintéticos de distintos tamaños.
+
+Cada tamaño se ejecuta en un proceso aparte, en un directorio temporal con
+'customers.json', 'hotels.json' y 'reservations.json' (o una base SQLite)
+de N registros cada uno. Para cada operación se informan los percentiles de
+latencia, el rendimiento y la memoria máxima asignada durante la operación;
+por tamaño se informan el tiempo de la primera carga y la memoria residente
+máxima del proceso. Los resultados se guardan en JSON y pueden compararse
+con los de una ejecución anterior, incluso de otro respaldo: la comparación
+exige que ambas terminen con los mismos datos.
+
+Uso (desde Actividad-6.2):
+    python -m benchmarks.crud_benchmark [--sizes 10000 100000 1000000]
+        [--samples 200] [--backend json|sqlite] [--output resultados.json]
+        [--compare anterior.json] [--threshold 0.2]
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from itertools import islice
+from multiprocessing import get_context
+from benchmarks.generators import (generate_customers, generate_hotels,
+                                   generate_reservations)
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.bulk import export_json
+from src.storage.sqlite_store import close_connections
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - plataformas sin resource
+    resource = None
+
+SIZES = (10_000, 100_000, 1_000_000)
+SAMPLES = 200
+MEMORY_SAMPLES = 20
+THRESHOLD = 0.2
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, percent):
+    """
+    Obtiene un percentil por el método del rango más cercano.
+
+    :param values: Lista ordenada de valores.
+    :param percent: Percentil entre 0 y 100.
+    :return: Valor del percentil.
+    """
+    rank = max(1, math.ceil(percent / 100 * len(values)))
+    return values[rank - 1]
+
+
+def prepare(directory, size, backend):
+    """
+    Crea los tres conjuntos de datos en un directorio de trabajo.
+
+    :param directory: Directorio temporal.
+    :param size: Número de registros de cada conjunto.
+    :param backend: 'json' o 'sqlite'.
+    """
+    os.chdir(directory)
+    datasets.configure(backend=backend,
+                       sqlite_path=os.path.join(directory, "bench.db"))
+    sources = ((datasets.CUSTOMERS_FILE, datasets.customers_store,
+                generate_customers(size)),
+               (datasets.HOTELS_FILE, datasets.hotels_store,
+                generate_hotels(size)),
+               (datasets.RESERVATIONS_FILE, datasets.reservations_store,
+                generate_reservations(size)))
+    for file_name, store, records in sources:
+        if backend == "sqlite":
+            store().extend(list(records))
+        else:
+            export_json(records, file_name)
+
+
+def operations(size, total):
+    """
+    Define las operaciones a medir. Cada una recibe un índice distinto por
+    llamada, de modo que nunca repite el mismo registro.
+
+    :param size: Número de registros de cada conjunto.
+    :param total: Número de llamadas que se harán a cada operación.
+    :return: Lista de tuplas (nombre, función).
+    """
+    reservations = list(islice(generate_reservations(size), total))
+    first_night = date(2030, 1, 1)
+
+    def create_reservation(index):
+        """Reserva una habitación libre en fechas sin ocupar."""
+        check_in = first_night + timedelta(days=2 * index)
+        Reservation.create_reservation(
+            f"Cliente {index}", "Hotel 0", 1, check_in.isoformat(),
+            (check_in + timedelta(days=1)).isoformat())
+
+    def cancel_reservation(index):
+        """Cancela una de las reservas del conjunto generado."""
+        record = reservations[index]
+        Reservation.cancel_reservation(
+            record["customer_name"], record["hotel_name"],
+            record["room_number"], record["check_in_date"])
+
+    return [
+        ("create_customer", lambda index: Customer.create_customer(
+            f"Nuevo {index}", f"nuevo{index}@example.com", "555-0000000")),
+        ("modify_customer_info", lambda index: Customer.modify_customer_info(
+            f"Cliente {index}", email=f"otro{index}@example.com")),
+        ("delete_customer", lambda index: Customer.delete_customer(
+            f"Cliente {size - 1 - index}")),
+        ("create_hotel", lambda index: Hotel.create_hotel(
+            f"Nuevo Hotel {index}", "Ciudad", 10)),
+        ("delete_hotel", lambda index: Hotel.delete_hotel(
+            f"Hotel {size - 1 - index}")),
+        ("create_reservation", create_reservation),
+        ("cancel_reservation", cancel_reservation),
+    ]
+
+
+def time_operation(operation, indexes):
+    """
+    Mide la latencia de cada llamada a una operación.
+
+    :param operation: Función que recibe un índice.
+    :param indexes: Índices con los que se llama a la operación.
+    :return: Lista ordenada de latencias en segundos.
+    """
+    latencies = []
+    for index in indexes:
+        start = time.perf_counter()
+        operation(index)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def peak_memory(operation, indexes):
+    """
+    Mide la memoria máxima asignada por una operación sobre la que ya
+    estaba asignada antes de llamarla.
+
+    :param operation: Función que recibe un índice.
+    :param indexes: Índices con los que se llama a la operación.
+    :return: Máximo de bytes asignados en una sola llamada.
+    """
+    tracemalloc.start()
+    peak = 0
+    try:
+        for index in indexes:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            operation(index)
+            _, highest = tracemalloc.get_traced_memory()
+            peak = max(peak, highest - before)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_size(size, samples, memory_samples, backend):
+    """
+    Ejecuta todas las operaciones sobre un conjunto de datos de un tamaño.
+
+    :param size: Número de registros de cada conjunto.
+    :param samples: Llamadas medidas por operación.
+    :param memory_samples: Llamadas adicionales para medir la memoria.
+    :param backend: 'json' o 'sqlite'.
+    :return: Diccionario con los resultados del tamaño.
+    """
+    total = samples + memory_samples
+    if 2 * total > size:
+        raise ValueError(f"El tamaño {size} es muy pequeño para {total} "
+                         f"llamadas por operación.")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory, \
+            open(os.devnull, "w", encoding="utf-8") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        try:
+            prepare(directory, size, backend)
+            load = load_times()
+            results = [measure(name, operation, samples, total)
+                       for name, operation in operations(size, total)]
+            contents = digests()
+        finally:
+            close_connections()
+            os.chdir(cwd)
+    return {"size": size, "load_seconds": load, "max_rss_bytes": max_rss(),
+            "operations": results, "datasets": contents}
+
+
+def load_times():
+    """
+    Mide la carga en memoria de cada repositorio.
+
+    :return: Diccionario conjunto de datos -> segundos.
+    """
+    load = {}
+    for name, repository in (
+            ("customers", datasets.customers_repository),
+            ("hotels", datasets.hotels_repository),
+            ("reservations", datasets.reservations_repository)):
+        start = time.perf_counter()
+        repository().records()
+        load[name] = time.perf_counter() - start
+    return load
+
+
+def digests():
+    """
+    Resume el contenido final de cada conjunto de datos, sin importar el
+    orden en que el respaldo guarda los registros.
+
+    :return: Diccionario conjunto de datos -> {'count', 'sha256'}.
+    """
+    contents = {}
+    for name, repository in (
+            ("customers", datasets.customers_repository),
+            ("hotels", datasets.hotels_repository),
+            ("reservations", datasets.reservations_repository)):
+        lines = sorted(json.dumps(record, sort_keys=True)
+                       for record in repository().records())
+        digest = hashlib.sha256()
+        for line in lines:
+            digest.update(line.encode("utf-8"))
+            digest.update(b"\n")
+        contents[name] = {"count": len(lines), "sha256": digest.hexdigest()}
+    return contents
+
+
+def measure(name, operation, samples, total):
+    """
+    Mide la latencia y la memoria de una operación.
+
+    :param name: Nombre de la operación.
+    :param operation: Función que recibe un índice.
+    :param samples: Llamadas medidas.
+    :param total: Llamadas medidas más las de memoria.
+    :return: Diccionario con los resultados de la operación.
+    """
+    latencies = time_operation(operation, range(samples))
+    elapsed = sum(latencies)
+    result = {
+        "operation": name,
+        "samples": samples,
+        "mean_us": elapsed / samples * 1e6,
+        "max_us": latencies[-1] * 1e6,
+        "ops_per_sec": samples / elapsed if elapsed else None,
+        "peak_bytes": peak_memory(operation, range(samples, total)),
+    }
+    for percent in PERCENTILES:
+        result[f"p{percent}_us"] = percentile(latencies, percent) * 1e6
+    return result
+
+
+def max_rss():
+    """
+    Obtiene la memoria residente máxima del proceso.
+
+    :return: Bytes o None si no puede medirse en la plataforma.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss está en KiB en Linux y en bytes en macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def run(sizes, samples=SAMPLES, memory_samples=MEMORY_SAMPLES,
+        backend="json"):
+    """
+    Ejecuta la prueba para varios tamaños, cada uno en un proceso nuevo
+    para que la memoria residente de uno no afecte al siguiente.
+
+    :param sizes: Tamaños de los conjuntos de datos.
+    :param samples: Llamadas medidas por operación.
+    :param memory_samples: Llamadas adicionales para medir la memoria.
+    :param backend: 'json' o 'sqlite'.
+    :return: Diccionario con los metadatos y los resultados.
+    """
+    results = []
+    context = get_context("spawn")
+    for size in sizes:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(
+                run_size, (size, samples, memory_samples, backend)))
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "samples": samples,
+        },
+        "results": results,
+    }
+
+
+def compare(current, previous, threshold=THRESHOLD):
+    """
+    Compara dos ejecuciones por tamaño y operación. Antes de comparar los
+    tiempos verifica que, en cada tamaño común, ambas terminaron con el
+    mismo número de registros y el mismo contenido.
+
+    :param current: Resultados de la ejecución actual.
+    :param previous: Resultados de la ejecución anterior.
+    :param threshold: Aumento relativo de la mediana a partir del cual se
+        considera una regresión.
+    :return: Lista de tuplas (tamaño, operación, mediana anterior, mediana
+        actual, cambio relativo, es regresión).
+    :raises ValueError: Si los datos de algún tamaño no coinciden.
+    """
+    check_same_results(current, previous)
+    before = {(entry["size"], operation["operation"]): operation
+              for entry in previous["results"]
+              for operation in entry["operations"]}
+    rows = []
+    for entry in current["results"]:
+        for operation in entry["operations"]:
+            old = before.get((entry["size"], operation["operation"]))
+            if old is None or not old["p50_us"]:
+                continue
+            change = operation["p50_us"] / old["p50_us"] - 1
+            rows.append((entry["size"], operation["operation"],
+                         old["p50_us"], operation["p50_us"], change,
+                         change > threshold))
+    return rows
+
+
+def check_same_results(current, previous):
+    """
+    Verifica que dos ejecuciones terminaron con los mismos datos en cada
+    tamaño que tienen en común.
+
+    :param current: Resultados de la ejecución actual.
+    :param previous: Resultados de la ejecución anterior.
+    :raises ValueError: Si falta el resumen de datos o no coincide.
+    """
+    before = {entry["size"]: entry.get("datasets")
+              for entry in previous["results"]}
+    for entry in current["results"]:
+        if entry["size"] not in before:
+            continue
+        old, new = before[entry["size"]], entry.get("datasets")
+        if old is None or new is None:
+            raise ValueError(f"La ejecución de {entry['size']} registros no "
+                             f"incluye el resumen de los datos.")
+        for name in sorted(set(old) | set(new)):
+            if old.get(name) != new.get(name):
+                raise ValueError(f"Los datos de {name} con {entry['size']} "
+                                 f"registros no coinciden: {old.get(name)} "
+                                 f"!= {new.get(name)}.")
+
+
+def report(results):
+    """
+    Muestra los resultados como tabla.
+
+    :param results: Diccionario devuelto por run().
+    """
+    for entry in results["results"]:
+        load = ", ".join(f"{name}={seconds:.2f}s"
+                         for name, seconds in entry["load_seconds"].items())
+        rss = entry["max_rss_bytes"]
+        print(f"registros={entry['size']} carga: {load}"
+              + (f" rss={rss / 2 ** 20:.0f} MiB" if rss else ""))
+        print(f"  {'operación':<22}{'p50 µs':>10}{'p90 µs':>10}"
+              f"{'p99 µs':>10}{'ops/s':>10}{'pico KiB':>10}")
+        for operation in entry["operations"]:
+            print(f"  {operation['operation']:<22}"
+                  f"{operation['p50_us']:>10.0f}{operation['p90_us']:>10.0f}"
+                  f"{operation['p99_us']:>10.0f}"
+                  f"{operation['ops_per_sec'] or 0:>10.0f}"
+                  f"{operation['peak_bytes'] / 1024:>10.1f}")
+
+
+def main(arguments=None):
+    """
+    Ejecuta la prueba desde la línea de comandos.
+
+    :param arguments: Lista de argumentos (opcional).
+    :return: 1 si hubo regresiones frente a --compare, 2 si los datos no
+        coinciden con los de --compare, 0 en otro caso.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    parser.add_argument("--memory-samples", type=int, default=MEMORY_SAMPLES)
+    parser.add_argument("--backend", choices=datasets.BACKENDS,
+                        default="json")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    options = parser.parse_args(arguments)
+    results = run(options.sizes, options.samples, options.memory_samples,
+                  options.backend)
+    report(results)
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if not options.compare:
+        return 0
+    with open(options.compare, "r", encoding="utf-8") as file:
+        previous = json.load(file)
+    try:
+        rows = compare(results, previous, options.threshold)
+    except ValueError as error:
+        print(error)
+        return 2
+    regressions = 0
+    print(f"comparación con {options.compare}:")
+    for size, name, old, new, change, regression in rows:
+        regressions += regression
+        print(f"  {size:>8} {name:<22}{old:>10.0f}{new:>10.0f} "
+              f"{change:+.0%}{'  REGRESIÓN' if regression else ''}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Generadores de datos sintéticos de clientes, hoteles y reservas con el
+formato de los archivos JSON, para las pruebas de rendimiento.
+"""
+from datetime import date, timedelta
+
+HOTEL_ROOMS = 400
+FIRST_ROOM = 100
+RESERVED_ROOMS = 300
+NIGHTS = 3
+
+
+def generate_customers(count):
+    """
+    Genera clientes sintéticos con el formato de 'customers.json'.
+
+    :param count: Número de clientes.
+    :return: Generador de diccionarios.
+    """
+    for index in range(count):
+        yield {
+            "name": f"Cliente {index}",
+            "email": f"cliente{index}@example.com",
+            "phone": f"555-{index:07d}"
+        }
+
+
+def generate_hotels(count):
+    """
+    Genera hoteles sintéticos con el formato de 'hotels.json'.
+
+    :param count: Número de hoteles.
+    :return: Generador de diccionarios.
+    """
+    for index in range(count):
+        yield {
+            "name": f"Hotel {index}",
+            "location": f"Ciudad {index % 100}",
+            "rooms": HOTEL_ROOMS
+        }
+
+
+def generate_reservations(count, hotels=50, customers=5000):
+    """
+    Genera reservas sintéticas con el formato de 'reservations.json'. Las
+    reservas de una misma habitación no se traslapan, de modo que todas
+    serían aceptadas por create_reservation.
+
+    :param count: Número de reservas.
+    :param hotels: Número de hoteles distintos.
+    :param customers: Número de clientes distintos.
+    :return: Generador de diccionarios.
+    """
+    start = date(2020, 1, 1)
+    for index in range(count):
+        slot = index // hotels
+        check_in = start + timedelta(days=NIGHTS * (slot // RESERVED_ROOMS))
+        yield {
+            "customer_name": f"Cliente {index % customers}",
+            "hotel_name": f"Hotel {index % hotels}",
+            "room_number": FIRST_ROOM + slot % RESERVED_ROOMS,
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=NIGHTS)).isoformat()
+        }
@@ -0,0 +1,55 @@
+"""
+Comparación del uso de memoria de las reservas como diccionarios más
+objetos Reservation frente a ReservationTable.
+
+Uso (desde Actividad-6.2): python -m benchmarks.memory_benchmark [N]
+"""
+import sys
+import tracemalloc
+from benchmarks.generators import generate_reservations
+from src.reservation.columnar import ReservationTable
+from src.reservation.reservation import Reservation
+
+
+def measure(build):
+    """
+    Mide la memoria retenida por el resultado de una función.
+
+    :param build: Función sin argumentos que construye los datos.
+    :return: Tupla (resultado, bytes retenidos).
+    """
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def main(count):
+    """
+    Ejecuta la comparación y muestra los resultados.
+
+    :param count: Número de reservas a generar.
+    :raises ValueError: Si la tabla no devuelve las mismas reservas.
+    """
+    def as_objects():
+        """Construye la representación actual: diccionarios y objetos."""
+        records = list(generate_reservations(count))
+        return records, [Reservation(**record) for record in records]
+
+    def as_table():
+        """Construye la representación columnar."""
+        return ReservationTable.from_records(generate_reservations(count))
+
+    _, object_bytes = measure(as_objects)
+    table, table_bytes = measure(as_table)
+    if table.to_records() != list(generate_reservations(count)):
+        raise ValueError("ReservationTable no reproduce las reservas.")
+    print(f"reservas={count} "
+          f"objetos={object_bytes / 2 ** 20:.1f}MiB "
+          f"tabla={table_bytes / 2 ** 20:.1f}MiB "
+          f"reducción={object_bytes / table_bytes:.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
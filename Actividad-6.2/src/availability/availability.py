@@ -0,0 +1,266 @@
+"""
+Módulo para consultar la disponibilidad de habitaciones.
+
+Por cada par (hotel, habitación) se mantiene una lista ordenada de
+intervalos [entrada, salida) expresados como ordinales de fecha, de modo
+que saber si una habitación está libre es una búsqueda binaria. Las fechas
+se convierten con el módulo src.dates.
+
+La capacidad del hotel se revisa noche por noche: una reserva cabe si la
+habitación está libre y si en ninguna noche del intervalo ya están
+ocupadas todas las habitaciones del hotel. El número de habitaciones es
+solo una capacidad: no limita los números de habitación. can_book,
+free_rooms y is_bookable aplican esa misma regla.
+
+Los datos guardados pueden tener reservas traslapadas en una misma
+habitación. Por eso se recuerda la estadía más larga registrada y toda
+búsqueda revisa cada intervalo que empieza dentro de esa distancia.
+"""
+from bisect import bisect_left, insort
+from src.dates.dates import night_range
+
+
+class RoomAvailability:
+    """
+    Clase para representar la ocupación de las habitaciones de los hoteles.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una ocupación vacía.
+        """
+        self._hotels = {}
+        self._longest = 0
+
+    def add(self, record):
+        """
+        Registra la ocupación de una reserva. Las reservas con fechas que no
+        pueden interpretarse se ignoran.
+
+        :param record: Diccionario con los datos de la reserva.
+        """
+        interval = _record_range(record)
+        if interval is None:
+            return
+        rooms = self._hotels.setdefault(record["hotel_name"], {})
+        insort(rooms.setdefault(record["room_number"], []), interval)
+        self._longest = max(self._longest, interval[1] - interval[0])
+
+    def remove(self, record):
+        """
+        Libera la ocupación de una reserva.
+
+        :param record: Diccionario con los datos de la reserva.
+        """
+        interval = _record_range(record)
+        rooms = self._hotels.get(record["hotel_name"], {})
+        intervals = rooms.get(record["room_number"])
+        if interval is None or not intervals:
+            return
+        position = bisect_left(intervals, interval)
+        if position < len(intervals) and intervals[position] == interval:
+            del intervals[position]
+            if not intervals:
+                del rooms[record["room_number"]]
+
+    def is_free(self, hotel_name, room_number, check_in_date,
+                check_out_date=None):
+        """
+        Indica si una habitación está libre en un intervalo.
+
+        :param hotel_name: Nombre del hotel.
+        :param room_number: Número de habitación.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: True si ninguna reserva se traslapa con [entrada, salida).
+        """
+        start, end = night_range(check_in_date, check_out_date)
+        intervals = self._hotels.get(hotel_name, {}).get(room_number)
+        return not intervals or self._is_free(intervals, start, end)
+
+    def occupied_rooms(self, hotel_name, check_in_date, check_out_date=None):
+        """
+        Obtiene las habitaciones ocupadas de un hotel en un intervalo.
+
+        :param hotel_name: Nombre del hotel.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: Conjunto de números de habitación ocupados.
+        """
+        start, end = night_range(check_in_date, check_out_date)
+        return {room for room, intervals
+                in self._hotels.get(hotel_name, {}).items()
+                if not self._is_free(intervals, start, end)}
+
+    def peak_occupancy(self, hotel_name, check_in_date, check_out_date=None):
+        """
+        Obtiene el mayor número de habitaciones de un hotel ocupadas en una
+        misma noche del intervalo, con un barrido sobre las entradas y
+        salidas de las reservas que se traslapan con él.
+
+        :param hotel_name: Nombre del hotel.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: Número de habitaciones.
+        """
+        start, end = night_range(check_in_date, check_out_date)
+        return self._peak(self._hotels.get(hotel_name, {}), start, end)
+
+    def free_rooms(self, hotel_name, rooms, check_in_date,
+                   check_out_date=None):
+        """
+        Obtiene las habitaciones de un hotel, numeradas de 1 a rooms, que
+        pueden reservarse en un intervalo. Si el hotel está lleno alguna
+        noche del intervalo, no hay ninguna.
+
+        :param hotel_name: Nombre del hotel.
+        :param rooms: Número de habitaciones del hotel.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: Lista de números de habitación libres.
+        """
+        start, end = night_range(check_in_date, check_out_date)
+        hotel = self._hotels.get(hotel_name, {})
+        if self._peak(hotel, start, end) >= rooms:
+            return []
+        return [room for room in range(1, rooms + 1)
+                if room not in hotel or self._is_free(hotel[room], start, end)]
+
+    def is_bookable(self, hotel_name, room_number, check_in_date,
+                    check_out_date=None, rooms=None):
+        """
+        Indica si una habitación puede reservarse en un intervalo.
+
+        :param hotel_name: Nombre del hotel.
+        :param room_number: Número de habitación.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :param rooms: Número de habitaciones del hotel (opcional).
+        :return: True si la reserva cabría.
+        """
+        return self.booking_error({"hotel_name": hotel_name,
+                                   "room_number": room_number,
+                                   "check_in_date": check_in_date,
+                                   "check_out_date": check_out_date},
+                                  rooms) is None
+
+    def booking_error(self, record, rooms=None):
+        """
+        Obtiene el motivo por el que una reserva no puede aceptarse: la
+        habitación debe estar libre y, si se conoce el número de
+        habitaciones del hotel, el hotel no debe estar lleno ninguna noche
+        del intervalo.
+
+        :param record: Diccionario con los datos de la reserva.
+        :param rooms: Número de habitaciones del hotel (opcional).
+        :return: Mensaje de error o None si la reserva puede aceptarse.
+        """
+        hotel_name = record["hotel_name"]
+        room_number = record["room_number"]
+        start, end = night_range(record["check_in_date"],
+                                 record.get("check_out_date"))
+        hotel = self._hotels.get(hotel_name, {})
+        if room_number in hotel and not self._is_free(hotel[room_number],
+                                                      start, end):
+            return (f"Habitación {room_number} del hotel {hotel_name} no "
+                    "disponible.")
+        if rooms is not None and self._peak(hotel, start, end) >= rooms:
+            return f"El hotel {hotel_name} está lleno en esas fechas."
+        return None
+
+    def can_book(self, record, rooms=None):
+        """
+        Indica si una reserva puede aceptarse (véase booking_error).
+
+        :param record: Diccionario con los datos de la reserva.
+        :param rooms: Número de habitaciones del hotel (opcional).
+        :return: True si la reserva puede aceptarse.
+        """
+        return self.booking_error(record, rooms) is None
+
+    def _overlapping(self, intervals, start, end):
+        """
+        Recorre los intervalos de una habitación que se traslapan con
+        [start, end), aunque los guardados se traslapen entre sí.
+
+        :param intervals: Lista ordenada de tuplas (entrada, salida).
+        :param start: Ordinal de entrada.
+        :param end: Ordinal de salida exclusiva.
+        :return: Generador de tuplas (entrada, salida).
+        """
+        position = bisect_left(intervals, (start - self._longest + 1,))
+        for check_in, check_out in intervals[position:]:
+            if check_in >= end:
+                return
+            if check_out > start:
+                yield check_in, check_out
+
+    def _is_free(self, intervals, start, end):
+        """
+        Indica si [start, end) no se traslapa con los intervalos de una
+        habitación.
+
+        :param intervals: Lista ordenada de tuplas (entrada, salida).
+        :param start: Ordinal de entrada.
+        :param end: Ordinal de salida exclusiva.
+        :return: True si no hay traslape.
+        """
+        return next(self._overlapping(intervals, start, end), None) is None
+
+    def _peak(self, hotel, start, end):
+        """
+        Obtiene el mayor número de habitaciones de un hotel ocupadas en una
+        misma noche de [start, end). Los intervalos traslapados de una
+        misma habitación se unen antes de contarlos, así que cada
+        habitación cuenta una sola vez por noche.
+
+        :param hotel: Diccionario habitación -> lista ordenada de intervalos.
+        :param start: Ordinal de entrada.
+        :param end: Ordinal de salida exclusiva.
+        :return: Número de habitaciones.
+        """
+        events = []
+        for intervals in hotel.values():
+            for check_in, check_out in _merged(
+                    self._overlapping(intervals, start, end)):
+                events.append((max(check_in, start), 1))
+                events.append((min(check_out, end), -1))
+        events.sort()
+        peak = current = 0
+        for _, change in events:
+            current += change
+            peak = max(peak, current)
+        return peak
+
+
+def _merged(intervals):
+    """
+    Une los intervalos traslapados de una secuencia ordenada por entrada.
+
+    :param intervals: Iterable ordenado de tuplas (entrada, salida).
+    :return: Generador de tuplas (entrada, salida) disjuntas.
+    """
+    first = last = None
+    for check_in, check_out in intervals:
+        if first is not None and check_in < last:
+            last = max(last, check_out)
+            continue
+        if first is not None:
+            yield first, last
+        first, last = check_in, check_out
+    if first is not None:
+        yield first, last
+
+
+def _record_range(record):
+    """
+    Obtiene el intervalo de una reserva guardada.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Tupla (entrada, salida) o None si las fechas no son válidas.
+    """
+    try:
+        return night_range(record["check_in_date"],
+                           record.get("check_out_date"))
+    except (TypeError, ValueError):
+        return None
@@ -1,9 +1,136 @@
 """
 Módulo para representar un cliente.
 """
-import os
-import json
 import logging
+from src.metrics import metrics
+from src.storage.bulk import BulkResult, build_record, export_json, read_json
+from src.storage.cache import cached_records
+from src.storage.datasets import (customers_repository, customers_store,
+                                  normalize_email, normalize_phone)
+from src.storage.integrity import release_references
+from src.storage.query import Query
+from src.storage.snapshot import open_snapshot
+from src.storage.sorted_index import sort_key
+
+CUSTOMER_FIELDS = ("name", "email", "phone")
+
+
+def _repository(must_exist=True):
+    """
+    Obtiene el repositorio indexado de los clientes.
+
+    :param must_exist: Si es True, falla cuando no hay datos guardados.
+    :return: Repository con índices por nombre, correo y teléfono.
+    """
+    if must_exist and not customers_store().exists():
+        raise FileNotFoundError("El archivo 'customers.json' no existe.")
+    return customers_repository()
+
+
+def _email_owner(repository, email):
+    """
+    Busca el cliente que tiene registrado un correo.
+
+    :param repository: Repositorio de los clientes.
+    :param email: Correo electrónico.
+    :return: Diccionario del cliente o None.
+    """
+    key = normalize_email(email)
+    if not key:
+        return None
+    return repository.find("email", key)
+
+
+def _prepare_customer(repository, row):
+    """
+    Valida una fila de cliente para una carga en lote. El correo no puede
+    estar registrado ni repetirse dentro del lote.
+
+    :param repository: Repositorio de los clientes.
+    :param row: Diccionario con los datos del cliente.
+    :return: Tupla (registro, mensaje de error o None).
+    """
+    record, error = build_record(row, CUSTOMER_FIELDS)
+    if error:
+        return None, error
+    if _email_owner(repository, record["email"]):
+        return None, f"El correo {record['email']} ya está registrado."
+    return record, None
+
+
+def _customer(record):
+    """
+    Construye un Customer a partir de un registro.
+
+    :param record: Diccionario con los datos del cliente.
+    :return: Instancia de Customer.
+    """
+    return Customer(record["name"], record["email"], record["phone"])
+
+
+def _named(repository, names):
+    """
+    Recorre los clientes de una lista de nombres, en el orden de la lista.
+
+    :param repository: Repository de los clientes.
+    :param names: Iterable de nombres.
+    :return: Generador de diccionarios.
+    """
+    for name in names:
+        yield from repository.find_all("name", name)
+
+
+class CustomerQuery(Query):
+    """
+    Clase para consultar los clientes. El correo y el teléfono se comparan
+    normalizados, como en sus índices, y los nombres se ordenan sin
+    distinguir mayúsculas, como en el índice ordenado de nombres, que
+    resuelve las condiciones name__startswith y el orden ascendente por
+    nombre.
+    """
+
+    ENTITY = "customer"
+    FIELDS = CUSTOMER_FIELDS
+    NORMALIZERS = {"email": normalize_email, "phone": normalize_phone}
+    INDEXES = {"email": "email", "name": "name", "phone": "phone"}
+    COLLATIONS = {"name": sort_key}
+    DEFAULT_ORDER = ("name",)
+
+    def _repositories(self):
+        """
+        Obtiene el repositorio de los clientes, si hay datos guardados.
+
+        :return: Lista con cero o un Repository.
+        """
+        return [customers_repository()] if customers_store().exists() else []
+
+    def _stream(self, repository):
+        """
+        Obtiene los clientes candidatos: los de un índice hash si hay una
+        igualdad indexada, los de un prefijo del nombre o, en orden
+        ascendente por nombre, los del índice de nombres desde el cursor.
+
+        :param repository: Repository de los clientes.
+        :return: Tupla (iterable de clientes, True si vienen ordenados por
+            nombre).
+        """
+        if self._lookup() is not None:
+            return super()._stream(repository)
+        view = repository.view("names")
+        by_name = self._ordering()[0] == ("name", False)
+        for field, operator, target in self._conditions:
+            if field == "name" and operator == "startswith":
+                return _named(repository, view.search(target)), by_name
+        if not by_name or view.unindexed():
+            return super()._stream(repository)
+        start = None
+        if self._cursor is not None:
+            start = self._cursor["values"][0]
+            if not isinstance(start, (str, int, float)):
+                return [], True
+            if not isinstance(start, str):
+                start = None
+        return _named(repository, view.iter_values(start)), True
 
 
 class Customer:
@@ -11,6 +138,8 @@ class Customer:
     Clase para representar un cliente.
     """
 
+    __slots__ = ("name", "email", "phone")
+
     def __init__(self, name, email, phone):
         """
         Inicializa un nuevo objeto de Cliente.
@@ -24,6 +153,7 @@ class Customer:
         self.phone = phone
 
     @staticmethod
+    @metrics.timed("customer")
     def create_customer(name, email, phone):
         """
         Crea un nuevo cliente y lo guarda en el archivo 'customers.json'.
@@ -31,54 +161,87 @@ class Customer:
         :param name: Nombre del cliente.
         :param email: Correo electrónico del cliente.
         :param phone: Número de teléfono del cliente.
-        :return: El objeto Customer creado.
+        :return: El objeto Customer creado o None si el correo ya está
+            registrado.
         """
         new_customer = Customer(name, email, phone)
-        customers_data = []
+        repository = _repository(must_exist=False)
+        with repository.locked():
+            if _email_owner(repository, email):
+                logging.warning("El correo %s ya está registrado.", email)
+                return None
+            repository.add({"name": new_customer.name,
+                            "email": new_customer.email,
+                            "phone": new_customer.phone})
+        return new_customer
+
+    @staticmethod
+    @metrics.timed("customer")
+    def create_customers(rows):
+        """
+        Crea varios clientes y los guarda con una sola escritura.
+
+        :param rows: Iterable de diccionarios con 'name', 'email' y 'phone'.
+        :return: BulkResult con los Customer creados y las filas rechazadas.
+        """
+        records, errors = _repository(must_exist=False).add_many(
+            rows, _prepare_customer)
+        created = [_customer(record) for record in records]
+        return BulkResult(created, errors)
 
-        if os.path.exists("customers.json"):
-            with open("customers.json", "r", encoding="utf-8") as file:
-                customers_data = json.load(file)
+    @staticmethod
+    @metrics.timed("customer")
+    def import_customers(path):
+        """
+        Importa clientes desde un archivo JSON con una lista de objetos.
 
-        customers_data.append({
-            "name": new_customer.name, "email": new_customer.email,
-            "phone": new_customer.phone})
+        :param path: Ruta del archivo a importar.
+        :return: BulkResult con los clientes creados y las filas rechazadas.
+        """
+        return Customer.create_customers(read_json(path))
 
-        with open("customers.json", "w", encoding="utf-8") as file:
-            json.dump(customers_data, file)
+    @staticmethod
+    @metrics.timed("customer")
+    def export_customers(path):
+        """
+        Exporta todos los clientes a un archivo JSON.
 
-        return new_customer
+        :param path: Ruta del archivo de salida.
+        :return: Número de clientes exportados.
+        """
+        return export_json(customers_store().iter_records(), path)
 
     @staticmethod
+    @metrics.timed("customer")
     def delete_customer(name):
         """
         Elimina un cliente del archivo 'customers.json' basado en su nombre.
+        Con la integridad activada, sus reservas impiden el borrado
+        ('restrict') o se eliminan con él ('cascade').
 
         :param name: Nombre del cliente a eliminar.
         """
-        customers_data = Customer.load_customers_data()
-        filtered_customers = [
-            customer for customer in customers_data if customer["name"] != name
-        ]
-        if len(filtered_customers) < len(customers_data):
-            with open("customers.json", "w", encoding="utf-8") as file:
-                json.dump(filtered_customers, file)
-            logging.info("Cliente %s eliminado exitosamente.", name)
-        else:
-            logging.info("Cliente %s no encontrado.", name)
+        repository = _repository()
+        with repository.locked():
+            if repository.find("name", name) is None:
+                logging.info("Cliente %s no encontrado.", name)
+                return
+            if not release_references("customer", name):
+                logging.warning("El cliente %s tiene reservas y no puede "
+                                "eliminarse.", name)
+                return
+            repository.remove_all("name", name)
+        logging.info("Cliente %s eliminado exitosamente.", name)
 
     @staticmethod
+    @metrics.timed("customer")
     def display_customer_info(name):
         """
         Muestra la información de un cliente basado en su nombre.
 
         :param name: Nombre del cliente cuya información se desea mostrar.
         """
-        customers_data = Customer.load_customers_data()
-        customer = next(
-            (customer for customer in customers_data
-             if customer["name"] == name),
-            None)
+        customer = _repository().find("name", name)
         if customer:
             logging.info("Nombre del Cliente: %s", customer['name'])
             logging.info("Correo Electrónico: %s", customer['email'])
@@ -87,6 +250,7 @@ class Customer:
             logging.info("Cliente %s no encontrado.", name)
 
     @staticmethod
+    @metrics.timed("customer")
     def modify_customer_info(name, email=None, phone=None):
         """
         Modifica la información de un cliente basado en su nombre.
@@ -95,30 +259,176 @@ class Customer:
         :param email: Nuevo correo electrónico del cliente (opcional).
         :param phone: Nuevo número de teléfono del cliente (opcional).
         """
-        customers_data = Customer.load_customers_data()
-        customer = next(
-            (customer for customer in customers_data
-             if customer["name"] == name),
-            None)
-        if customer:
-            if email:
-                customer["email"] = email
-            if phone:
-                customer["phone"] = phone
-            with open("customers.json", "w", encoding="utf-8") as file:
-                json.dump(customers_data, file)
-            print(f"Información del cliente {name} modificada exitosamente.")
-        else:
-            print(f"Cliente {name} no encontrado.")
+        changes = {}
+        if email:
+            changes["email"] = email
+        if phone:
+            changes["phone"] = phone
+        repository = _repository()
+        with repository.locked():
+            customer = repository.find("name", name)
+            if customer is None:
+                logging.info("Cliente %s no encontrado.", name)
+                return
+            owner = _email_owner(repository, email) if email else None
+            if owner is not None and owner is not customer:
+                logging.warning("El correo %s ya está registrado.", email)
+                return
+            if changes:
+                repository.update(customer, changes)
+        logging.info("Información del cliente %s modificada exitosamente.",
+                     name)
+
+    @staticmethod
+    @metrics.timed("customer")
+    def modify_customers(updates):
+        """
+        Modifica varios clientes con una sola escritura. Cada modificación
+        se valida como en modify_customer_info y ve las anteriores del lote,
+        de modo que un correo liberado en el lote puede reutilizarse.
+
+        :param updates: Iterable de diccionarios con 'name' y, de forma
+            opcional, 'email' y 'phone'.
+        :return: Lista con True por cada modificación aplicada y False por
+            cada una rechazada, en el orden de updates.
+        """
+        repository = _repository()
+        outcomes = []
+        with repository.locked():
+            pending = {}
+            owners = {}
+            for update in updates:
+                name = update.get("name")
+                email = update.get("email")
+                customer = repository.find("name", name)
+                if customer is None:
+                    logging.info("Cliente %s no encontrado.", name)
+                    outcomes.append(False)
+                    continue
+                changes = pending.get(id(customer), (customer, {}))[1]
+                if email:
+                    key = normalize_email(email)
+                    if key in owners:
+                        owner = owners[key]
+                    else:
+                        owner = _email_owner(repository, email)
+                        owner = id(owner) if owner is not None else None
+                    if owner is not None and owner != id(customer):
+                        logging.warning("El correo %s ya está registrado.",
+                                        email)
+                        outcomes.append(False)
+                        continue
+                    owners[normalize_email(
+                        changes.get("email", customer["email"]))] = None
+                    owners[key] = id(customer)
+                    changes["email"] = email
+                if update.get("phone"):
+                    changes["phone"] = update["phone"]
+                pending[id(customer)] = (customer, changes)
+                outcomes.append(True)
+            changed = [(customer, changes)
+                       for customer, changes in pending.values() if changes]
+            if changed:
+                repository.update_many(changed)
+        logging.info("%d de %d clientes modificados.", sum(outcomes),
+                     len(outcomes))
+        return outcomes
+
+    @staticmethod
+    def query():
+        """
+        Crea una consulta perezosa sobre los clientes, por ejemplo
+        Customer.query().where(name__startswith="an").limit(20).page().
+
+        :return: CustomerQuery sin condiciones, ordenada por nombre.
+        """
+        return CustomerQuery()
 
     @staticmethod
+    @metrics.timed("customer")
+    def find_by_email(email):
+        """
+        Busca un cliente por su correo, sin distinguir mayúsculas.
+
+        :param email: Correo electrónico.
+        :return: Instancia de Customer o None si no existe.
+        """
+        customer = _email_owner(_repository(), email)
+        return _customer(customer) if customer else None
+
+    @staticmethod
+    @metrics.timed("customer")
+    def find_by_phone(phone):
+        """
+        Busca los clientes con un teléfono; solo se comparan los dígitos.
+
+        :param phone: Número de teléfono.
+        :return: Lista de Customer.
+        """
+        key = normalize_phone(phone)
+        if not key:
+            return []
+        return [_customer(customer)
+                for customer in _repository().find_all("phone", key)]
+
+    @staticmethod
+    @metrics.timed("customer")
+    def search_names(prefix, limit=10):
+        """
+        Busca nombres de clientes que empiezan con un prefijo, sin
+        distinguir mayúsculas, para autocompletar.
+
+        :param prefix: Prefijo del nombre.
+        :param limit: Número máximo de resultados.
+        :return: Lista de nombres en orden alfabético.
+        """
+        return _repository().view("names").search(prefix, limit)
+
+    @staticmethod
+    @metrics.timed("customer")
     def load_customers_data():
         """
         Carga los datos de los clientes desde el archivo 'customers.json'.
+        El archivo solo se vuelve a leer si cambió desde la última carga y
+        los registros no se copian: para modificar uno, usar dict(registro).
 
-        :return: Lista de diccionarios con los datos de los clientes.
+        :return: Lista de vistas de solo lectura con los datos de los
+            clientes.
         """
-        if os.path.exists("customers.json"):
-            with open("customers.json", "r", encoding="utf-8") as file:
-                return json.load(file)
-        raise FileNotFoundError("El archivo 'customers.json' no existe.")
+        store = customers_store()
+        if not store.exists():
+            raise FileNotFoundError("El archivo 'customers.json' no existe.")
+        return list(cached_records(store))
+
+    @staticmethod
+    @metrics.timed("customer")
+    def load_customers_snapshot():
+        """
+        Abre los clientes desde la instantánea binaria 'customers.json.snap'
+        con mmap, sin leer todos los registros. La instantánea se regenera
+        si el archivo 'customers.json' cambió.
+
+        :return: BinarySnapshot que se usa como la lista de load_*_data y
+            permite buscar con find('name' o 'email', valor).
+        """
+        store = customers_store()
+        if not store.exists():
+            raise FileNotFoundError("El archivo 'customers.json' no existe.")
+        return open_snapshot(store, ("name", "email"))
+
+    @staticmethod
+    def iter_customers(predicate=None):
+        """
+        Recorre los clientes del archivo 'customers.json' uno a uno, sin
+        cargar el archivo completo en memoria.
+
+        :param predicate: Función que recibe un cliente y devuelve True si
+            debe incluirse (opcional).
+        :return: Generador de diccionarios con los datos de los clientes.
+        """
+        store = customers_store()
+        if not store.exists():
+            raise FileNotFoundError("El archivo 'customers.json' no existe.")
+        for customer in store.iter_records():
+            if predicate is None or predicate(customer):
+                yield customer
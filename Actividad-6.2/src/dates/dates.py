@@ -0,0 +1,259 @@
+"""
+Módulo para interpretar y normalizar las fechas de las reservas.
+
+Las fechas se validan una sola vez al guardar la reserva y se escriben en
+forma canónica 'AAAA-MM-DD'. En memoria se manejan como ordinales enteros:
+la conversión de cada cadena se memoriza, porque las reservas comparten
+pocas fechas distintas, y DateIndex mantiene las entradas ordenadas para
+responder consultas por rango con búsqueda binaria.
+"""
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from functools import lru_cache
+
+INSERT_LIMIT = 16
+CHUNK_SIZE = 256
+
+
+def to_ordinal(value):
+    """
+    Obtiene el ordinal de una fecha.
+
+    :param value: date, datetime o cadena ISO 'AAAA-MM-DD'.
+    :return: Entero con el ordinal de la fecha.
+    :raises ValueError: Si la fecha no puede interpretarse.
+    """
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, str):
+        return _parse(value)
+    raise ValueError(f"Fecha inválida: {value!r}")
+
+
+def to_iso(value):
+    """
+    Obtiene la forma canónica de una fecha.
+
+    :param value: date, datetime o cadena ISO.
+    :return: Cadena 'AAAA-MM-DD'.
+    :raises ValueError: Si la fecha no puede interpretarse.
+    """
+    return date.fromordinal(to_ordinal(value)).isoformat()
+
+
+def normalize_stay(check_in_date, check_out_date=None):
+    """
+    Valida y normaliza las fechas de una reserva.
+
+    :param check_in_date: Fecha de entrada.
+    :param check_out_date: Fecha de salida (opcional).
+    :return: Tupla (entrada, salida) en forma canónica; la salida es None
+        si no se indicó.
+    :raises ValueError: Si una fecha no es válida o la salida no es
+        posterior a la entrada.
+    """
+    check_in = to_iso(check_in_date)
+    if check_out_date is None:
+        return check_in, None
+    check_out = to_iso(check_out_date)
+    if check_out <= check_in:
+        raise ValueError("La fecha de salida debe ser posterior a la de "
+                         "entrada.")
+    return check_in, check_out
+
+
+def night_range(check_in_date, check_out_date=None):
+    """
+    Convierte las fechas de una reserva en un intervalo de ordinales.
+
+    :param check_in_date: Fecha de entrada (date o cadena ISO).
+    :param check_out_date: Fecha de salida (opcional). Sin ella, la reserva
+        ocupa una sola noche.
+    :return: Tupla (entrada, salida) con salida exclusiva.
+    """
+    start = to_ordinal(check_in_date)
+    if check_out_date is None:
+        return start, start + 1
+    return start, max(to_ordinal(check_out_date), start + 1)
+
+
+@lru_cache(maxsize=8192)
+def _parse(text):
+    """
+    Convierte una cadena ISO en ordinal. El resultado se memoriza.
+
+    :param text: Cadena con la fecha.
+    :return: Entero con el ordinal.
+    """
+    try:
+        return date.fromisoformat(text.strip()).toordinal()
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {text!r}") from None
+
+
+class DateIndex:
+    """
+    Clase para representar las reservas ordenadas por fecha de entrada.
+
+    Es una vista de Repository: recibe cada alta y baja con add(record) y
+    remove(record). Las reservas con fechas inválidas no se ordenan; solo
+    se conservan para undated().
+    """
+
+    def __init__(self):
+        """
+        Inicializa un índice vacío.
+        """
+        self._entries_of = {}
+        self._records = {}
+        self._entries = []
+        self._hotels = {}
+        self._pending = []
+        self._undated = {}
+        self._counter = 0
+
+    def add(self, record):
+        """
+        Registra la fecha de entrada de una reserva.
+
+        :param record: Diccionario con los datos de la reserva.
+        """
+        try:
+            ordinal = to_ordinal(record["check_in_date"])
+        except (KeyError, ValueError):
+            self._undated[id(record)] = record
+            return
+        self._counter += 1
+        entry = (ordinal, self._counter)
+        self._entries_of[id(record)] = entry
+        self._records[self._counter] = record
+        self._pending.append((entry, record["hotel_name"]))
+
+    def remove(self, record):
+        """
+        Quita una reserva del índice.
+
+        :param record: Diccionario con los datos de la reserva (el mismo
+            objeto que se registró).
+        """
+        entry = self._entries_of.pop(id(record), None)
+        if entry is None:
+            self._undated.pop(id(record), None)
+            return
+        del self._records[entry[1]]
+        self._merge()
+        _discard(self._entries, entry)
+        hotel = self._hotels.get(record["hotel_name"])
+        if hotel is not None:
+            _discard(hotel, entry)
+            if not hotel:
+                del self._hotels[record["hotel_name"]]
+
+    def check_ins_between(self, start_date, end_date, hotel_name=None):
+        """
+        Obtiene las reservas con entrada entre dos fechas, ambas incluidas.
+
+        :param start_date: Primera fecha.
+        :param end_date: Última fecha.
+        :param hotel_name: Nombre del hotel (opcional).
+        :return: Lista de reservas ordenadas por fecha de entrada.
+        """
+        self._merge()
+        entries = (self._entries if hotel_name is None
+                   else self._hotels.get(hotel_name, []))
+        low = bisect_left(entries, (to_ordinal(start_date),))
+        high = bisect_right(entries, (to_ordinal(end_date) + 1,))
+        return [self._records[counter] for _, counter in entries[low:high]]
+
+    def iter_check_ins(self, start_date=None, end_date=None,
+                       hotel_name=None):
+        """
+        Recorre en orden de entrada las reservas entre dos fechas, ambas
+        incluidas, sin copiar el rango. Se avanza por bloques buscando
+        cada uno después de la última entrada vista, de modo que las altas
+        y bajas hechas durante el recorrido no lo desordenan.
+
+        :param start_date: Primera fecha (opcional).
+        :param end_date: Última fecha (opcional).
+        :param hotel_name: Nombre del hotel (opcional).
+        :return: Generador de reservas ordenadas por fecha de entrada.
+        """
+        last_seen = (None if start_date is None
+                     else (to_ordinal(start_date),))
+        end = None if end_date is None else to_ordinal(end_date)
+        while True:
+            self._merge()
+            entries = (self._entries if hotel_name is None
+                       else self._hotels.get(hotel_name, []))
+            if last_seen is None:
+                low = 0
+            elif len(last_seen) == 1:
+                low = bisect_left(entries, last_seen)
+            else:
+                low = bisect_right(entries, last_seen)
+            chunk = entries[low:low + CHUNK_SIZE]
+            if not chunk:
+                return
+            for entry in chunk:
+                if end is not None and entry[0] > end:
+                    return
+                record = self._records.get(entry[1])
+                if record is not None:
+                    yield record
+            last_seen = chunk[-1]
+
+    def undated(self, hotel_name=None):
+        """
+        Obtiene las reservas cuya fecha de entrada no pudo interpretarse.
+
+        :param hotel_name: Nombre del hotel (opcional).
+        :return: Lista de reservas.
+        """
+        return [record for record in self._undated.values()
+                if hotel_name in (None, record.get("hotel_name"))]
+
+    def arrivals(self, hotel_name, day):
+        """
+        Obtiene las reservas de un hotel que entran en un día.
+
+        :param hotel_name: Nombre del hotel.
+        :param day: Fecha de entrada.
+        :return: Lista de reservas.
+        """
+        return self.check_ins_between(day, day, hotel_name)
+
+    def _merge(self):
+        """
+        Integra las altas pendientes a las listas ordenadas: pocas se
+        insertan una por una y muchas con un solo ordenamiento.
+        """
+        if not self._pending:
+            return
+        if len(self._pending) <= INSERT_LIMIT:
+            for entry, hotel_name in self._pending:
+                insort(self._entries, entry)
+                insort(self._hotels.setdefault(hotel_name, []), entry)
+        else:
+            touched = set()
+            for entry, hotel_name in self._pending:
+                self._entries.append(entry)
+                self._hotels.setdefault(hotel_name, []).append(entry)
+                touched.add(hotel_name)
+            self._entries.sort()
+            for hotel_name in touched:
+                self._hotels[hotel_name].sort()
+        self._pending = []
+
+
+def _discard(entries, entry):
+    """
+    Quita una entrada de una lista ordenada.
+
+    :param entries: Lista ordenada.
+    :param entry: Entrada a quitar.
+    """
+    position = bisect_left(entries, entry)
+    if position < len(entries) and entries[position] == entry:
+        del entries[position]
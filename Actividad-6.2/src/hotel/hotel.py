@@ -1,9 +1,85 @@
 """
 Módulo para representar un hotel y manejar sus operaciones.
 """
-import os
-import json
 import logging
+from src.metrics import metrics
+from src.reservation.reservation import Reservation, book_reservation
+from src.storage.bulk import BulkResult, build_record, export_json, read_json
+from src.storage.datasets import (hotels_repository, hotels_store,
+                                  reservation_key, reservations_repository)
+from src.storage.integrity import release_references
+from src.storage.snapshot import open_snapshot
+
+HOTEL_FIELDS = ("name", "location", "rooms")
+
+
+def _prepare_hotel(_repository, row):
+    """
+    Valida una fila de hotel para una carga en lote.
+
+    :param _repository: Repositorio de los hoteles.
+    :param row: Diccionario con los datos del hotel.
+    :return: Tupla (registro, mensaje de error o None).
+    """
+    record, error = build_record(row, HOTEL_FIELDS)
+    if error:
+        return None, error
+    rooms = record["rooms"]
+    if isinstance(rooms, bool) or not isinstance(rooms, int) or rooms < 1:
+        return None, "El número de habitaciones debe ser un entero positivo."
+    return record, None
+
+
+class HotelReservations:
+    """
+    Clase para representar las reservas guardadas de un hotel. No guarda
+    copia propia: consulta el índice por hotel del repositorio de reservas,
+    que se carga en el primer acceso y se mantiene al día con
+    Reservation.create_reservation y Reservation.cancel_reservation.
+    """
+
+    __slots__ = ("hotel",)
+
+    def __init__(self, hotel):
+        """
+        Inicializa la vista.
+
+        :param hotel: Hotel dueño de las reservas.
+        """
+        self.hotel = hotel
+
+    def __contains__(self, reservation):
+        """
+        Indica en O(1) si una reserva está guardada en este hotel.
+
+        :param reservation: Reservation o diccionario con sus datos.
+        :return: True si la reserva existe.
+        """
+        if isinstance(reservation, Reservation):
+            reservation = reservation.to_dict()
+        if reservation.get("hotel_name") != self.hotel.name:
+            return False
+        return reservations_repository(self.hotel.name).find(
+            "key", reservation_key(reservation)) is not None
+
+    def __len__(self):
+        """
+        Obtiene el número de reservas del hotel.
+
+        :return: Número de reservas.
+        """
+        return reservations_repository(self.hotel.name).count(
+            "hotel", self.hotel.name)
+
+    def __iter__(self):
+        """
+        Recorre las reservas del hotel.
+
+        :return: Generador de objetos Reservation.
+        """
+        repository = reservations_repository(self.hotel.name)
+        for record in repository.find_all("hotel", self.hotel.name):
+            yield Reservation(**record)
 
 
 class Hotel:
@@ -11,6 +87,8 @@ class Hotel:
     Clase para representar un hotel.
     """
 
+    __slots__ = ("name", "location", "rooms", "_reservations")
+
     def __init__(self, name, location, rooms):
         """
         Inicializa una nueva instancia de Hotel.
@@ -22,9 +100,21 @@ class Hotel:
         self.name = name
         self.location = location
         self.rooms = rooms
-        self.reservations = []
+        self._reservations = None
+
+    @property
+    def reservations(self):
+        """
+        Obtiene las reservas guardadas del hotel.
+
+        :return: HotelReservations del hotel.
+        """
+        if self._reservations is None:
+            self._reservations = HotelReservations(self)
+        return self._reservations
 
     @staticmethod
+    @metrics.timed("hotel")
     def create_hotel(name, location, rooms):
         """
         Crea un nuevo hotel y lo guarda en el archivo 'hotels.json'.
@@ -35,45 +125,140 @@ class Hotel:
         :return: La instancia de Hotel creada.
         """
         new_hotel = Hotel(name, location, rooms)
-        hotels_data = []
+        hotels_repository().add({"name": new_hotel.name,
+                                 "location": new_hotel.location,
+                                 "rooms": new_hotel.rooms})
+        return new_hotel
 
-        if os.path.exists("hotels.json"):
-            with open("hotels.json", "r", encoding="utf-8") as file:
-                hotels_data = json.load(file)
+    @staticmethod
+    @metrics.timed("hotel")
+    def create_hotels(rows):
+        """
+        Crea varios hoteles y los guarda con una sola escritura.
 
-        hotels_data.append({"name": new_hotel.name,
-                            "location": new_hotel.location,
-                            "rooms": new_hotel.rooms})
+        :param rows: Iterable de diccionarios con 'name', 'location' y
+            'rooms'.
+        :return: BulkResult con los Hotel creados y las filas rechazadas.
+        """
+        records, errors = hotels_repository().add_many(rows, _prepare_hotel)
+        created = [Hotel(record["name"], record["location"], record["rooms"])
+                   for record in records]
+        return BulkResult(created, errors)
 
-        with open("hotels.json", "w", encoding="utf-8") as file:
-            json.dump(hotels_data, file)
+    @staticmethod
+    @metrics.timed("hotel")
+    def import_hotels(path):
+        """
+        Importa hoteles desde un archivo JSON con una lista de objetos.
 
-        return new_hotel
+        :param path: Ruta del archivo a importar.
+        :return: BulkResult con los hoteles creados y las filas rechazadas.
+        """
+        return Hotel.create_hotels(read_json(path))
+
+    @staticmethod
+    @metrics.timed("hotel")
+    def export_hotels(path):
+        """
+        Exporta todos los hoteles a un archivo JSON.
+
+        :param path: Ruta del archivo de salida.
+        :return: Número de hoteles exportados.
+        """
+        return export_json(hotels_store().iter_records(), path)
 
     @staticmethod
+    @metrics.timed("hotel")
+    def load_hotels_snapshot():
+        """
+        Abre los hoteles desde la instantánea binaria 'hotels.json.snap'
+        con mmap, sin leer todos los registros. La instantánea se regenera
+        si el archivo 'hotels.json' cambió.
+
+        :return: BinarySnapshot que se usa como una lista de diccionarios y
+            permite buscar con find('name', valor).
+        """
+        return open_snapshot(hotels_store(), ("name",))
+
+    @staticmethod
+    def iter_hotels(predicate=None):
+        """
+        Recorre los hoteles del archivo 'hotels.json' uno a uno, sin cargar
+        el archivo completo en memoria.
+
+        :param predicate: Función que recibe un hotel y devuelve True si
+            debe incluirse (opcional).
+        :return: Generador de diccionarios con los datos de los hoteles.
+        """
+        for hotel in hotels_store().iter_records():
+            if predicate is None or predicate(hotel):
+                yield hotel
+
+    @staticmethod
+    @metrics.timed("hotel")
     def delete_hotel(name):
         """
         Elimina un hotel del archivo 'hotels.json' basado en su nombre.
+        Con la integridad activada, sus reservas impiden el borrado
+        ('restrict') o se eliminan con él ('cascade').
 
         :param name: Nombre del hotel a eliminar.
         """
-        if os.path.exists("hotels.json"):
-            with open("hotels.json", "r", encoding="utf-8") as file:
-                hotels_data = json.load(file)
+        if not hotels_store().exists():
+            logging.info("No se encontraron hoteles.")
+            return
+        repository = hotels_repository()
+        with repository.locked():
+            if repository.find("name", name) is None:
+                logging.info("Hotel %s no encontrado para eliminación.", name)
+                return
+            if not release_references("hotel", name):
+                logging.warning("El hotel %s tiene reservas y no puede "
+                                "eliminarse.", name)
+                return
+            repository.remove_all("name", name)
+        logging.info("Hotel %s eliminado exitosamente.", name)
 
-            filtered_hotels = [
-                hotel for hotel in hotels_data if hotel["name"] != name
-            ]
+    @staticmethod
+    @metrics.timed("hotel")
+    def delete_hotels(names):
+        """
+        Elimina varios hoteles con una sola escritura. Cada nombre se
+        valida como en delete_hotel, incluida la integridad referencial.
 
-            if len(filtered_hotels) < len(hotels_data):
-                with open("hotels.json", "w", encoding="utf-8") as file:
-                    json.dump(filtered_hotels, file)
-                logging.info("Hotel %s eliminado exitosamente.", name)
-            else:
-                logging.info("Hotel %s no encontrado para eliminación.", name)
-        else:
+        :param names: Iterable de nombres de hoteles.
+        :return: Lista con True por cada hotel eliminado y False por cada
+            uno no encontrado o con reservas, en el orden de names.
+        """
+        names = list(names)
+        if not hotels_store().exists():
             logging.info("No se encontraron hoteles.")
+            return [False] * len(names)
+        repository = hotels_repository()
+        outcomes = []
+        with repository.locked():
+            doomed = {}
+            for name in names:
+                matches = [hotel for hotel in repository.find_all("name", name)
+                           if id(hotel) not in doomed]
+                if not matches:
+                    logging.info("Hotel %s no encontrado para eliminación.",
+                                 name)
+                    outcomes.append(False)
+                elif not release_references("hotel", name):
+                    logging.warning("El hotel %s tiene reservas y no puede "
+                                    "eliminarse.", name)
+                    outcomes.append(False)
+                else:
+                    doomed.update((id(hotel), hotel) for hotel in matches)
+                    outcomes.append(True)
+            if doomed:
+                repository.remove_many(list(doomed.values()))
+        logging.info("%d de %d hoteles eliminados.", sum(outcomes),
+                     len(outcomes))
+        return outcomes
 
+    @metrics.timed("hotel")
     def display_info(self):
         """
         Muestra la información del hotel.
@@ -85,6 +270,7 @@ class Hotel:
         for reservation in self.reservations:
             logging.info(reservation)
 
+    @metrics.timed("hotel")
     def modify_info(self, name=None, location=None, rooms=None):
         """
         Modifica la información del hotel.
@@ -100,14 +286,22 @@ class Hotel:
         if rooms:
             self.rooms = rooms
 
+    @metrics.timed("hotel")
     def reserve_room(self, reservation):
         """
-        Reserva una habitación en el hotel.
+        Reserva una habitación en el hotel y la guarda en
+        'reservations.json' si está libre en las fechas de la reserva y el
+        hotel no está lleno.
 
         :param reservation: Objeto de reserva a agregar.
+        :return: True si la reserva fue aceptada.
         """
-        self.reservations.append(reservation)
+        if reservation.hotel_name != self.name:
+            logging.warning("La reserva no pertenece al hotel %s.", self.name)
+            return False
+        return book_reservation(reservation.to_dict(), self.rooms)
 
+    @metrics.timed("hotel")
     def cancel_reservation(self, reservation):
         """
         Cancela una reserva existente en el hotel.
@@ -115,6 +309,8 @@ class Hotel:
         :param reservation: Objeto de reserva a cancelar.
         """
         if reservation in self.reservations:
-            self.reservations.remove(reservation)
+            Reservation.cancel_reservation(
+                reservation.customer_name, reservation.hotel_name,
+                reservation.room_number, reservation.check_in_date)
         else:
             print("Reserva no encontrada.")
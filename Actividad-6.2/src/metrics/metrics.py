@@ -0,0 +1,460 @@
+"""
+Módulo de instrumentación de las operaciones y de los almacenes.
+
+Las mediciones se envían a un receptor ('sink') activado con enable():
+
+- Registry: acumula en memoria los tiempos y contadores.
+- PrometheusFileSink: además de acumular, escribe periódicamente un
+  archivo con el formato de texto de Prometheus.
+- CallbackSink: llama a una función con cada medición.
+
+Mientras no hay receptor, timer() devuelve un contexto vacío compartido y
+increment() y scanned() regresan de inmediato. Con la variable de entorno
+MNA_METRICS_FILE se activa un PrometheusFileSink al importar el módulo.
+
+Tiempos: 'operation' (métodos de Customer, Hotel y Reservation), 'load'
+(carga completa de un repositorio), 'scan' (lectura de registros de un
+almacén), 'serialize' y 'write'. Contadores: 'records_scanned',
+'bytes_read' y 'bytes_written'.
+"""
+import atexit
+import functools
+import os
+import threading
+import time
+from contextlib import nullcontext
+from src.storage.concurrency import atomic_write
+
+PREFIX = "mna"
+
+_NULL_TIMER = nullcontext()
+_STATE = {"sink": None}
+
+
+class Sink:
+    """
+    Clase base de los receptores de mediciones.
+    """
+
+    def timing(self, name, labels, seconds):
+        """
+        Recibe la duración de una sección medida.
+
+        :param name: Nombre del tiempo.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param seconds: Duración en segundos.
+        """
+        raise NotImplementedError
+
+    def count(self, name, labels, value):
+        """
+        Recibe el incremento de un contador.
+
+        :param name: Nombre del contador.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param value: Incremento.
+        """
+        raise NotImplementedError
+
+
+class Registry(Sink):
+    """
+    Clase para acumular en memoria los tiempos y contadores.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un registro vacío.
+        """
+        self._lock = threading.Lock()
+        self._timers = {}
+        self._counters = {}
+
+    def timing(self, name, labels, seconds):
+        """
+        Acumula la duración de una sección medida.
+
+        :param name: Nombre del tiempo.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param seconds: Duración en segundos.
+        """
+        with self._lock:
+            stats = self._timers.get((name, labels))
+            if stats is None:
+                self._timers[(name, labels)] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def count(self, name, labels, value):
+        """
+        Acumula el incremento de un contador.
+
+        :param name: Nombre del contador.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param value: Incremento.
+        """
+        with self._lock:
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timer_stats(self, name, **labels):
+        """
+        Obtiene lo acumulado de un tiempo.
+
+        :param name: Nombre del tiempo.
+        :param labels: Etiquetas del tiempo.
+        :return: Diccionario con 'count', 'sum' y 'max', o None.
+        """
+        with self._lock:
+            stats = self._timers.get((name, _labels(labels)))
+        if stats is None:
+            return None
+        return {"count": stats[0], "sum": stats[1], "max": stats[2]}
+
+    def counter(self, name, **labels):
+        """
+        Obtiene el valor de un contador.
+
+        :param name: Nombre del contador.
+        :param labels: Etiquetas del contador.
+        :return: Valor acumulado (0 si no se ha incrementado).
+        """
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def snapshot(self):
+        """
+        Obtiene una copia de todas las mediciones.
+
+        :return: Diccionario con 'timers' y 'counters', cada uno con
+            llaves (nombre, etiquetas).
+        """
+        with self._lock:
+            return {"timers": {key: tuple(stats)
+                               for key, stats in self._timers.items()},
+                    "counters": dict(self._counters)}
+
+    def clear(self):
+        """
+        Descarta todas las mediciones.
+        """
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def prometheus_text(self, prefix=PREFIX):
+        """
+        Obtiene las mediciones con el formato de texto de Prometheus. Los
+        tiempos se exportan como 'summary' (_count y _sum) más un 'gauge'
+        con el máximo, y los contadores como 'counter'.
+
+        :param prefix: Prefijo de los nombres de las métricas.
+        :return: Cadena con el formato de exposición.
+        """
+        data = self.snapshot()
+        lines = []
+        timers = {}
+        for (name, labels), stats in sorted(data["timers"].items()):
+            timers.setdefault(name, []).append((labels, stats))
+        for name, series in timers.items():
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for labels, (count, total, _) in series:
+                lines.append(f"{metric}_count{_format(labels)} {count}")
+                lines.append(f"{metric}_sum{_format(labels)} {total!r}")
+            lines.append(f"# TYPE {metric}_max gauge")
+            for labels, (_, _, highest) in series:
+                lines.append(f"{metric}_max{_format(labels)} {highest!r}")
+        counters = {}
+        for (name, labels), value in sorted(data["counters"].items()):
+            counters.setdefault(name, []).append((labels, value))
+        for name, series in counters.items():
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in series:
+                lines.append(f"{metric}{_format(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusFileSink(Registry):
+    """
+    Clase para acumular las mediciones y escribirlas en un archivo con el
+    formato de texto de Prometheus, por ejemplo para el 'textfile
+    collector' de node_exporter.
+    """
+
+    def __init__(self, path, interval=10.0):
+        """
+        Inicializa el receptor.
+
+        :param path: Ruta del archivo a escribir.
+        :param interval: Segundos mínimos entre escrituras automáticas.
+        """
+        super().__init__()
+        self.path = path
+        self.interval = interval
+        self._written_at = time.monotonic()
+
+    def timing(self, name, labels, seconds):
+        """
+        Acumula una duración y escribe el archivo si toca.
+
+        :param name: Nombre del tiempo.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param seconds: Duración en segundos.
+        """
+        super().timing(name, labels, seconds)
+        self._maybe_flush()
+
+    def count(self, name, labels, value):
+        """
+        Acumula un contador y escribe el archivo si toca.
+
+        :param name: Nombre del contador.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param value: Incremento.
+        """
+        super().count(name, labels, value)
+        self._maybe_flush()
+
+    def flush(self):
+        """
+        Escribe el archivo con las mediciones acumuladas.
+        """
+        text = self.prometheus_text()
+        atomic_write(self.path, lambda file: file.write(text))
+        self._written_at = time.monotonic()
+
+    def _maybe_flush(self):
+        """
+        Escribe el archivo si pasó el intervalo desde la última escritura.
+        """
+        if time.monotonic() - self._written_at >= self.interval:
+            self.flush()
+
+
+class CallbackSink(Sink):
+    """
+    Clase para reenviar cada medición a una función.
+    """
+
+    def __init__(self, callback):
+        """
+        Inicializa el receptor.
+
+        :param callback: Función (tipo, nombre, etiquetas, valor) donde
+            tipo es 'timing' o 'count' y etiquetas es un diccionario.
+        """
+        self.callback = callback
+
+    def timing(self, name, labels, seconds):
+        """
+        Reenvía una duración.
+
+        :param name: Nombre del tiempo.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param seconds: Duración en segundos.
+        """
+        self.callback("timing", name, dict(labels), seconds)
+
+    def count(self, name, labels, value):
+        """
+        Reenvía el incremento de un contador.
+
+        :param name: Nombre del contador.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        :param value: Incremento.
+        """
+        self.callback("count", name, dict(labels), value)
+
+
+class _Timer:
+    """
+    Clase auxiliar que mide una sección y envía su duración al receptor.
+    """
+
+    __slots__ = ("sink", "name", "labels", "start")
+
+    def __init__(self, sink, name, labels):
+        """
+        Inicializa el cronómetro.
+
+        :param sink: Receptor de la medición.
+        :param name: Nombre del tiempo.
+        :param labels: Tupla ordenada de pares (etiqueta, valor).
+        """
+        self.sink = sink
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        """
+        Inicia la medición.
+
+        :return: El propio cronómetro.
+        """
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Termina la medición, también si la sección falló.
+        """
+        self.sink.timing(self.name, self.labels,
+                         time.perf_counter() - self.start)
+        return False
+
+
+def enable(sink=None):
+    """
+    Activa la instrumentación en todo el proceso.
+
+    :param sink: Receptor de las mediciones (opcional). Si no se indica se
+        usa un Registry nuevo.
+    :return: El receptor activo.
+    """
+    _STATE["sink"] = sink if sink is not None else Registry()
+    return _STATE["sink"]
+
+
+def disable():
+    """
+    Desactiva la instrumentación.
+    """
+    _STATE["sink"] = None
+
+
+def get_sink():
+    """
+    Obtiene el receptor activo.
+
+    :return: Instancia de Sink o None si la instrumentación está apagada.
+    """
+    return _STATE["sink"]
+
+
+def timer(name, **labels):
+    """
+    Obtiene un contexto que mide la duración de una sección.
+
+    :param name: Nombre del tiempo.
+    :param labels: Etiquetas de la medición.
+    :return: Administrador de contexto.
+    """
+    sink = _STATE["sink"]
+    if sink is None:
+        return _NULL_TIMER
+    return _Timer(sink, name, _labels(labels))
+
+
+def increment(name, value=1, **labels):
+    """
+    Incrementa un contador.
+
+    :param name: Nombre del contador.
+    :param value: Incremento.
+    :param labels: Etiquetas del contador.
+    """
+    sink = _STATE["sink"]
+    if sink is not None:
+        sink.count(name, _labels(labels), value)
+
+
+def scanned(records, **labels):
+    """
+    Envuelve un iterador de registros para contar los registros leídos y
+    medir el tiempo dedicado a producirlos, sin contar el del consumidor.
+
+    :param records: Iterador de registros.
+    :param labels: Etiquetas de las mediciones.
+    :return: El mismo iterador si la instrumentación está apagada.
+    """
+    sink = _STATE["sink"]
+    if sink is None:
+        return records
+    return _scan(sink, records, _labels(labels))
+
+
+def timed(entity):
+    """
+    Decorador que mide cada llamada a un método como tiempo 'operation',
+    con las etiquetas 'entity' y 'operation' (nombre del método).
+
+    :param entity: Nombre de la entidad, por ejemplo 'customer'.
+    :return: Decorador.
+    """
+    def decorate(function):
+        """Envuelve la función con el cronómetro."""
+        labels = _labels({"entity": entity, "operation": function.__name__})
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            """Mide la llamada si hay un receptor activo."""
+            sink = _STATE["sink"]
+            if sink is None:
+                return function(*args, **kwargs)
+            with _Timer(sink, "operation", labels):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _scan(sink, records, labels):
+    """
+    Generador auxiliar de scanned().
+
+    :param sink: Receptor de las mediciones.
+    :param records: Iterador de registros.
+    :param labels: Tupla ordenada de pares (etiqueta, valor).
+    :return: Generador con los mismos registros.
+    """
+    iterator = iter(records)
+    count = 0
+    elapsed = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                record = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - start
+                return
+            elapsed += time.perf_counter() - start
+            count += 1
+            yield record
+    finally:
+        sink.timing("scan", labels, elapsed)
+        sink.count("records_scanned", labels, count)
+
+
+def _labels(labels):
+    """
+    Convierte las etiquetas en una llave ordenada y hashable.
+
+    :param labels: Diccionario de etiquetas.
+    :return: Tupla ordenada de pares (etiqueta, valor).
+    """
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format(labels):
+    """
+    Da formato de Prometheus a las etiquetas.
+
+    :param labels: Tupla ordenada de pares (etiqueta, valor).
+    :return: Cadena '{a="1",b="2"}' o vacía.
+    """
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\n", "\\n")
+               .replace('"', '\\"') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value
+                          in zip(labels, escaped)) + "}"
+
+
+if os.environ.get("MNA_METRICS_FILE"):
+    _FILE_SINK = enable(PrometheusFileSink(os.environ["MNA_METRICS_FILE"]))
+    atexit.register(_FILE_SINK.flush)
@@ -0,0 +1,298 @@
+"""
+Módulo para calcular la ocupación diaria y las noches de habitación de los
+hoteles en un periodo.
+
+Las reservas se leen una sola vez y se reparten en tareas por hotel o por
+hotel y año de entrada. Cada tarea cuenta las noches ocupadas por día con
+un arreglo de diferencias y las tareas se reparten entre procesos con
+ProcessPoolExecutor. Si NumPy está instalado, las fechas de cada tarea se
+interpretan y se recortan como arreglos datetime64; si no, o si alguna
+fecha no tiene el formato AAAA-MM-DD, se usa el cálculo en Python puro,
+con el mismo resultado.
+Las noches se cuentan igual que en la disponibilidad: una reserva sin
+salida ocupa una noche y las fechas que no pueden interpretarse se omiten.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from src.dates.dates import night_range, to_ordinal
+from src.reservation.reservation import Reservation
+from src.storage.datasets import hotels_repository
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy es opcional
+    numpy = None
+
+PARTITIONS = ("hotel", "year")
+
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+class HotelOccupancy:
+    """
+    Clase para representar la ocupación de un hotel en un periodo.
+    """
+
+    def __init__(self, hotel, rooms, start, daily, skipped=0):
+        """
+        Inicializa una nueva ocupación.
+
+        :param hotel: Nombre del hotel.
+        :param rooms: Número de habitaciones del hotel o None si no está
+            registrado.
+        :param start: Primer día del periodo (date).
+        :param daily: Lista con las habitaciones ocupadas en cada día.
+        :param skipped: Reservas omitidas por tener fechas inválidas.
+        """
+        self.hotel = hotel
+        self.rooms = rooms
+        self.start = start
+        self.daily = daily
+        self.skipped = skipped
+
+    @property
+    def room_nights(self):
+        """
+        Obtiene las noches de habitación vendidas en el periodo.
+
+        :return: Entero con la suma de la ocupación diaria.
+        """
+        return sum(self.daily)
+
+    def by_date(self):
+        """
+        Obtiene la ocupación de cada día.
+
+        :return: Diccionario fecha ISO -> habitaciones ocupadas.
+        """
+        return {(self.start + timedelta(days=offset)).isoformat(): occupied
+                for offset, occupied in enumerate(self.daily)}
+
+    def daily_ratios(self):
+        """
+        Obtiene la proporción de habitaciones ocupadas en cada día.
+
+        :return: Lista de flotantes o None si no se conocen las
+            habitaciones del hotel.
+        """
+        if not self.rooms:
+            return None
+        return [occupied / self.rooms for occupied in self.daily]
+
+    def occupancy_ratio(self):
+        """
+        Obtiene la ocupación promedio del periodo.
+
+        :return: Noches vendidas entre noches disponibles, o None si no se
+            conocen las habitaciones del hotel.
+        """
+        if not self.rooms or not self.daily:
+            return None
+        return self.room_nights / (self.rooms * len(self.daily))
+
+    def __repr__(self):
+        """
+        Representa la ocupación de forma resumida.
+
+        :return: Cadena con el hotel, los días y las noches vendidas.
+        """
+        return (f"HotelOccupancy(hotel={self.hotel!r}, "
+                f"days={len(self.daily)}, room_nights={self.room_nights})")
+
+
+def occupancy_report(start, end, hotels=None, partition="hotel",
+                     workers=None):
+    """
+    Calcula la ocupación diaria de los hoteles en el periodo [start, end).
+
+    :param start: Primer día del periodo (date o cadena ISO).
+    :param end: Día siguiente al último del periodo (date o cadena ISO).
+    :param hotels: Nombres de los hoteles a incluir (opcional). Si no se
+        indica, se incluyen todos los que tengan reservas.
+    :param partition: 'hotel' para una tarea por hotel o 'year' para una
+        tarea por hotel y año de entrada.
+    :param workers: Número de procesos (opcional). Con 1 se calcula en el
+        proceso actual.
+    :return: Diccionario hotel -> HotelOccupancy.
+    """
+    if partition not in PARTITIONS:
+        raise ValueError(f"Partición desconocida: {partition}")
+    first = to_ordinal(start)
+    days = to_ordinal(end) - first
+    if days < 1:
+        raise ValueError("La fecha final debe ser posterior a la inicial.")
+    tasks = _partition(hotels, partition)
+    arguments = [(first, days, check_ins, check_outs)
+                 for check_ins, check_outs in tasks.values()]
+    if workers == 1 or len(arguments) <= 1:
+        results = [_count_nights(argument) for argument in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_count_nights, arguments))
+    report = _merge(tasks, results, date.fromordinal(first))
+    for hotel in hotels or ():
+        if hotel not in report:
+            report[hotel] = _occupancy(hotel, date.fromordinal(first),
+                                       [0] * days)
+    return report
+
+
+def _merge(tasks, results, start):
+    """
+    Suma por hotel la ocupación de sus tareas.
+
+    :param tasks: Diccionario (hotel, año o None) -> tupla (entradas,
+        salidas), en el orden de los resultados.
+    :param results: Lista de tuplas (ocupación diaria, reservas omitidas).
+    :param start: Primer día del periodo (date).
+    :return: Diccionario hotel -> HotelOccupancy.
+    """
+    report = {}
+    for (hotel, _), (daily, skipped) in zip(tasks, results):
+        occupancy = report.get(hotel)
+        if occupancy is None:
+            report[hotel] = _occupancy(hotel, start, daily, skipped)
+        else:
+            occupancy.daily = [a + b for a, b in zip(occupancy.daily, daily)]
+            occupancy.skipped += skipped
+    return report
+
+
+def _occupancy(hotel, start, daily, skipped=0):
+    """
+    Crea la ocupación de un hotel con sus habitaciones registradas.
+
+    :param hotel: Nombre del hotel.
+    :param start: Primer día del periodo (date).
+    :param daily: Lista con las habitaciones ocupadas en cada día.
+    :param skipped: Reservas omitidas por tener fechas inválidas.
+    :return: HotelOccupancy.
+    """
+    record = hotels_repository().find("name", hotel)
+    return HotelOccupancy(hotel, record["rooms"] if record else None,
+                          start, daily, skipped)
+
+
+def _partition(hotels, partition):
+    """
+    Reparte las fechas de las reservas en tareas.
+
+    :param hotels: Nombres de los hoteles a incluir o None.
+    :param partition: 'hotel' o 'year'.
+    :return: Diccionario (hotel, año o None) -> tupla (entradas, salidas).
+    """
+    wanted = set(hotels) if hotels is not None else None
+    tasks = {}
+    for record in Reservation.iter_reservations():
+        hotel = record["hotel_name"]
+        if wanted is not None and hotel not in wanted:
+            continue
+        check_in = record["check_in_date"]
+        year = None
+        if partition == "year" and isinstance(check_in, str):
+            year = check_in[:4]
+        check_ins, check_outs = tasks.setdefault((hotel, year), ([], []))
+        check_ins.append(check_in)
+        check_outs.append(record.get("check_out_date"))
+    return tasks
+
+
+def _count_nights(task):
+    """
+    Cuenta las habitaciones ocupadas por día de una tarea.
+
+    :param task: Tupla (primer ordinal, días, entradas, salidas).
+    :return: Tupla (ocupación diaria, reservas omitidas).
+    """
+    first, days, check_ins, check_outs = task
+    if numpy is not None:
+        daily = _count_vectorized(first, days, check_ins, check_outs)
+        if daily is not None:
+            return daily, 0
+    return _count_python(first, days, check_ins, check_outs)
+
+
+def _count_python(first, days, check_ins, check_outs):
+    """
+    Cuenta las habitaciones ocupadas por día en Python puro.
+
+    :param first: Ordinal del primer día del periodo.
+    :param days: Número de días del periodo.
+    :param check_ins: Lista de fechas de entrada.
+    :param check_outs: Lista de fechas de salida (con None si no hay).
+    :return: Tupla (ocupación diaria, reservas omitidas).
+    """
+    changes = [0] * (days + 1)
+    skipped = 0
+    for check_in, check_out in zip(check_ins, check_outs):
+        try:
+            start, end = night_range(check_in, check_out)
+        except (TypeError, ValueError):
+            skipped += 1
+            continue
+        start = min(max(start - first, 0), days)
+        end = min(max(end - first, 0), days)
+        if start < end:
+            changes[start] += 1
+            changes[end] -= 1
+    daily = []
+    occupied = 0
+    for change in changes[:-1]:
+        occupied += change
+        daily.append(occupied)
+    return daily, skipped
+
+
+def _count_vectorized(first, days, check_ins, check_outs):
+    """
+    Cuenta las habitaciones ocupadas por día con arreglos datetime64.
+
+    :param first: Ordinal del primer día del periodo.
+    :param days: Número de días del periodo.
+    :param check_ins: Lista de fechas de entrada.
+    :param check_outs: Lista de fechas de salida (con None si no hay).
+    :return: Lista con la ocupación diaria o None si alguna fecha no tiene
+        el formato AAAA-MM-DD y hay que usar el cálculo en Python puro.
+    """
+    missing = numpy.fromiter((value is None for value in check_outs),
+                             dtype=bool, count=len(check_outs))
+    starts = _parse_dates(check_ins)
+    ends = _parse_dates([check_out if check_out is not None else check_in
+                         for check_in, check_out
+                         in zip(check_ins, check_outs)])
+    if starts is None or ends is None:
+        return None
+    offset = first - _EPOCH
+    starts = starts.astype(numpy.int64) - offset
+    ends = numpy.where(missing, starts + 1,
+                       numpy.maximum(ends.astype(numpy.int64) - offset,
+                                     starts + 1))
+    starts = numpy.clip(starts, 0, days)
+    ends = numpy.clip(ends, 0, days)
+    kept = starts < ends
+    changes = (numpy.bincount(starts[kept], minlength=days + 1)
+               - numpy.bincount(ends[kept], minlength=days + 1))
+    return numpy.cumsum(changes[:-1]).tolist()
+
+
+def _parse_dates(values):
+    """
+    Convierte cadenas AAAA-MM-DD en un arreglo datetime64. datetime64
+    acepta formatos parciales como '2024-01', por lo que antes se verifica
+    el ancho y la posición de los guiones.
+
+    :param values: Lista de cadenas.
+    :return: Arreglo datetime64[D] o None si algún valor no tiene el
+        formato esperado.
+    """
+    text = numpy.array(values)
+    if text.dtype != numpy.dtype("U10"):
+        return None
+    chars = text.view("U1").reshape(len(text), 10)
+    if not ((chars[:, 4] == "-") & (chars[:, 7] == "-")
+            & (chars[:, 9] != "")).all():
+        return None
+    try:
+        return numpy.array(values, dtype="datetime64[D]")
+    except ValueError:
+        return None
@@ -0,0 +1,235 @@
+"""
+Módulo con una interfaz asyncio para las operaciones de reservas.
+
+Las lecturas y escrituras de archivos se ejecutan fuera del ciclo de
+eventos. Todas las escrituras pasan, en orden, por un único hilo escritor:
+las altas que llegan en la misma vuelta del ciclo se guardan con una sola
+escritura, con el mismo resultado que tendrían create_reservation y
+cancel_reservation llamadas una tras otra.
+
+Una operación cancelada (o vencida por su tiempo límite) antes de que su
+lote se escriba no se aplica; si el lote ya se está escribiendo, la
+operación se completa en disco aunque quien la esperaba ya no reciba el
+resultado.
+
+Cada recorrido con iter() usa su propio hilo lector: el generador de
+registros se reanuda siempre en el mismo hilo, como exigen los cursores
+de SQLite.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from src.reservation.reservation import Reservation, book_reservations
+
+BATCH_SIZE = 1000
+
+
+class AsyncReservationStore:
+    """
+    Clase para representar la interfaz asíncrona de las reservas.
+    """
+
+    def __init__(self):
+        """
+        Inicializa la interfaz con su propio hilo escritor.
+        """
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="reservations-writer")
+        self._pending = []
+
+    async def __aenter__(self):
+        """
+        Permite usar la interfaz con 'async with'.
+
+        :return: La propia interfaz.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Espera las escrituras pendientes y libera el hilo escritor.
+        """
+        await self.close()
+        return False
+
+    async def create(self, customer_name, hotel_name, room_number,
+                     check_in_date, check_out_date=None, timeout=None):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """
+        Crea una reserva, equivalente a Reservation.create_reservation.
+
+        :param customer_name: Nombre del cliente que realiza la reserva.
+        :param hotel_name: Nombre del hotel en el que se realiza la reserva.
+        :param room_number: Número de habitación reservada.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :param timeout: Segundos máximos de espera (opcional).
+        :return: La instancia de Reservation creada, con las fechas como
+            quedaron guardadas, o None si la habitación no está disponible.
+        """
+        reservation = Reservation(customer_name, hotel_name, room_number,
+                                  check_in_date, check_out_date)
+        return await self._submit("create", reservation, timeout)
+
+    async def cancel(self, customer_name, hotel_name, room_number,
+                     check_in_date, timeout=None):
+        """
+        Cancela una reserva, equivalente a Reservation.cancel_reservation.
+
+        :param customer_name: Nombre del cliente de la reserva a cancelar.
+        :param hotel_name: Nombre del hotel de la reserva a cancelar.
+        :param room_number: Número de habitación de la reserva a cancelar.
+        :param check_in_date: Fecha de entrada de la reserva a cancelar.
+        :param timeout: Segundos máximos de espera (opcional).
+        """
+        return await self._submit(
+            "cancel", (customer_name, hotel_name, room_number, check_in_date),
+            timeout)
+
+    async def iter(self, predicate=None, batch_size=BATCH_SIZE):
+        """
+        Recorre las reservas como Reservation.iter_reservations, leyendo
+        por lotes fuera del ciclo de eventos.
+
+        :param predicate: Función que recibe una reserva y devuelve True si
+            debe incluirse (opcional).
+        :param batch_size: Reservas leídas por cada salto a otro hilo.
+        :return: Generador asíncrono de diccionarios.
+        """
+        loop = asyncio.get_running_loop()
+        reader = ThreadPoolExecutor(max_workers=1,
+                                    thread_name_prefix="reservations-reader")
+        records = Reservation.iter_reservations(predicate)
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    reader, _next_batch, records, batch_size)
+                for record in batch:
+                    yield record
+                if len(batch) < batch_size:
+                    return
+        finally:
+            await loop.run_in_executor(reader, records.close)
+            reader.shutdown(wait=False)
+
+    async def close(self):
+        """
+        Envía las operaciones aún encoladas, espera las escrituras
+        pendientes y libera el hilo escritor sin bloquear el ciclo de
+        eventos.
+        """
+        self._flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.shutdown)
+
+    async def _submit(self, kind, payload, timeout):
+        """
+        Encola una escritura y espera su resultado.
+
+        :param kind: 'create' o 'cancel'.
+        :param payload: Reservation a crear o clave de la reserva a
+            cancelar.
+        :param timeout: Segundos máximos de espera o None.
+        :return: Resultado de la operación.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append((kind, payload, future))
+        return await asyncio.wait_for(future, timeout)
+
+    def _flush(self):
+        """
+        Envía al hilo escritor las operaciones encoladas en esta vuelta del
+        ciclo, descartando las ya canceladas.
+        """
+        operations = [operation for operation in self._pending
+                      if not operation[2].done()]
+        self._pending = []
+        if not operations:
+            return
+        loop = asyncio.get_running_loop()
+        work = loop.run_in_executor(
+            self._writer, _apply, [operation[:2] for operation in operations])
+        work.add_done_callback(
+            lambda done: _resolve(done, [operation[2]
+                                         for operation in operations]))
+
+
+def _next_batch(records, size):
+    """
+    Lee el siguiente lote de un iterador.
+
+    :param records: Iterador de registros.
+    :param size: Tamaño máximo del lote.
+    :return: Lista con hasta 'size' registros.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            break
+    return batch
+
+
+def _apply(operations):
+    """
+    Aplica en orden un lote de operaciones; las altas consecutivas se
+    guardan con una sola escritura.
+
+    :param operations: Lista de tuplas (tipo, datos).
+    :return: Lista de tuplas (resultado, excepción) en el mismo orden.
+    """
+    outcomes = []
+    creates = []
+
+    def flush_creates():
+        """Guarda las altas acumuladas."""
+        if not creates:
+            return
+        try:
+            results = book_reservations([reservation.to_dict()
+                                         for reservation in creates])
+        except Exception as error:  # pylint: disable=broad-except
+            results = [error] * len(creates)
+        for result in results:
+            if isinstance(result, Exception):
+                outcomes.append((None, result))
+            else:
+                outcomes.append((Reservation(**result) if result else None,
+                                 None))
+        creates.clear()
+
+    for kind, payload in operations:
+        if kind == "create":
+            creates.append(payload)
+            continue
+        flush_creates()
+        try:
+            outcomes.append((Reservation.cancel_reservation(*payload), None))
+        except Exception as error:  # pylint: disable=broad-except
+            outcomes.append((None, error))
+    flush_creates()
+    return outcomes
+
+
+def _resolve(work, futures):
+    """
+    Entrega los resultados de un lote a quienes los esperan.
+
+    :param work: Future del lote ejecutado en el hilo escritor.
+    :param futures: Futures de las operaciones, en orden.
+    """
+    if work.cancelled() or work.exception() is not None:
+        error = (asyncio.CancelledError() if work.cancelled()
+                 else work.exception())
+        outcomes = [(None, error)] * len(futures)
+    else:
+        outcomes = work.result()
+    for future, (result, error) in zip(futures, outcomes):
+        if future.done():
+            continue
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
@@ -0,0 +1,142 @@
+"""
+Módulo para guardar muchas reservas en columnas compactas.
+
+Los nombres de clientes y hoteles se guardan una sola vez en una tabla de
+cadenas y cada reserva solo guarda su índice. Los números de habitación y
+las fechas, convertidas a ordinales, se guardan en arreglos de enteros.
+
+Por ahora solo la usa benchmarks/memory_benchmark.py para medir el ahorro
+de memoria. Ninguna lectura de la aplicación pasa por aquí: la tabla
+rechaza fechas no canónicas, que el reporte de ocupación y la
+disponibilidad toleran y omiten.
+"""
+from array import array
+from datetime import date
+
+NO_DATE = 0
+
+
+class ReservationTable:
+    """
+    Clase para representar un conjunto de reservas en formato columnar.
+    """
+
+    __slots__ = ("_strings", "_string_ids", "customer_ids", "hotel_ids",
+                 "room_numbers", "check_in_dates", "check_out_dates")
+
+    def __init__(self):
+        """
+        Inicializa una tabla vacía.
+        """
+        self._strings = []
+        self._string_ids = {}
+        self.customer_ids = array("I")
+        self.hotel_ids = array("I")
+        self.room_numbers = array("q")
+        self.check_in_dates = array("i")
+        self.check_out_dates = array("i")
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Construye una tabla a partir de registros con el formato de
+        'reservations.json'.
+
+        :param records: Iterable de diccionarios, por ejemplo el de
+            Reservation.iter_reservations().
+        :return: Instancia de ReservationTable.
+        """
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    def append(self, record):
+        """
+        Agrega una reserva a la tabla.
+
+        :param record: Diccionario con los datos de la reserva.
+        """
+        room_number = record["room_number"]
+        if isinstance(room_number, bool) or not isinstance(room_number, int):
+            raise ValueError("El número de habitación debe ser un entero.")
+        check_in_date = _to_ordinal(record["check_in_date"])
+        check_out_date = record.get("check_out_date")
+        check_out_date = (NO_DATE if check_out_date is None
+                          else _to_ordinal(check_out_date))
+        self.customer_ids.append(self._intern(record["customer_name"]))
+        self.hotel_ids.append(self._intern(record["hotel_name"]))
+        self.room_numbers.append(room_number)
+        self.check_in_dates.append(check_in_date)
+        self.check_out_dates.append(check_out_date)
+
+    def __len__(self):
+        """
+        Obtiene el número de reservas.
+
+        :return: Número de reservas.
+        """
+        return len(self.room_numbers)
+
+    def __getitem__(self, position):
+        """
+        Reconstruye una reserva con el formato de 'reservations.json'.
+
+        :param position: Posición de la reserva.
+        :return: Diccionario con los datos de la reserva.
+        """
+        check_out_date = self.check_out_dates[position]
+        return {
+            "customer_name": self._strings[self.customer_ids[position]],
+            "hotel_name": self._strings[self.hotel_ids[position]],
+            "room_number": self.room_numbers[position],
+            "check_in_date": date.fromordinal(
+                self.check_in_dates[position]).isoformat(),
+            "check_out_date": (None if check_out_date == NO_DATE else
+                               date.fromordinal(check_out_date).isoformat())
+        }
+
+    def __iter__(self):
+        """
+        Recorre las reservas de la tabla.
+
+        :return: Generador de diccionarios.
+        """
+        for position in range(len(self)):
+            yield self[position]
+
+    def to_records(self):
+        """
+        Convierte la tabla al formato de 'reservations.json'.
+
+        :return: Lista de diccionarios.
+        """
+        return list(self)
+
+    def _intern(self, value):
+        """
+        Obtiene el índice de una cadena en la tabla de cadenas.
+
+        :param value: Cadena a guardar.
+        :return: Índice de la cadena.
+        """
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+
+def _to_ordinal(value):
+    """
+    Convierte una fecha ISO en su ordinal. Solo se aceptan fechas en forma
+    canónica 'AAAA-MM-DD' para que la conversión sea reversible.
+
+    :param value: Cadena con la fecha.
+    :return: Entero con el ordinal.
+    """
+    parsed = date.fromisoformat(value)
+    if parsed.isoformat() != value:
+        raise ValueError(f"Fecha no canónica: {value}")
+    return parsed.toordinal()
@@ -1,9 +1,402 @@
 """
 Módulo para representar una reservaciones.
+
+Si las reservas están particionadas por hotel, las funciones de este módulo
+hacen de enrutador: las altas, bajas y consultas de un hotel van al
+repositorio de su partición y las consultas sin hotel se reparten entre
+todas las particiones en paralelo.
 """
-import os
-import json
+import functools
+import heapq
+import itertools
 import logging
+from datetime import date
+from src.dates.dates import normalize_stay, to_iso, to_ordinal
+from src.metrics import metrics
+from src.storage.bulk import BulkResult, build_record, export_json, read_json
+from src.storage.cache import cached_records
+from src.storage.datasets import (hotels_repository, reservation_shards,
+                                  reservations_repositories,
+                                  reservations_repository,
+                                  reservations_store)
+from src.storage.integrity import check_references, references_locked
+from src.storage.query import Query
+from src.storage.sharding import fan_out, shard_of
+from src.storage.snapshot import open_snapshot
+
+RESERVATION_FIELDS = ("customer_name", "hotel_name", "room_number",
+                      "check_in_date")
+
+
+def _hotel_rooms(hotel_name):
+    """
+    Obtiene el número de habitaciones de un hotel registrado.
+
+    :param hotel_name: Nombre del hotel.
+    :return: Número de habitaciones o None si el hotel no está registrado.
+    """
+    hotel = hotels_repository().find("name", hotel_name)
+    return hotel["rooms"] if hotel else None
+
+
+def _rooms_by_hotel(rows, hotel_of):
+    """
+    Obtiene las habitaciones de cada hotel de un lote. Se consulta antes de
+    tomar el candado de las reservas para no leer los hoteles con él
+    tomado.
+
+    :param rows: Lista con las filas de entrada.
+    :param hotel_of: Función que obtiene el hotel de una fila.
+    :return: Diccionario {hotel: número de habitaciones o None}.
+    """
+    rooms = {}
+    for row in rows:
+        hotel_name = hotel_of(row)
+        if isinstance(hotel_name, str) and hotel_name not in rooms:
+            rooms[hotel_name] = _hotel_rooms(hotel_name)
+    return rooms
+
+
+def book_reservation(record, rooms=None):
+    """
+    Guarda una reserva si la habitación está libre, el hotel no está lleno
+    y, con la integridad activada, el cliente y el hotel existen.
+
+    :param record: Diccionario con los datos de la reserva.
+    :param rooms: Número de habitaciones del hotel (opcional). Si no se
+        indica, se usa el del hotel registrado.
+    :return: True si la reserva fue guardada.
+    :raises ValueError: Si las fechas no son válidas.
+    """
+    record = _normalize_dates(record)
+    if rooms is None:
+        rooms = _hotel_rooms(record["hotel_name"])
+    repository = reservations_repository(record["hotel_name"])
+    with references_locked(), repository.locked():
+        if not _can_book(repository, record, rooms):
+            return False
+        repository.add(record)
+    return True
+
+
+def book_reservations(records):
+    """
+    Guarda varias reservas con una sola escritura. El resultado de cada
+    una es el mismo que daría book_reservation llamada en orden.
+
+    :param records: Lista de diccionarios con los datos de las reservas.
+    :return: Lista con, por cada reserva, el diccionario guardado (con
+        las fechas normalizadas), False si fue rechazada o la excepción que
+        habría lanzado book_reservation.
+    """
+    outcomes = {}
+    rooms = _rooms_by_hotel(records, _hotel_of)
+
+    def prepare(repository, position_record):
+        """Valida una reserva frente a las guardadas y las del lote."""
+        position, record = position_record
+        try:
+            record = _normalize_dates(record)
+            error = _booking_error(repository, record,
+                                   rooms.get(record["hotel_name"]))
+        except Exception as exception:  # pylint: disable=broad-except
+            outcomes[position] = exception
+            return None, exception
+        if error:
+            logging.warning(error)
+            outcomes[position] = False
+            return None, error
+        outcomes[position] = record
+        return record, None
+
+    with references_locked():
+        _add_many(enumerate(records), prepare,
+                  lambda item: _hotel_of(item[1]))
+    return [outcomes[position] for position in range(len(records))]
+
+
+def _add_many(rows, prepare, hotel_of):
+    """
+    Agrega filas con add_many en la partición del hotel de cada una, con
+    una escritura por partición.
+
+    :param rows: Iterable con las filas de entrada.
+    :param prepare: Función (repositorio, fila) -> (registro, error).
+    :param hotel_of: Función que obtiene el hotel de una fila.
+    :return: Tupla (aceptados, errores) como la de Repository.add_many, en
+        el orden de las filas.
+    """
+    shards = reservation_shards()
+    if shards == 1:
+        return reservations_repository().add_many(rows, prepare)
+    groups = {}
+    for position, row in enumerate(rows):
+        groups.setdefault(shard_of(hotel_of(row), shards), []).append(
+            (position, row))
+    repositories = reservations_repositories()
+    accepted = []
+    errors = []
+
+    def prepare_row(repository, position_row):
+        """Valida una fila y recuerda su posición si se acepta."""
+        position, row = position_row
+        record, error = prepare(repository, row)
+        if not error:
+            accepted.append((position, record))
+        return record, error
+
+    for shard, group in groups.items():
+        _, shard_errors = repositories[shard].add_many(group, prepare_row)
+        errors.extend((group[index][0], error)
+                      for index, error in shard_errors)
+    accepted.sort(key=lambda item: item[0])
+    errors.sort(key=lambda item: item[0])
+    return [record for _, record in accepted], errors
+
+
+def _hotel_of(row):
+    """
+    Obtiene el hotel de una fila de entrada.
+
+    :param row: Diccionario con los datos de la reserva.
+    :return: Nombre del hotel o None si la fila no lo tiene.
+    """
+    return row.get("hotel_name") if isinstance(row, dict) else None
+
+
+def _can_book(repository, record, rooms):
+    """
+    Indica si una reserva puede aceptarse, incluida la integridad
+    referencial, y si no lo registra.
+
+    :param repository: Repositorio de las reservas.
+    :param record: Diccionario con los datos de la reserva.
+    :param rooms: Número de habitaciones del hotel o None.
+    :return: True si la reserva puede aceptarse.
+    """
+    error = _booking_error(repository, record, rooms)
+    if error:
+        logging.warning(error)
+        return False
+    return True
+
+
+def _booking_error(repository, record, rooms):
+    """
+    Obtiene el motivo por el que una reserva no puede aceptarse: la
+    integridad referencial o la disponibilidad.
+
+    :param repository: Repositorio de las reservas.
+    :param record: Diccionario con los datos de la reserva.
+    :param rooms: Número de habitaciones del hotel o None.
+    :return: Mensaje de error o None si la reserva puede aceptarse.
+    """
+    return (check_references(record)
+            or repository.view("availability").booking_error(record, rooms))
+
+
+def _normalize_dates(record):
+    """
+    Obtiene una copia de la reserva con las fechas en forma canónica.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Diccionario con las fechas normalizadas.
+    :raises ValueError: Si una fecha no es válida o la salida no es
+        posterior a la entrada.
+    """
+    check_in_date, check_out_date = normalize_stay(
+        record["check_in_date"], record.get("check_out_date"))
+    normalized = dict(record, check_in_date=check_in_date)
+    if "check_out_date" in record:
+        normalized["check_out_date"] = check_out_date
+    return normalized
+
+
+def _find_reservation(repository, key):
+    """
+    Busca una reserva por su clave. Si la fecha de entrada no está en forma
+    canónica, también se busca con la fecha normalizada.
+
+    :param repository: Repositorio de las reservas.
+    :param key: Tupla (cliente, hotel, habitación, fecha de entrada).
+    :return: Diccionario con la reserva o None si no existe.
+    """
+    return next(iter(_find_reservations(repository, key)), None)
+
+
+def _find_reservations(repository, key):
+    """
+    Busca todas las reservas con una clave, como _find_reservation.
+
+    :param repository: Repositorio de las reservas.
+    :param key: Tupla (cliente, hotel, habitación, fecha de entrada).
+    :return: Lista de diccionarios.
+    """
+    reservations = repository.find_all("key", key)
+    if reservations:
+        return reservations
+    try:
+        check_in_date = to_iso(key[3])
+    except ValueError:
+        return []
+    if check_in_date == key[3]:
+        return []
+    return repository.find_all("key", key[:3] + (check_in_date,))
+
+
+def _prepare_reservation(rooms, repository, row):
+    """
+    Valida una fila de reserva para una carga en lote, incluida la
+    disponibilidad frente a las reservas guardadas y a las del mismo lote.
+
+    :param rooms: Diccionario {hotel: número de habitaciones} del lote.
+    :param repository: Repositorio de las reservas.
+    :param row: Diccionario con los datos de la reserva.
+    :return: Tupla (registro, mensaje de error o None).
+    """
+    record, error = build_record(row, RESERVATION_FIELDS,
+                                 ("check_out_date",))
+    if error:
+        return None, error
+    try:
+        record = _normalize_dates(record)
+    except ValueError as error:
+        return None, str(error)
+    error = _booking_error(repository, record,
+                           rooms.get(record["hotel_name"]))
+    if error:
+        return None, error
+    return record, None
+
+
+def _date_value(value):
+    """
+    Obtiene el ordinal de una fecha para compararla en las consultas.
+
+    :param value: date o cadena ISO.
+    :return: Entero o None si la fecha no es válida.
+    """
+    try:
+        return to_ordinal(value)
+    except ValueError:
+        return None
+
+
+def _from_ordinal(ordinal):
+    """
+    Convierte un ordinal en fecha.
+
+    :param ordinal: Entero o None.
+    :return: date o None.
+    """
+    return None if ordinal is None else date.fromordinal(max(ordinal, 1))
+
+
+class ReservationQuery(Query):
+    """
+    Clase para consultar las reservas. Una condición sobre el hotel limita
+    la consulta a su partición y el orden por fecha de entrada recorre el
+    índice de fechas desde el cursor, de modo que cada página cuesta lo
+    mismo sin importar su número.
+    """
+
+    ENTITY = "reservation"
+    FIELDS = ("check_in_date", "hotel_name", "room_number", "customer_name",
+              "check_out_date")
+    ALIASES = {"check_in": "check_in_date", "check_out": "check_out_date",
+               "hotel": "hotel_name", "customer": "customer_name",
+               "room": "room_number"}
+    NORMALIZERS = {"check_in_date": _date_value,
+                   "check_out_date": _date_value}
+    INDEXES = {"customer_name": "customer", "hotel_name": "hotel"}
+    DEFAULT_ORDER = ("check_in_date",)
+
+    def _repositories(self):
+        """
+        Obtiene los repositorios de las particiones de los hoteles de la
+        consulta, o todos si no se filtra por hotel.
+
+        :return: Lista de Repository.
+        """
+        hotels = self._hotels()
+        if hotels is None:
+            return reservations_repositories()
+        repositories = {}
+        for hotel_name in hotels:
+            repository = reservations_repository(hotel_name)
+            repositories[id(repository)] = repository
+        return list(repositories.values())
+
+    def _stream(self, repository):
+        """
+        Obtiene las reservas candidatas de una partición. En orden
+        ascendente por fecha de entrada se recorre el índice de fechas
+        desde el límite inferior o el cursor, salvo que la consulta filtre
+        por cliente, cuyo índice da menos candidatos.
+
+        :param repository: Repository de la partición.
+        :return: Tupla (iterable de reservas, True si vienen ordenadas por
+            fecha de entrada).
+        """
+        field, descending = self._ordering()[0]
+        if (field != "check_in_date" or descending
+                or self._lookup(("customer_name",)) is not None):
+            return super()._stream(repository)
+        start, end = self._date_bounds()
+        hotels = self._hotels()
+        hotel_name = None
+        if hotels is not None and len(hotels) == 1:
+            hotel_name = next(iter(hotels))
+        view = repository.view("dates")
+        undated = ([] if start is not None or end is not None
+                   else view.undated(hotel_name))
+        if self._cursor is not None:
+            cursor_date = self._cursor["values"][0]
+            if not isinstance(cursor_date, int):
+                return undated, True
+            start = cursor_date if start is None else max(start, cursor_date)
+        return itertools.chain(
+            view.iter_check_ins(_from_ordinal(start), _from_ordinal(end),
+                                hotel_name), undated), True
+
+    def _hotels(self):
+        """
+        Obtiene los hoteles a los que se limita la consulta.
+
+        :return: Conjunto de nombres o None si no se filtra por hotel.
+        """
+        hotels = None
+        for field, operator, target in self._conditions:
+            if field == "hotel_name" and operator in ("eq", "in"):
+                names = {target} if operator == "eq" else set(target)
+                hotels = names if hotels is None else hotels & names
+        return hotels
+
+    def _date_bounds(self):
+        """
+        Obtiene los límites de la fecha de entrada que imponen las
+        condiciones.
+
+        :return: Tupla (primer ordinal, último ordinal), con None en los
+            límites que no se imponen.
+        """
+        lows = []
+        highs = []
+        for field, operator, target in self._conditions:
+            if field != "check_in_date":
+                continue
+            if operator == "eq":
+                lows.append(target)
+                highs.append(target)
+            elif operator == "in" and target:
+                lows.append(min(target))
+                highs.append(max(target))
+            elif operator in ("gt", "gte"):
+                lows.append(target + 1 if operator == "gt" else target)
+            elif operator in ("lt", "lte"):
+                highs.append(target - 1 if operator == "lt" else target)
+        return (max(lows) if lows else None,
+                min(highs) if highs else None)
 
 
 class Reservation:
@@ -11,6 +404,9 @@ class Reservation:
     Clase para representar una reserva en un hotel.
     """
 
+    __slots__ = ("customer_name", "hotel_name", "room_number",
+                 "check_in_date", "check_out_date")
+
     def __init__(self, customer_name, hotel_name, room_number,
                  check_in_date, check_out_date=None):
         """
@@ -28,41 +424,180 @@ class Reservation:
         self.check_in_date = check_in_date
         self.check_out_date = check_out_date
 
+    def to_dict(self):
+        """
+        Obtiene los datos de la reserva con el formato de
+        'reservations.json'.
+
+        :return: Diccionario con los datos de la reserva.
+        """
+        return {
+            "customer_name": self.customer_name,
+            "hotel_name": self.hotel_name,
+            "room_number": self.room_number,
+            "check_in_date": self.check_in_date,
+            "check_out_date": self.check_out_date
+        }
+
     @staticmethod
+    @metrics.timed("reservation")
     def create_reservation(customer_name, hotel_name, room_number,
                            check_in_date, check_out_date=None):
         """
         Crea una nueva reserva y la guarda en el archivo 'reservations.json'.
+        La reserva se rechaza si la habitación está ocupada en esas fechas o
+        si el hotel, de estar registrado, no tiene habitaciones libres.
 
         :param customer_name: Nombre del cliente que realiza la reserva.
         :param hotel_name: Nombre del hotel en el que se realiza la reserva.
         :param room_number: Número de habitación reservada.
-        :param check_in_date: Fecha de entrada.
-        :param check_out_date: Fecha de salida (opcional).
-        :return: La instancia de Reservation creada.
+        :param check_in_date: Fecha de entrada (date o cadena ISO).
+        :param check_out_date: Fecha de salida (opcional), posterior a la
+            de entrada.
+        :return: La instancia de Reservation creada, con las fechas en
+            forma 'AAAA-MM-DD', o None si la habitación no está disponible.
+        :raises ValueError: Si las fechas no son válidas.
         """
+        check_in_date, check_out_date = normalize_stay(check_in_date,
+                                                       check_out_date)
         new_reservation = Reservation(customer_name, hotel_name, room_number,
                                       check_in_date, check_out_date)
-        reservations_data = []
+        if not book_reservation(new_reservation.to_dict()):
+            return None
+        return new_reservation
 
-        if os.path.exists("reservations.json"):
-            with open("reservations.json", "r", encoding="utf-8") as file:
-                reservations_data = json.load(file)
+    @staticmethod
+    @metrics.timed("reservation")
+    def create_reservations(rows):
+        """
+        Crea varias reservas y las guarda con una sola escritura.
 
-        reservations_data.append({
-            "customer_name": new_reservation.customer_name,
-            "hotel_name": new_reservation.hotel_name,
-            "room_number": new_reservation.room_number,
-            "check_in_date": new_reservation.check_in_date,
-            "check_out_date": new_reservation.check_out_date
-        })
+        :param rows: Iterable de diccionarios con 'customer_name',
+            'hotel_name', 'room_number', 'check_in_date' y, opcionalmente,
+            'check_out_date'.
+        :return: BulkResult con las Reservation creadas y las filas
+            rechazadas.
+        """
+        rows = list(rows)
+        rooms = _rooms_by_hotel(rows, _hotel_of)
+        with references_locked():
+            records, errors = _add_many(
+                rows, functools.partial(_prepare_reservation, rooms),
+                _hotel_of)
+        created = [Reservation(**record) for record in records]
+        return BulkResult(created, errors)
 
-        with open("reservations.json", "w", encoding="utf-8") as file:
-            json.dump(reservations_data, file)
+    @staticmethod
+    @metrics.timed("reservation")
+    def import_reservations(path):
+        """
+        Importa reservas desde un archivo JSON con una lista de objetos.
 
-        return new_reservation
+        :param path: Ruta del archivo a importar.
+        :return: BulkResult con las reservas creadas y las filas rechazadas.
+        """
+        return Reservation.create_reservations(read_json(path))
+
+    @staticmethod
+    @metrics.timed("reservation")
+    def export_reservations(path):
+        """
+        Exporta todas las reservas a un archivo JSON.
+
+        :param path: Ruta del archivo de salida.
+        :return: Número de reservas exportadas.
+        """
+        return export_json(reservations_store().iter_records(), path)
+
+    @staticmethod
+    @metrics.timed("reservation")
+    def is_room_free(hotel_name, room_number, check_in_date,
+                     check_out_date=None):
+        """
+        Indica si una habitación está libre entre dos fechas, con la misma
+        regla que se aplica al reservar: si el hotel está registrado, no
+        debe estar lleno ninguna noche del intervalo.
+
+        :param hotel_name: Nombre del hotel.
+        :param room_number: Número de habitación.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: True si la habitación puede reservarse.
+        """
+        return reservations_repository(hotel_name).view(
+            "availability").is_bookable(hotel_name, room_number,
+                                        check_in_date, check_out_date,
+                                        _hotel_rooms(hotel_name))
 
     @staticmethod
+    @metrics.timed("reservation")
+    def free_rooms(hotel_name, check_in_date, check_out_date=None):
+        """
+        Obtiene las habitaciones libres de un hotel registrado entre dos
+        fechas.
+
+        :param hotel_name: Nombre del hotel.
+        :param check_in_date: Fecha de entrada.
+        :param check_out_date: Fecha de salida (opcional).
+        :return: Lista de números de habitación libres, vacía si el hotel
+            no está registrado.
+        """
+        rooms = _hotel_rooms(hotel_name)
+        if rooms is None:
+            return []
+        return reservations_repository(hotel_name).view(
+            "availability").free_rooms(hotel_name, rooms, check_in_date,
+                                       check_out_date)
+
+    @staticmethod
+    def query():
+        """
+        Crea una consulta perezosa sobre las reservas, por ejemplo
+        Reservation.query().where(hotel_name="Hotel A",
+        check_in__gte="2024-01-01").limit(50).page().
+
+        :return: ReservationQuery sin condiciones, ordenada por fecha de
+            entrada.
+        """
+        return ReservationQuery()
+
+    @staticmethod
+    @metrics.timed("reservation")
+    def check_ins_between(start_date, end_date, hotel_name=None):
+        """
+        Obtiene las reservas con fecha de entrada entre dos fechas, ambas
+        incluidas, con búsqueda binaria sobre el índice de fechas.
+
+        :param start_date: Primera fecha (date o cadena ISO).
+        :param end_date: Última fecha (date o cadena ISO).
+        :param hotel_name: Nombre del hotel (opcional). Sin él se consultan
+            todas las particiones en paralelo.
+        :return: Lista de diccionarios ordenados por fecha de entrada.
+        """
+        if hotel_name is not None:
+            repositories = [reservations_repository(hotel_name)]
+        else:
+            repositories = reservations_repositories()
+        found = fan_out(
+            lambda repository: repository.view("dates").check_ins_between(
+                start_date, end_date, hotel_name), repositories)
+        return [dict(reservation) for reservation in heapq.merge(
+            *found, key=lambda record: to_ordinal(record["check_in_date"]))]
+
+    @staticmethod
+    @metrics.timed("reservation")
+    def arrivals(hotel_name, day):
+        """
+        Obtiene las reservas de un hotel que entran en un día.
+
+        :param hotel_name: Nombre del hotel.
+        :param day: Fecha de entrada (date o cadena ISO).
+        :return: Lista de diccionarios con los datos de las reservas.
+        """
+        return Reservation.check_ins_between(day, day, hotel_name)
+
+    @staticmethod
+    @metrics.timed("reservation")
     def cancel_reservation(customer_name, hotel_name,
                            room_number, check_in_date):
         """
@@ -74,30 +609,92 @@ class Reservation:
         :param room_number: Número de habitación de la reserva a cancelar.
         :param check_in_date: Fecha de entrada de la reserva a cancelar.
         """
-        reservations_data = Reservation.load_reservations_data()
-        reservation_to_cancel = next(
-            (reservation for reservation in reservations_data
-             if reservation["customer_name"] == customer_name
-             and reservation["hotel_name"] == hotel_name
-             and reservation["room_number"] == room_number
-             and reservation["check_in_date"] == check_in_date), None)
+        repository = reservations_repository(hotel_name)
+        with repository.locked():
+            reservation_to_cancel = _find_reservation(
+                repository,
+                (customer_name, hotel_name, room_number, check_in_date))
+            if reservation_to_cancel:
+                repository.remove(reservation_to_cancel)
 
         if reservation_to_cancel:
-            reservations_data.remove(reservation_to_cancel)
-            with open("reservations.json", "w", encoding="utf-8") as file:
-                json.dump(reservations_data, file)
             logging.info("Reserva cancelada exitosamente.")
         else:
             logging.warning("Reserva no encontrada.")
 
     @staticmethod
+    @metrics.timed("reservation")
+    def cancel_reservations(keys):
+        """
+        Cancela varias reservas con una sola escritura por partición. Una
+        clave repetida cancela otra reserva idéntica si la hay.
+
+        :param keys: Iterable de tuplas (cliente, hotel, habitación, fecha
+            de entrada).
+        :return: Lista con True por cada reserva cancelada y False por cada
+            una no encontrada, en el orden de keys.
+        """
+        keys = [tuple(key) for key in keys]
+        outcomes = [False] * len(keys)
+        shards = reservation_shards()
+        groups = {}
+        for position, key in enumerate(keys):
+            groups.setdefault(shard_of(key[1], shards), []).append(position)
+        repositories = reservations_repositories()
+        for shard, positions in groups.items():
+            repository = repositories[shard]
+            with repository.locked():
+                chosen = {}
+                for position in positions:
+                    for reservation in _find_reservations(repository,
+                                                          keys[position]):
+                        if id(reservation) not in chosen:
+                            chosen[id(reservation)] = reservation
+                            outcomes[position] = True
+                            break
+                if chosen:
+                    repository.remove_many(list(chosen.values()))
+        logging.info("%d de %d reservas canceladas.", sum(outcomes),
+                     len(keys))
+        return outcomes
+
+    @staticmethod
+    @metrics.timed("reservation")
     def load_reservations_data():
         """
         Carga los datos de las reservas desde el archivo 'reservations.json'.
+        El archivo solo se vuelve a leer si cambió desde la última carga y
+        los registros no se copian: para modificar uno, usar dict(registro).
 
-        :return: Lista de diccionarios con los datos de las reservas.
+        :return: Lista de vistas de solo lectura con los datos de las
+            reservas.
         """
-        if os.path.exists("reservations.json"):
-            with open("reservations.json", "r", encoding="utf-8") as file:
-                return json.load(file)
-        return []
+        return list(cached_records(reservations_store()))
+
+    @staticmethod
+    @metrics.timed("reservation")
+    def load_reservations_snapshot():
+        """
+        Abre las reservas desde la instantánea binaria
+        'reservations.json.snap' con mmap, sin leer todos los registros. La
+        instantánea se regenera si el archivo 'reservations.json' cambió.
+
+        :return: BinarySnapshot que se usa como la lista de load_*_data y
+            permite buscar con find('hotel_name' o 'customer_name', valor).
+        """
+        return open_snapshot(reservations_store(),
+                             ("hotel_name", "customer_name"))
+
+    @staticmethod
+    def iter_reservations(predicate=None):
+        """
+        Recorre las reservas del archivo 'reservations.json' una a una, sin
+        cargar el archivo completo en memoria.
+
+        :param predicate: Función que recibe una reserva y devuelve True si
+            debe incluirse (opcional).
+        :return: Generador de diccionarios con los datos de las reservas.
+        """
+        for reservation in reservations_store().iter_records():
+            if predicate is None or predicate(reservation):
+                yield reservation
@@ -0,0 +1,76 @@
+"""
+Módulo con utilidades para importar y exportar registros en lote.
+"""
+import json
+from collections import namedtuple
+
+
+class BulkResult(namedtuple("BulkResult", ("created", "errors"))):
+    """
+    Clase para representar el resultado de una carga en lote: created es
+    la lista de objetos creados y errors la de tuplas (posición, mensaje)
+    de las filas rechazadas.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        """
+        Representa el resultado de forma resumida.
+
+        :return: Cadena con el número de filas creadas y rechazadas.
+        """
+        return (f"BulkResult(created={len(self.created)}, "
+                f"errors={len(self.errors)})")
+
+
+def build_record(row, fields, optional=()):
+    """
+    Construye un registro a partir de una fila de entrada.
+
+    :param row: Diccionario con los datos de la fila.
+    :param fields: Campos obligatorios del registro.
+    :param optional: Campos opcionales del registro.
+    :return: Tupla (registro, mensaje de error o None).
+    """
+    if not isinstance(row, dict):
+        return None, "La fila no es un objeto JSON."
+    for field in fields:
+        if row.get(field) in (None, ""):
+            return None, f"Falta el campo '{field}'."
+    record = {field: row[field] for field in fields}
+    for field in optional:
+        record[field] = row.get(field)
+    return record, None
+
+
+def read_json(path):
+    """
+    Lee una lista de registros desde un archivo JSON.
+
+    :param path: Ruta del archivo.
+    :return: Lista de diccionarios.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def export_json(records, path):
+    """
+    Escribe registros en un archivo JSON uno a uno, sin construir el
+    documento completo en memoria.
+
+    :param records: Iterable de diccionarios.
+    :param path: Ruta del archivo de salida.
+    :return: Número de registros escritos.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[")
+        for record in records:
+            if count:
+                file.write(", ")
+            file.write(json.dumps(record))
+            count += 1
+        file.write("]")
+    return count
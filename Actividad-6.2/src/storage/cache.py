@@ -0,0 +1,95 @@
+"""
+Módulo con una caché de lectura compartida en el proceso.
+
+Cada entrada se guarda junto con la firma del almacén al momento de
+leerla; para los archivos JSON la firma incluye inodo, tamaño y mtime de la
+instantánea y del diario. Mientras la firma no cambie, las lecturas se
+sirven sin volver a interpretar el archivo.
+
+Los registros en caché se entregan como vistas de solo lectura
+(MappingProxyType) compartidas entre lecturas, sin copiarlos en cada
+acierto; quien necesite modificar uno debe copiarlo con dict(registro).
+"""
+import threading
+from types import MappingProxyType
+
+
+class FileCache:
+    """
+    Clase para representar una caché de datos interpretados por ruta.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una caché vacía con contadores en cero.
+        """
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, signature, load):
+        """
+        Obtiene los datos de una clave, leyéndolos solo si la firma cambió.
+
+        :param key: Clave de la entrada, normalmente la ruta del archivo.
+        :param signature: Firma actual de los datos en disco.
+        :param load: Función sin argumentos que lee los datos.
+        :return: Datos guardados en la caché.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = load()
+        with self._lock:
+            self._entries[key] = (signature, value)
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Descarta una entrada o, sin clave, toda la caché.
+
+        :param key: Clave a descartar (opcional).
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Obtiene los contadores de la caché.
+
+        :return: Diccionario con 'hits', 'misses' y 'entries'.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+    def reset_stats(self):
+        """
+        Reinicia los contadores de aciertos y fallos.
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+CACHE = FileCache()
+
+
+def cached_records(store):
+    """
+    Obtiene los registros de un almacén a través de la caché del proceso.
+    El resultado es compartido entre lecturas y no se copia.
+
+    :param store: Instancia de Store.
+    :return: Tupla de vistas de solo lectura de los registros.
+    """
+    return CACHE.get(store.identity(), store.signature(),
+                     lambda: tuple(MappingProxyType(record)
+                                   for record in store.load()))
@@ -0,0 +1,274 @@
+"""
+Módulo con un registro de cambios para los consumidores externos.
+
+Cada alta, modificación y baja de clientes, hoteles y reservas se anexa
+como una línea JSON en un archivo de solo-anexado, con un número de
+secuencia creciente que comparten todos los procesos:
+
+    {"seq": 7, "time": 1700000000.0, "entity": "reservation",
+     "op": "create", "before": null, "after": {...}}
+
+Los consumidores guardan el último 'seq' que procesaron y leen solo lo
+posterior con read(after) o tail(after). Como las secuencias crecen con la
+posición en el archivo, el punto de partida se encuentra con búsqueda
+binaria sobre los bytes, sin recorrer el archivo.
+
+Los repositorios anexan los eventos antes de escribir en su almacén, de
+modo que todo cambio guardado tiene su evento aunque el proceso termine a
+mitad. Si la escritura del almacén falla se anexan los eventos inversos;
+si el proceso termina entre el evento y la escritura, queda un evento de
+un cambio que no se guardó, así que los consumidores deben tolerar
+eventos sin efecto.
+"""
+import json
+import os
+import time
+from src.metrics import metrics
+from src.storage.concurrency import (FileLock, GroupCommit, append_lines,
+                                     fsync_path)
+
+OPERATIONS = ("create", "update", "delete")
+
+_GROUP_COMMITS = {}
+_LAST = {}
+
+
+class ChangeFeed:
+    """
+    Clase para representar el registro de cambios en un archivo.
+    """
+
+    def __init__(self, path, durable=False):
+        """
+        Inicializa el registro.
+
+        :param path: Ruta del archivo de cambios.
+        :param durable: Si es True, cada anexado espera a estar en disco;
+            los anexados concurrentes se agrupan en un solo fsync.
+        """
+        self.path = path
+        self.durable = durable
+
+    def append(self, entity, changes):
+        """
+        Anexa cambios con números de secuencia consecutivos.
+
+        :param entity: 'customer', 'hotel' o 'reservation'.
+        :param changes: Lista de tuplas (operación, anterior, nuevo) con el
+            registro anterior o None en las altas y el nuevo o None en las
+            bajas.
+        :return: Lista con los eventos anexados.
+        """
+        if not changes:
+            return []
+        commit = self._commit()
+        with FileLock(self.path) as lock:
+            sequence = self.last_sequence()
+            now = time.time()
+            events = []
+            for operation, before, after in changes:
+                if operation not in OPERATIONS:
+                    raise ValueError(f"Operación desconocida: {operation}")
+                sequence += 1
+                events.append({"seq": sequence, "time": now,
+                               "entity": entity, "op": operation,
+                               "before": before, "after": after})
+            data = "".join(json.dumps(event) + "\n"
+                           for event in events).encode("utf-8")
+            ticket = commit.queue(data, self.durable)
+            _LAST[self._identity()] = (self._stat(), sequence)
+            lock.before_release(self._flush)
+            lock.defer(lambda: commit.wait(ticket))
+        return events
+
+    def _flush(self):
+        """
+        Anexa de una vez los eventos encolados. Se llama con el candado del
+        registro tomado.
+        """
+        def write(data):
+            """Anexa los eventos encolados al archivo."""
+            with metrics.timer("write", dataset="changes"):
+                append_lines(self.path, data)
+            metrics.increment("bytes_written", len(data), dataset="changes")
+
+        self._commit().flush(write, lambda: fsync_path(self.path))
+
+    def _commit(self):
+        """
+        Obtiene la cola de escrituras del registro, compartida en el
+        proceso.
+
+        :return: Instancia de GroupCommit.
+        """
+        identity = self._identity()
+        commit = _GROUP_COMMITS.get(identity)
+        if commit is None:
+            commit = _GROUP_COMMITS.setdefault(identity, GroupCommit())
+        return commit
+
+    def last_sequence(self):
+        """
+        Obtiene el número de secuencia del último evento.
+
+        :return: Entero, 0 si el registro está vacío.
+        """
+        stat = self._stat()
+        cached = _LAST.get(self._identity())
+        if cached is not None and cached[0] == stat:
+            return cached[1]
+        sequence = 0
+        if stat is not None:
+            with open(self.path, "rb") as file:
+                sequence = _last_sequence(file, stat[1])
+        _LAST[self._identity()] = (stat, sequence)
+        return sequence
+
+    def read(self, after=0, limit=None):
+        """
+        Recorre los eventos posteriores a una secuencia, hasta el final
+        actual del archivo.
+
+        :param after: Último número de secuencia ya procesado.
+        :param limit: Número máximo de eventos (opcional).
+        :return: Generador de diccionarios con los eventos.
+        """
+        if not os.path.exists(self.path):
+            return
+        count = 0
+        with open(self.path, "rb") as file:
+            file.seek(_offset_after(file, os.fstat(file.fileno()).st_size,
+                                    after))
+            for line in file:
+                event = _parse(line)
+                if event is None or event["seq"] <= after:
+                    continue
+                yield event
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def tail(self, after=0, poll_interval=0.5, idle_timeout=None):
+        """
+        Recorre los eventos posteriores a una secuencia y sigue esperando
+        los nuevos, como 'tail -f'.
+
+        :param after: Último número de secuencia ya procesado.
+        :param poll_interval: Segundos entre revisiones del archivo.
+        :param idle_timeout: Segundos sin eventos nuevos tras los cuales el
+            generador termina (opcional; sin él sigue indefinidamente).
+        :return: Generador de diccionarios con los eventos.
+        """
+        idle_since = time.monotonic()
+        while True:
+            for event in self.read(after):
+                after = event["seq"]
+                idle_since = time.monotonic()
+                yield event
+            if (idle_timeout is not None
+                    and time.monotonic() - idle_since >= idle_timeout):
+                return
+            time.sleep(poll_interval)
+
+    def _identity(self):
+        """
+        Obtiene la ruta absoluta del registro.
+
+        :return: Cadena.
+        """
+        return os.path.abspath(self.path)
+
+    def _stat(self):
+        """
+        Obtiene una firma del archivo que cambia con cada anexado.
+
+        :return: Tupla (inodo, tamaño) o None si el archivo no existe.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size)
+
+
+def _parse(line):
+    """
+    Interpreta una línea del registro. Las líneas incompletas, que deja un
+    anexado interrumpido, se ignoran.
+
+    :param line: Línea en bytes.
+    :return: Diccionario con el evento o None.
+    """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) and "seq" in event else None
+
+
+def _event_at(file, position):
+    """
+    Lee el primer evento válido cuya línea empieza en una posición o
+    después.
+
+    :param file: Archivo abierto en modo binario.
+    :param position: Posición en bytes.
+    :return: Tupla (inicio de la línea, evento o None si no hay más).
+    """
+    if position > 0:
+        file.seek(position - 1)
+        file.readline()
+    else:
+        file.seek(0)
+    while True:
+        start = file.tell()
+        line = file.readline()
+        if not line:
+            return start, None
+        event = _parse(line)
+        if event is not None:
+            return start, event
+
+
+def _offset_after(file, size, after):
+    """
+    Busca con búsqueda binaria la posición de la primera línea cuyo número
+    de secuencia es mayor que after.
+
+    :param file: Archivo abierto en modo binario.
+    :param size: Tamaño del archivo.
+    :param after: Número de secuencia.
+    :return: Posición en bytes.
+    """
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        _, event = _event_at(file, middle)
+        if event is None or event["seq"] > after:
+            high = middle
+        else:
+            low = middle + 1
+    return _event_at(file, low)[0]
+
+
+def _last_sequence(file, size):
+    """
+    Obtiene el número de secuencia de la última línea válida.
+
+    :param file: Archivo abierto en modo binario.
+    :param size: Tamaño del archivo.
+    :return: Entero, 0 si no hay eventos.
+    """
+    block = 4096
+    end = size
+    while end > 0:
+        start = max(0, end - block)
+        file.seek(start)
+        lines = file.read(size - start).splitlines()
+        for line in reversed(lines[1:] if start else lines):
+            event = _parse(line)
+            if event is not None:
+                return event["seq"]
+        end = start
+        block *= 2
+    return 0
@@ -0,0 +1,330 @@
+"""
+Módulo con las primitivas de concurrencia de los almacenes.
+
+- FileLock: candado consultivo entre procesos (fcntl.flock sobre
+  '<archivo>.lock') y reentrante dentro del proceso. Entre hilos del
+  proceso se pasa sin soltar el de fcntl.
+- atomic_write: escribe un archivo completo en un temporal y lo reemplaza
+  con os.replace, de modo que nunca queda truncado.
+- GroupCommit: agrupa las escrituras de varios hilos en una sola escritura
+  y una sola llamada a os.fsync.
+- append_lines: anexa líneas a un archivo de solo-anexado.
+"""
+import os
+import stat
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - plataformas sin fcntl
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+_STATES = {}
+_STATES_LOCK = threading.Lock()
+
+MAX_HANDOFFS = 32
+
+
+class _LockState:
+    # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Clase auxiliar con el estado compartido de un candado en el proceso.
+    """
+
+    def __init__(self):
+        """
+        Inicializa el estado sin dueño.
+        """
+        self.condition = threading.Condition()
+        self.owner = None
+        self.depth = 0
+        self.waiting = 0
+        self.handoffs = 0
+        self.descriptor = None
+        self.before_release = []
+        self.after_release = []
+
+
+class FileLock:
+    """
+    Clase para representar un candado exclusivo sobre un archivo.
+
+    Si al soltarlo hay otros hilos del proceso esperando, el candado pasa
+    a uno de ellos sin soltar el de fcntl (hasta MAX_HANDOFFS veces
+    seguidas, para no dejar esperando a los demás procesos). Las tareas
+    programadas con before_release() corren solo cuando el proceso suelta
+    de verdad el candado de fcntl.
+    """
+
+    def __init__(self, path):
+        """
+        Inicializa el candado.
+
+        :param path: Ruta del archivo protegido.
+        """
+        self.path = os.path.abspath(path) + LOCK_SUFFIX
+        with _STATES_LOCK:
+            self._state = _STATES.get(self.path)
+            if self._state is None:
+                self._state = _STATES[self.path] = _LockState()
+
+    def __enter__(self):
+        """
+        Adquiere el candado; bloquea hasta obtenerlo.
+
+        :return: El propio candado.
+        """
+        state = self._state
+        thread = threading.get_ident()
+        with state.condition:
+            if state.owner == thread:
+                state.depth += 1
+                return self
+            state.waiting += 1
+            while state.owner is not None:
+                state.condition.wait()
+            state.waiting -= 1
+            state.owner = thread
+            state.depth = 1
+            if state.descriptor is not None:
+                return self
+        try:
+            descriptor = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_EX)
+        except BaseException:
+            self._release_owner()
+            raise
+        state.descriptor = descriptor
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Libera el candado. Al soltarlo por completo lo pasa a otro hilo
+        del proceso o, si nadie espera, ejecuta las tareas de
+        before_release() y suelta el candado de fcntl; después ejecuta las
+        tareas diferidas con defer().
+        """
+        state = self._state
+        if state.depth > 1:
+            state.depth -= 1
+            return False
+        with state.condition:
+            handoff = state.waiting > 0 and state.handoffs < MAX_HANDOFFS
+        try:
+            if handoff:
+                state.handoffs += 1
+            else:
+                _run_all(state.before_release)
+        finally:
+            if not handoff:
+                state.handoffs = 0
+                if fcntl is not None:
+                    fcntl.flock(state.descriptor, fcntl.LOCK_UN)
+                os.close(state.descriptor)
+                state.descriptor = None
+            callbacks, state.after_release = state.after_release, []
+            self._release_owner()
+        for callback in callbacks:
+            callback()
+        return False
+
+    def before_release(self, callback):
+        """
+        Programa una tarea para justo antes de que el proceso suelte el
+        candado de fcntl, con el candado todavía tomado. Una misma tarea
+        programada varias veces corre una sola vez.
+
+        :param callback: Función sin argumentos.
+        """
+        if callback not in self._state.before_release:
+            self._state.before_release.append(callback)
+
+    def defer(self, callback):
+        """
+        Programa una tarea para cuando el hilo dueño suelte el candado.
+
+        :param callback: Función sin argumentos.
+        """
+        self._state.after_release.append(callback)
+
+    def _release_owner(self):
+        """
+        Deja el candado del proceso sin dueño y despierta a un hilo que
+        espere.
+        """
+        state = self._state
+        with state.condition:
+            state.depth = 0
+            state.owner = None
+            state.condition.notify()
+
+
+def _run_all(callbacks):
+    """
+    Ejecuta y vacía una lista de tareas, incluidas las que se agreguen
+    mientras corre.
+
+    :param callbacks: Lista de funciones sin argumentos.
+    """
+    while callbacks:
+        callbacks.pop(0)()
+
+
+class GroupCommit:
+    """
+    Clase para agrupar las escrituras de varios hilos en un archivo de
+    solo-anexado: cada escritura se encola con queue() y quien suelta el
+    candado del archivo llama a flush(), que escribe todo lo encolado con
+    una sola escritura y, si alguna lo pidió, un solo os.fsync. Cada hilo
+    espera con wait() a que su escritura quede hecha.
+    """
+
+    def __init__(self):
+        """
+        Inicializa una cola vacía y los contadores de escrituras.
+        """
+        self._condition = threading.Condition()
+        self._pending = []
+        self._size = 0
+        self._flushed = 0
+        self._failures = []
+        self.writes = 0
+        self.syncs = 0
+
+    def queue(self, data, durable=False):
+        """
+        Encola datos para la siguiente escritura. Debe llamarse con el
+        candado del archivo tomado.
+
+        :param data: Bytes a anexar.
+        :param durable: Si es True, la escritura debe llegar al disco.
+        :return: Turno de la escritura, para wait().
+        """
+        with self._condition:
+            self._pending.append((data, durable))
+            self._size += len(data)
+            return self._flushed + len(self._pending)
+
+    def pending_bytes(self):
+        """
+        Obtiene el tamaño de los datos encolados que aún no se escriben.
+
+        :return: Número de bytes.
+        """
+        return self._size
+
+    def flush(self, write, sync):
+        """
+        Escribe de una vez todo lo encolado. Debe llamarse con el candado
+        del archivo tomado.
+
+        :param write: Función que recibe los bytes y los anexa al archivo.
+        :param sync: Función sin argumentos que sincroniza el archivo.
+        :return: True si había algo que escribir.
+        """
+        with self._condition:
+            if not self._pending:
+                return False
+            data = b"".join(data for data, _ in self._pending)
+            durable = any(durable for _, durable in self._pending)
+            first = self._flushed + 1
+            last = self._flushed + len(self._pending)
+            self._pending = []
+            self._size = 0
+        try:
+            write(data)
+            self.writes += 1
+            if durable:
+                sync()
+                self.syncs += 1
+        except BaseException as error:
+            with self._condition:
+                self._failures.append((first, last, error))
+                self._flushed = last
+                self._condition.notify_all()
+            raise
+        with self._condition:
+            self._flushed = last
+            self._condition.notify_all()
+        return True
+
+    def wait(self, ticket):
+        """
+        Espera a que se escriba lo encolado en un turno.
+
+        :param ticket: Turno devuelto por queue().
+        :raises OSError: Si la escritura del turno falló.
+        """
+        with self._condition:
+            while self._flushed < ticket:
+                self._condition.wait()
+            for first, last, error in self._failures:
+                if first <= ticket <= last:
+                    raise OSError(f"No se pudo escribir: {error}") from error
+
+
+def fsync_path(path):
+    """
+    Sincroniza con el disco el contenido de un archivo.
+
+    :param path: Ruta del archivo.
+    """
+    try:
+        descriptor = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def append_lines(path, data):
+    """
+    Anexa líneas a un archivo. Si un anexado interrumpido dejó la última
+    línea incompleta, primero la termina para no pegarle la nueva.
+
+    :param path: Ruta del archivo.
+    :param data: Bytes con una o más líneas terminadas en salto de línea.
+    """
+    with open(path, "a+b") as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell() > 0:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                file.write(b"\n")
+        file.write(data)
+
+
+def atomic_write(path, write, binary=False):
+    """
+    Escribe un archivo completo de forma atómica: los lectores ven el
+    contenido anterior o el nuevo, nunca uno truncado.
+
+    :param path: Ruta del archivo.
+    :param write: Función que recibe el archivo temporal abierto y escribe
+        el contenido.
+    :param binary: Si es True el archivo se abre en modo binario; si no,
+        en modo texto UTF-8.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(
+        dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        mode = (stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path)
+                else 0o644)
+        os.chmod(temporary, mode)
+        with (os.fdopen(descriptor, "wb") if binary
+              else os.fdopen(descriptor, "w", encoding="utf-8")) as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
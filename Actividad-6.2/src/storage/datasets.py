@@ -0,0 +1,367 @@
+"""
+Módulo que define los almacenes y repositorios de clientes, hoteles y
+reservas.
+
+El respaldo se elige por configuración: 'json' (predeterminado) usa los
+archivos JSON con diario y 'sqlite' usa una base de datos SQLite. Puede
+fijarse con las variables de entorno MNA_STORAGE_BACKEND y MNA_SQLITE_PATH
+o llamando a configure(). Con MNA_DURABLE_WRITES=1 (o durable=True) cada
+escritura del respaldo 'json' espera a estar en disco; las esperas de
+escritores concurrentes se agrupan en un solo fsync.
+
+La integridad referencial entre reservas, clientes y hoteles se elige con
+MNA_INTEGRITY o configure(integrity=...): 'off' (predeterminado) no valida,
+'restrict' exige que el cliente y el hotel existan e impide borrarlos si
+tienen reservas, y 'cascade' también valida pero borra sus reservas.
+
+Cada alta, modificación y baja puede anexarse además a un registro de
+cambios (ver src.storage.changefeed). Está desactivado por omisión, porque
+el archivo crece sin límite; se activa con la ruta del registro en
+MNA_CHANGE_FEED o configure(feed_path=...), y una ruta vacía lo vuelve a
+desactivar.
+
+Las reservas pueden repartirse en particiones por hotel (ver
+src.storage.sharding). El número de particiones lo fija el manifiesto
+'reservations.json.shards' (o '<base SQLite>.shards'), que escribe la
+herramienta src.storage.reshard; sin manifiesto hay una sola partición.
+"""
+import os
+import re
+from functools import partial
+from src.availability.availability import RoomAvailability
+from src.dates.dates import DateIndex
+from src.storage.changefeed import ChangeFeed
+from src.storage.journal import JournalStore
+from src.storage.repository import Repository
+from src.storage.sharding import (MANIFEST_SUFFIX, ShardedStore,
+                                  read_shard_count, shard_of, shard_path)
+from src.storage.sorted_index import SortedIndex
+from src.storage.sqlite_store import SqliteStore
+
+CUSTOMERS_FILE = "customers.json"
+HOTELS_FILE = "hotels.json"
+RESERVATIONS_FILE = "reservations.json"
+
+CUSTOMER_COLUMNS = ("name", "email", "phone")
+HOTEL_COLUMNS = ("name", "location", "rooms")
+RESERVATION_COLUMNS = ("customer_name", "hotel_name", "room_number",
+                       "check_in_date", "check_out_date")
+
+BACKENDS = ("json", "sqlite")
+INTEGRITY_POLICIES = ("off", "restrict", "cascade")
+
+_NON_DIGITS = re.compile(r"\D")
+
+_CONFIG = {
+    "backend": os.environ.get("MNA_STORAGE_BACKEND", "json"),
+    "sqlite_path": os.environ.get("MNA_SQLITE_PATH", "reservations.db"),
+    "durable": os.environ.get("MNA_DURABLE_WRITES") == "1",
+    "integrity": os.environ.get("MNA_INTEGRITY", "off"),
+    "change_feed": os.environ.get("MNA_CHANGE_FEED", ""),
+}
+
+
+def configure(backend=None, sqlite_path=None, durable=None, integrity=None,
+              feed_path=None):
+    """
+    Configura el respaldo de almacenamiento, la integridad referencial y
+    el registro de cambios de todo el proceso.
+
+    :param backend: 'json' o 'sqlite' (opcional).
+    :param sqlite_path: Ruta de la base de datos SQLite (opcional).
+    :param durable: Si las escrituras JSON esperan a estar en disco
+        (opcional).
+    :param integrity: 'off', 'restrict' o 'cascade' (opcional).
+    :param feed_path: Ruta del registro de cambios; '' lo desactiva
+        (opcional).
+    """
+    if backend is not None:
+        if backend not in BACKENDS:
+            raise ValueError(f"Respaldo desconocido: {backend}")
+        _CONFIG["backend"] = backend
+    if sqlite_path is not None:
+        _CONFIG["sqlite_path"] = sqlite_path
+    if durable is not None:
+        _CONFIG["durable"] = durable
+    if integrity is not None:
+        if integrity not in INTEGRITY_POLICIES:
+            raise ValueError(f"Política de integridad desconocida: "
+                             f"{integrity}")
+        _CONFIG["integrity"] = integrity
+    if feed_path is not None:
+        _CONFIG["change_feed"] = feed_path
+
+
+def _make_store(json_file, table, columns, indexes, sqlite_path=None):
+    """
+    Construye el almacén de un conjunto de datos según la configuración.
+
+    :param json_file: Archivo JSON del respaldo 'json'.
+    :param table: Tabla del respaldo 'sqlite'.
+    :param columns: Campos de los registros.
+    :param indexes: Tuplas de columnas a indexar en SQLite.
+    :param sqlite_path: Base de datos del respaldo 'sqlite' (opcional; por
+        omisión la configurada).
+    :return: Instancia de Store.
+    """
+    if _CONFIG["backend"] == "sqlite":
+        return SqliteStore(sqlite_path or _CONFIG["sqlite_path"], table,
+                           columns, indexes)
+    return JournalStore(json_file, durable=_CONFIG["durable"])
+
+
+def reservation_key(record):
+    """
+    Obtiene la clave con la que se identifica una reserva al cancelarla.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Tupla (cliente, hotel, habitación, fecha de entrada).
+    """
+    return (record["customer_name"], record["hotel_name"],
+            record["room_number"], record["check_in_date"])
+
+
+def normalize_email(email):
+    """
+    Normaliza un correo electrónico para compararlo.
+
+    :param email: Correo electrónico.
+    :return: Correo sin espacios y en minúsculas, o None si no es cadena.
+    """
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower()
+
+
+def normalize_phone(phone):
+    """
+    Normaliza un teléfono para compararlo.
+
+    :param phone: Número de teléfono.
+    :return: Cadena solo con los dígitos, o None si no es cadena ni número.
+    """
+    if isinstance(phone, int):
+        phone = str(phone)
+    if not isinstance(phone, str):
+        return None
+    return phone if phone.isdecimal() else _NON_DIGITS.sub("", phone)
+
+
+def _email(record):
+    """
+    Obtiene el correo normalizado de un cliente.
+
+    :param record: Diccionario con los datos del cliente.
+    :return: Correo normalizado.
+    """
+    return normalize_email(record.get("email"))
+
+
+def _phone(record):
+    """
+    Obtiene el teléfono normalizado de un cliente.
+
+    :param record: Diccionario con los datos del cliente.
+    :return: Teléfono normalizado.
+    """
+    return normalize_phone(record.get("phone"))
+
+
+def _name(record):
+    """
+    Obtiene el nombre de un cliente o de un hotel.
+
+    :param record: Diccionario con los datos del registro.
+    :return: Nombre del registro.
+    """
+    return record["name"]
+
+
+def change_feed():
+    """
+    Obtiene el registro de cambios configurado.
+
+    :return: ChangeFeed o None si está desactivado.
+    """
+    if not _CONFIG["change_feed"]:
+        return None
+    return ChangeFeed(_CONFIG["change_feed"], _CONFIG["durable"])
+
+
+def _publish(entity, changes):
+    """
+    Anexa al registro de cambios las escrituras de un repositorio.
+
+    :param entity: 'customer', 'hotel' o 'reservation'.
+    :param changes: Lista de tuplas (operación, anterior, nuevo).
+    """
+    feed = change_feed()
+    if feed is not None:
+        feed.append(entity, changes)
+
+
+def integrity_policy():
+    """
+    Obtiene la política de integridad referencial configurada.
+
+    :return: 'off', 'restrict' o 'cascade'.
+    """
+    return _CONFIG["integrity"]
+
+
+def _customer_name(record):
+    """
+    Obtiene el cliente de una reserva.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Nombre del cliente.
+    """
+    return record["customer_name"]
+
+
+def _hotel_name(record):
+    """
+    Obtiene el hotel de una reserva.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Nombre del hotel.
+    """
+    return record["hotel_name"]
+
+
+def customers_store():
+    """
+    Obtiene el almacén de los clientes.
+
+    :return: Store de 'customers.json' o de la tabla 'customers'.
+    """
+    return _make_store(CUSTOMERS_FILE, "customers", CUSTOMER_COLUMNS,
+                       [("name",)])
+
+
+def hotels_store():
+    """
+    Obtiene el almacén de los hoteles.
+
+    :return: Store de 'hotels.json' o de la tabla 'hotels'.
+    """
+    return _make_store(HOTELS_FILE, "hotels", HOTEL_COLUMNS, [("name",)])
+
+
+def shards_manifest():
+    """
+    Obtiene la ruta del manifiesto con el número de particiones de las
+    reservas.
+
+    :return: Ruta del manifiesto.
+    """
+    if _CONFIG["backend"] == "sqlite":
+        return _CONFIG["sqlite_path"] + MANIFEST_SUFFIX
+    return RESERVATIONS_FILE + MANIFEST_SUFFIX
+
+
+def reservation_shards():
+    """
+    Obtiene el número de particiones vigente de las reservas.
+
+    :return: Entero, 1 si no están particionadas.
+    """
+    return read_shard_count(shards_manifest())
+
+
+def reservation_shard_store(shard, shards):
+    """
+    Obtiene el almacén de una partición de las reservas.
+
+    :param shard: Número de la partición.
+    :param shards: Número de particiones.
+    :return: Store de 'reservations.json' o 'reservations.<i>-of-<n>.json',
+        o de la tabla 'reservations' de la base correspondiente.
+    """
+    return _make_store(shard_path(RESERVATIONS_FILE, shard, shards),
+                       "reservations", RESERVATION_COLUMNS,
+                       [("customer_name",),
+                        ("hotel_name", "room_number", "check_in_date")],
+                       shard_path(_CONFIG["sqlite_path"], shard, shards))
+
+
+def reservations_store():
+    """
+    Obtiene el almacén de las reservas.
+
+    :return: Store de 'reservations.json' o de la tabla 'reservations'; si
+        hay varias particiones, un ShardedStore que las une.
+    """
+    shards = reservation_shards()
+    if shards == 1:
+        return reservation_shard_store(0, 1)
+    return ShardedStore(
+        [reservation_shard_store(shard, shards) for shard in range(shards)],
+        None if _CONFIG["backend"] == "sqlite" else RESERVATIONS_FILE)
+
+
+def customers_repository():
+    """
+    Obtiene el repositorio indexado de los clientes.
+
+    :return: Repository con índices por nombre, correo y teléfono
+        normalizados, y la vista 'names' para buscar nombres por prefijo.
+    """
+    return Repository.get(customers_store(),
+                          {"name": _name, "email": _email, "phone": _phone},
+                          {"names": partial(SortedIndex, _name)},
+                          partial(_publish, "customer"))
+
+
+def hotels_repository():
+    """
+    Obtiene el repositorio indexado de los hoteles.
+
+    :return: Repository con índice por nombre.
+    """
+    return Repository.get(hotels_store(), {"name": _name}, None,
+                          partial(_publish, "hotel"))
+
+
+def reservations_repository(hotel_name=None):
+    """
+    Obtiene el repositorio indexado de las reservas de un hotel.
+
+    :param hotel_name: Nombre del hotel; solo puede omitirse si las
+        reservas no están particionadas.
+    :return: Repository de la partición del hotel con índices por clave de
+        reserva, por hotel y por cliente, y las vistas de disponibilidad de
+        habitaciones y de fechas de entrada.
+    """
+    shards = reservation_shards()
+    if hotel_name is None and shards > 1:
+        raise ValueError("Las reservas están particionadas: hay que indicar "
+                         "el hotel.")
+    return _reservations_repository(
+        reservation_shard_store(shard_of(hotel_name, shards), shards))
+
+
+def reservations_repositories():
+    """
+    Obtiene los repositorios de todas las particiones de las reservas.
+
+    :return: Lista de Repository, uno por partición.
+    """
+    shards = reservation_shards()
+    return [_reservations_repository(reservation_shard_store(shard, shards))
+            for shard in range(shards)]
+
+
+def _reservations_repository(store):
+    """
+    Obtiene el repositorio de una partición de las reservas.
+
+    :param store: Store de la partición.
+    :return: Repository.
+    """
+    return Repository.get(store,
+                          {"key": reservation_key, "hotel": _hotel_name,
+                           "customer": _customer_name},
+                          {"availability": RoomAvailability,
+                           "dates": DateIndex},
+                          partial(_publish, "reservation"))
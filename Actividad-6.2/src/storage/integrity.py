@@ -0,0 +1,84 @@
+"""
+Módulo con las reglas de integridad referencial entre reservas, clientes y
+hoteles.
+
+Las comprobaciones usan los índices hash de los repositorios: que exista un
+cliente o un hotel se responde con el índice por nombre, y sus reservas con
+los índices inversos 'customer' y 'hotel' del repositorio de reservas, por
+lo que cada operación cuesta O(1) más el número de reservas afectadas. Las
+reservas de un hotel están en una sola partición; las de un cliente se
+buscan en todas.
+
+Los candados se toman siempre en el mismo orden global: clientes, hoteles
+y, al final, reservas. Los borrados de clientes y hoteles ya llegan con su
+candado tomado a release_references, que después toma los de las
+reservas; las altas de reservas toman antes los de clientes y hoteles con
+references_locked y resuelven las habitaciones de cada hotel antes de
+entrar al candado de las reservas.
+"""
+from contextlib import ExitStack, contextmanager
+from src.storage.datasets import (customers_repository, hotels_repository,
+                                  integrity_policy, reservations_repositories,
+                                  reservations_repository)
+
+
+def check_references(record):
+    """
+    Verifica que el cliente y el hotel de una reserva estén registrados.
+
+    :param record: Diccionario con los datos de la reserva.
+    :return: Mensaje de error o None si la reserva es válida o la
+        integridad está desactivada.
+    """
+    if integrity_policy() == "off":
+        return None
+    if customers_repository().find("name", record["customer_name"]) is None:
+        return f"El cliente {record['customer_name']} no está registrado."
+    if hotels_repository().find("name", record["hotel_name"]) is None:
+        return f"El hotel {record['hotel_name']} no está registrado."
+    return None
+
+
+@contextmanager
+def references_locked():
+    """
+    Toma los candados de clientes y hoteles, en ese orden, para que sigan
+    registrados mientras se guarda una reserva. Con la integridad
+    desactivada no toma ninguno.
+
+    :return: Administrador de contexto.
+    """
+    with ExitStack() as stack:
+        if integrity_policy() != "off":
+            stack.enter_context(customers_repository().locked())
+            stack.enter_context(hotels_repository().locked())
+        yield
+
+
+def release_references(index, name):
+    """
+    Prepara el borrado de un cliente o de un hotel según la política: con
+    'restrict' lo impide si tiene reservas y con 'cascade' las elimina.
+
+    :param index: 'customer' o 'hotel'.
+    :param name: Nombre del cliente o del hotel.
+    :return: False si el borrado debe impedirse.
+    """
+    policy = integrity_policy()
+    if policy == "off":
+        return True
+    if index == "hotel":
+        repositories = [reservations_repository(name)]
+    else:
+        repositories = reservations_repositories()
+    with ExitStack() as stack:
+        for repository in repositories:
+            stack.enter_context(repository.locked())
+        if not any(repository.count(index, name)
+                   for repository in repositories):
+            return True
+        if policy == "restrict":
+            return False
+        for repository in repositories:
+            repository.remove_all(index, name)
+    return True
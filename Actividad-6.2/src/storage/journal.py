@@ -0,0 +1,514 @@
+"""
+Módulo para almacenar registros en un archivo JSON más un diario de
+solo-anexado.
+
+El archivo JSON original (por ejemplo 'customers.json') funciona como
+instantánea y conserva su formato de lista. Las altas se anexan como una
+línea JSON en '<archivo>.journal', de modo que crear un registro cuesta
+O(1). Las bajas y modificaciones se anexan como líneas '{"$remove": r}' y
+'{"$replace": [anterior, nuevo]}', que se aplican al primer registro con el
+mismo contenido. El diario se compacta en la instantánea cuando crece más
+que ella.
+
+Las líneas del diario se encolan con el candado tomado y se escriben
+cuando el proceso suelta el candado: si mientras tanto otros hilos del
+proceso tomaron el candado, todas sus líneas van en una sola escritura y,
+con escrituras durables, un solo fsync. Cada hilo espera a que su línea
+esté escrita antes de volver, y quien lee el almacén escribe antes lo
+encolado.
+"""
+import os
+import json
+from bisect import insort
+from collections import defaultdict
+from src.metrics import metrics
+from src.storage.cache import CACHE
+from src.storage.concurrency import (FileLock, GroupCommit, append_lines,
+                                     atomic_write, fsync_path)
+from src.storage.store import Store
+from src.storage.stream import iter_json_array
+
+JOURNAL_SUFFIX = ".journal"
+MIN_COMPACT_BYTES = 64 * 1024
+
+_GROUP_COMMITS = {}
+_QUEUED_FROM = {}
+_AFTER_WRITE = {}
+
+
+class JournalStore(Store):
+    """
+    Clase para representar un almacén de registros con instantánea JSON y
+    diario de solo-anexado.
+    """
+
+    def __init__(self, path, min_compact_bytes=MIN_COMPACT_BYTES,
+                 durable=False):
+        """
+        Inicializa un nuevo almacén.
+
+        :param path: Ruta del archivo JSON de la instantánea.
+        :param min_compact_bytes: Tamaño mínimo del diario antes de compactar.
+        :param durable: Si es True, cada escritura espera a estar en disco;
+            las escrituras concurrentes se agrupan en un solo fsync.
+        """
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.min_compact_bytes = min_compact_bytes
+        self.durable = durable
+        self._commit = _group_commit(self.journal_path)
+
+    def locked(self):
+        """
+        Obtiene el candado entre procesos del almacén. Las escrituras lo
+        toman solas; se usa para agrupar una lectura y una escritura.
+
+        :return: FileLock reentrante.
+        """
+        return FileLock(self.path)
+
+    def identity(self):
+        """
+        Obtiene la ruta absoluta de la instantánea.
+
+        :return: Cadena con la identidad del almacén.
+        """
+        return os.path.abspath(self.path)
+
+    def exists(self):
+        """
+        Indica si el almacén tiene datos en disco.
+
+        :return: True si existe la instantánea o el diario.
+        """
+        return (os.path.exists(self.path)
+                or os.path.exists(self.journal_path))
+
+    def iter_records(self):
+        """
+        Recorre los registros leyendo la instantánea de forma incremental.
+        La memoria usada depende solo de las entradas pendientes del diario,
+        no del tamaño de la instantánea.
+
+        :return: Generador de diccionarios con los registros.
+        """
+        self._flush_pending()
+        return metrics.scanned(self._iter_records(),
+                               dataset=os.path.basename(self.path))
+
+    def _iter_records(self):
+        """
+        Recorre los registros aplicando el diario sobre la instantánea.
+
+        :return: Generador de diccionarios con los registros.
+        """
+        entries = self._replay()
+        touched = set()
+        for entry in entries:
+            if "$remove" in entry:
+                touched.add(_content_key(entry["$remove"]))
+            elif "$replace" in entry:
+                touched.update(_content_key(record)
+                               for record in entry["$replace"])
+        positions = defaultdict(list)
+        if touched:
+            for position, record in enumerate(self._iter_snapshot()):
+                key = _content_key(record)
+                if key in touched:
+                    positions[key].append(position)
+        changes, added = _apply_entries(entries, positions)
+        for position, record in enumerate(self._iter_snapshot()):
+            record = changes.get(position, record)
+            if record is not None:
+                yield record
+        for record in added:
+            if record is not None:
+                yield record
+
+    def append(self, record):
+        """
+        Anexa un registro al diario sin reescribir la instantánea.
+
+        :param record: Diccionario con el registro a guardar.
+        """
+        self._write_entries([record])
+
+    def extend(self, records):
+        """
+        Anexa varios registros al diario en una sola escritura y la
+        sincroniza con el disco.
+
+        :param records: Lista de diccionarios con los registros a guardar.
+        """
+        if records:
+            self._write_entries(records, durable=True)
+
+    def remove(self, record):
+        """
+        Anexa al diario la baja de un registro.
+
+        :param record: Diccionario con el contenido del registro a eliminar.
+        """
+        self._write_entries([{"$remove": record}])
+
+    def replace(self, old, new):
+        """
+        Anexa al diario la modificación de un registro.
+
+        :param old: Diccionario con el contenido anterior del registro.
+        :param new: Diccionario con el contenido nuevo del registro.
+        """
+        self._write_entries([{"$replace": [old, new]}])
+
+    def change_many(self, changes):
+        """
+        Anexa al diario varias bajas y modificaciones en una sola escritura.
+
+        :param changes: Lista de tuplas (anterior, nuevo) donde nuevo es
+            None para una baja.
+        """
+        if changes:
+            self._write_entries([{"$remove": old} if new is None
+                                 else {"$replace": [old, new]}
+                                 for old, new in changes])
+
+    def rewrite(self, records):
+        """
+        Reemplaza todos los registros y reinicia el diario.
+
+        :param records: Lista de diccionarios con los registros.
+        """
+        dataset = os.path.basename(self.path)
+        with self.locked():
+            self._flush()
+            with metrics.timer("write", dataset=dataset):
+                atomic_write(self.path,
+                             lambda file: json.dump(records, file))
+            metrics.increment("bytes_written", os.path.getsize(self.path),
+                              dataset=dataset)
+            self._start_journal()
+            CACHE.invalidate(self.identity())
+
+    def compact(self):
+        """
+        Integra el diario en la instantánea.
+        """
+        with self.locked():
+            self.rewrite(self.load())
+
+    def signature(self):
+        """
+        Obtiene una firma que cambia cada vez que se modifica el almacén.
+
+        :return: Tupla con la firma de la instantánea y del diario y, si
+            hay líneas encoladas, su tamaño.
+        """
+        try:
+            stat = os.stat(self.journal_path)
+            journal = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            journal = None
+        snapshot = self._snapshot_signature()
+        signature = (tuple(snapshot) if snapshot else None, journal)
+        pending = self._commit.pending_bytes()
+        return signature + (pending,) if pending else signature
+
+    def after_write(self, callback):
+        """
+        Programa una tarea para justo después de que se escriban las líneas
+        encoladas, con el candado todavía tomado.
+
+        :param callback: Función que recibe la posición antes de escribir
+            y la posición después, o None si la escritura falló. Si no
+            hay líneas encoladas no se programa nada.
+        """
+        if not self._commit.pending_bytes():
+            return
+        callbacks = _AFTER_WRITE.setdefault(self._commit, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def position(self):
+        """
+        Obtiene la posición del final del diario para leer después solo las
+        entradas nuevas con tail().
+
+        :return: Tupla (firma de la instantánea, inodo del diario, bytes) o
+            None si el diario no está vigente. Los bytes incluyen las
+            líneas encoladas, que ya están aplicadas en quien escribió;
+            mientras las haya se parte de la posición tomada al encolar la
+            primera, sin volver a leer el diario.
+        """
+        pending = self._commit.pending_bytes()
+        start = _QUEUED_FROM.get(self._commit) if pending else None
+        if start is not None:
+            return start[:2] + (start[2] + pending,)
+        header = self._read_header()
+        if header is None or header != self._snapshot_signature():
+            return None
+        stat = os.stat(self.journal_path)
+        return (tuple(header), stat.st_ino, stat.st_size + pending)
+
+    def tail(self, position):
+        """
+        Lee las entradas anexadas después de una posición.
+
+        :param position: Posición devuelta por position() o por tail().
+        :return: Tupla (entradas, nueva posición) o None si el diario fue
+            compactado o reemplazado y hay que leer todo de nuevo.
+        """
+        self._flush_pending()
+        if position is None or not self._journal_is_current():
+            return None
+        snapshot, inode, offset = position
+        if tuple(self._read_header()) != snapshot:
+            return None
+        try:
+            with open(self.journal_path, "rb") as file:
+                if os.fstat(file.fileno()).st_ino != inode:
+                    return None
+                file.seek(offset)
+                data = file.read()
+        except FileNotFoundError:
+            return None
+        data = data[:data.rfind(b"\n") + 1]
+        metrics.increment("bytes_read", len(data),
+                          dataset=os.path.basename(self.path))
+        entries = []
+        for line in data.decode("utf-8").splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return entries, (snapshot, inode, offset + len(data))
+
+    def _write_entries(self, entries, durable=False):
+        """
+        Encola líneas para el diario y espera, al soltar el candado, a que
+        estén escritas.
+
+        :param entries: Lista de diccionarios a serializar en el diario.
+        :param durable: Si es True, espera a que el diario esté en disco.
+        """
+        dataset = os.path.basename(self.path)
+        with metrics.timer("serialize", dataset=dataset):
+            data = "".join(json.dumps(entry) + "\n"
+                           for entry in entries).encode("utf-8")
+        commit = self._commit
+        with self.locked() as lock:
+            if not commit.pending_bytes():
+                self._ensure_journal()
+                stat = os.stat(self.journal_path)
+                _QUEUED_FROM[commit] = (tuple(self._snapshot_signature()),
+                                        stat.st_ino, stat.st_size)
+            ticket = commit.queue(data, durable or self.durable)
+            CACHE.invalidate(self.identity())
+            lock.before_release(self._flush)
+            lock.defer(lambda: commit.wait(ticket))
+
+    def _flush(self):
+        """
+        Escribe en el diario, de una vez, todas las líneas encoladas,
+        compacta si corresponde y avisa a quienes lo pidieron con
+        after_write().
+        """
+        dataset = os.path.basename(self.path)
+
+        def write(data):
+            """Anexa las líneas encoladas al diario."""
+            with metrics.timer("write", dataset=dataset):
+                append_lines(self.journal_path, data)
+            metrics.increment("bytes_written", len(data), dataset=dataset)
+
+        before = self.position()
+        _QUEUED_FROM.pop(self._commit, None)
+        callbacks = _AFTER_WRITE.pop(self._commit, [])
+        try:
+            written = self._commit.flush(
+                write, lambda: fsync_path(self.journal_path))
+        except Exception:
+            for callback in callbacks:
+                callback(before, None)
+            raise
+        after = before
+        if written:
+            CACHE.invalidate(self.identity())
+            if self._maybe_compact():
+                after = self.position()
+        for callback in callbacks:
+            callback(before, after)
+
+    def _flush_pending(self):
+        """
+        Escribe las líneas encoladas antes de leer los archivos.
+        """
+        if self._commit.pending_bytes():
+            with self.locked():
+                self._flush()
+
+    def _iter_snapshot(self):
+        """
+        Recorre los registros de la instantánea.
+
+        :return: Generador de diccionarios.
+        """
+        if os.path.exists(self.path):
+            yield from iter_json_array(self.path)
+
+    def _snapshot_signature(self):
+        """
+        Obtiene la firma de la instantánea actual.
+
+        :return: Lista [inodo, tamaño, mtime_ns] o None si no existe.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+    def _read_header(self):
+        """
+        Lee el encabezado del diario.
+
+        :return: Firma de la instantánea registrada o None.
+        """
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as file:
+                line = file.readline()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(line).get("snapshot")
+        except (ValueError, AttributeError):
+            return None
+
+    def _journal_is_current(self):
+        """
+        Indica si el diario corresponde a la instantánea actual. Si la
+        instantánea fue reescrita por fuera del almacén el diario se ignora.
+
+        :return: True si el diario puede reproducirse.
+        """
+        header = self._read_header()
+        return header is not None and header == self._snapshot_signature()
+
+    def _start_journal(self):
+        """
+        Crea un diario vacío ligado a la instantánea actual.
+        """
+        header = {"snapshot": self._snapshot_signature()}
+        atomic_write(self.journal_path,
+                     lambda file: file.write(json.dumps(header) + "\n"))
+
+    def _ensure_journal(self):
+        """
+        Garantiza que exista una instantánea y un diario vigente.
+        """
+        if not os.path.exists(self.path):
+            self.rewrite([])
+        elif not self._journal_is_current():
+            self._start_journal()
+
+    def _replay(self):
+        """
+        Lee las entradas anexadas en el diario vigente. Las líneas
+        incompletas, producto de una escritura interrumpida, se descartan.
+
+        :return: Lista de diccionarios con las entradas.
+        """
+        if not self._journal_is_current():
+            return []
+        records = []
+        size = 0
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            size += len(file.readline())
+            for line in file:
+                size += len(line)
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        metrics.increment("bytes_read", size,
+                          dataset=os.path.basename(self.path))
+        return records
+
+    def _maybe_compact(self):
+        """
+        Compacta cuando el diario supera a la instantánea, lo que mantiene
+        el costo amortizado de cada alta en O(1).
+
+        :return: True si se compactó.
+        """
+        journal_size = os.path.getsize(self.journal_path)
+        if journal_size >= max(os.path.getsize(self.path),
+                               self.min_compact_bytes):
+            self.compact()
+            return True
+        return False
+
+
+def _content_key(record):
+    """
+    Obtiene una clave hashable con el contenido de un registro.
+
+    :param record: Diccionario con el registro.
+    :return: Cadena JSON con las llaves ordenadas.
+    """
+    return json.dumps(record, sort_keys=True)
+
+
+def _group_commit(journal_path):
+    """
+    Obtiene el agrupador de sincronizaciones de un diario.
+
+    :param journal_path: Ruta del diario.
+    :return: Instancia de GroupCommit compartida en el proceso.
+    """
+    path = os.path.abspath(journal_path)
+    commit = _GROUP_COMMITS.get(path)
+    if commit is None:
+        commit = _GROUP_COMMITS.setdefault(path, GroupCommit())
+    return commit
+
+
+def _apply_entries(entries, positions):
+    """
+    Aplica las entradas del diario sobre las posiciones conocidas de la
+    instantánea. Cada baja o modificación afecta al primer registro con el
+    mismo contenido.
+
+    :param entries: Lista de entradas del diario.
+    :param positions: Diccionario contenido -> lista ordenada con las
+        posiciones en la instantánea de los registros con ese contenido.
+    :return: Tupla (cambios, agregados): cambios es un diccionario
+        posición -> registro nuevo o None si fue eliminado; agregados es la
+        lista de registros anexados, con None en los eliminados.
+    """
+    changes = {}
+    added = []
+    offset = max((max(bucket) + 1 for bucket in positions.values()),
+                 default=0)
+
+    for entry in entries:
+        if "$remove" in entry:
+            old, new = entry["$remove"], None
+        elif "$replace" in entry:
+            old, new = entry["$replace"]
+        else:
+            old, new = None, entry
+        if old is not None:
+            bucket = positions.get(_content_key(old))
+            if not bucket:
+                continue
+            position = bucket.pop(0)
+            if position >= offset:
+                added[position - offset] = new
+            else:
+                changes[position] = new
+            if new is not None:
+                insort(positions[_content_key(new)], position)
+        else:
+            positions[_content_key(new)].append(offset + len(added))
+            added.append(new)
+    return changes, added
@@ -0,0 +1,568 @@
+"""
+Módulo con un constructor de consultas perezosas, filtradas y paginadas.
+
+Una consulta se arma encadenando where(), order_by(), limit() y after();
+cada paso devuelve una consulta nueva y nada se evalúa hasta recorrerla.
+Las condiciones usan la forma campo__operador=valor (sin operador es
+igualdad):
+
+    Reservation.query().where(hotel_name="Hotel A",
+                              check_in__gte="2024-01-01") \\
+        .order_by("-check_in").limit(50).after(cursor)
+
+Al evaluarse, una igualdad sobre un campo indexado se resuelve con el
+índice hash del repositorio y las subclases pueden aprovechar índices
+ordenados; el resto de las condiciones se comprueba registro por registro.
+Si ningún índice entrega los registros en el orden pedido, cada página
+recorre todos los candidatos y se queda con los primeros según el orden,
+con un costo proporcional al número de registros.
+
+La paginación es por conjunto de claves (keyset): el cursor guarda los
+valores de orden del último registro entregado y la página siguiente
+empieza justo después, sin recorrer ni descartar las anteriores. Para que
+el orden sea total, a los campos pedidos se agregan los demás campos de
+la entidad como desempate.
+"""
+import base64
+import binascii
+import copy
+import functools
+import heapq
+import itertools
+import json
+from collections import namedtuple
+from src.metrics import metrics
+
+
+def _compare(operation):
+    """
+    Envuelve una comparación de orden para que los valores ausentes o de
+    tipos incomparables no cumplan la condición.
+
+    :param operation: Función (valor, objetivo) -> bool.
+    :return: Función (valor, objetivo) -> bool.
+    """
+    def test(value, target):
+        """Compara si el valor existe y es comparable."""
+        if value is None:
+            return False
+        try:
+            return operation(value, target)
+        except TypeError:
+            return False
+    return test
+
+
+def _text(operation):
+    """
+    Envuelve una comparación de texto sin distinguir mayúsculas.
+
+    :param operation: Función (texto, objetivo) -> bool.
+    :return: Función (valor, objetivo) -> bool.
+    """
+    def test(value, target):
+        """Compara si el valor es una cadena."""
+        return isinstance(value, str) and operation(value.casefold(), target)
+    return test
+
+
+OPERATORS = {
+    "eq": lambda value, target: value == target,
+    "ne": lambda value, target: value != target,
+    "lt": _compare(lambda value, target: value < target),
+    "lte": _compare(lambda value, target: value <= target),
+    "gt": _compare(lambda value, target: value > target),
+    "gte": _compare(lambda value, target: value >= target),
+    "in": lambda value, target: value in target,
+    "startswith": _text(str.startswith),
+    "contains": _text(lambda value, target: target in value),
+}
+TEXT_OPERATORS = ("startswith", "contains")
+
+
+class Page(namedtuple("Page", ("records", "cursor"))):
+    """
+    Clase para representar una página de resultados: records es la lista
+    de diccionarios y cursor el cursor para pedir la página siguiente con
+    after(), o None si no hay más resultados.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        """
+        Representa la página de forma resumida.
+
+        :return: Cadena con el número de registros y si hay más.
+        """
+        return (f"Page(records={len(self.records)}, "
+                f"more={self.cursor is not None})")
+
+
+@functools.total_ordering
+class _Descending:
+    """
+    Clase para invertir el orden de una clave.
+    """
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        """
+        Inicializa la clave invertida.
+
+        :param key: Clave original.
+        """
+        self.key = key
+
+    def __eq__(self, other):
+        """
+        Compara dos claves invertidas.
+
+        :param other: Otra clave invertida.
+        :return: True si son iguales.
+        """
+        return self.key == other.key
+
+    def __lt__(self, other):
+        """
+        Compara dos claves invertidas en orden contrario.
+
+        :param other: Otra clave invertida.
+        :return: True si la original es mayor.
+        """
+        return other.key < self.key
+
+    def __hash__(self):
+        """
+        Obtiene el hash de la clave original.
+
+        :return: Entero.
+        """
+        return hash(self.key)
+
+
+def _sortable(value):
+    """
+    Obtiene una clave de orden total para valores de cualquier tipo: los
+    números primero, luego las cadenas, luego lo demás y al final los
+    valores ausentes.
+
+    :param value: Valor normalizado.
+    :return: Tupla comparable.
+    """
+    if value is None:
+        return (3, 0)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, json.dumps(value, sort_keys=True, default=str))
+
+
+def _sorted_runs(records, primary_key, key):
+    """
+    Ordena un flujo que ya viene ordenado por el campo principal: solo se
+    ordena cada grupo de registros con el mismo valor principal, de modo
+    que el flujo sigue siendo perezoso.
+
+    :param records: Iterable ordenado por primary_key.
+    :param primary_key: Función con la clave del campo principal.
+    :param key: Función con la clave completa.
+    :return: Generador de registros en el orden completo.
+    """
+    for _, run in itertools.groupby(records, primary_key):
+        yield from sorted(run, key=key)
+
+
+class Query:
+    """
+    Clase base de las consultas. Las subclases definen los campos de la
+    entidad y de dónde se leen sus registros; COLLATIONS asocia a un campo
+    de texto la función que da su clave de orden.
+    """
+
+    ENTITY = None
+    FIELDS = ()
+    ALIASES = {}
+    NORMALIZERS = {}
+    INDEXES = {}
+    COLLATIONS = {}
+    DEFAULT_ORDER = ()
+
+    def __init__(self):
+        """
+        Inicializa una consulta sin condiciones, con el orden por omisión y
+        sin límite.
+        """
+        self._conditions = ()
+        self._order = ()
+        self._count = None
+        self._cursor = None
+
+    def where(self, **conditions):
+        """
+        Agrega condiciones que deben cumplirse todas. Cada argumento tiene
+        la forma campo o campo__operador, con los operadores eq, ne, lt,
+        lte, gt, gte, in, startswith y contains (estos dos sin distinguir
+        mayúsculas).
+
+        :param conditions: Valores de las condiciones.
+        :return: Nueva consulta.
+        :raises ValueError: Si un campo, operador o valor no es válido.
+        """
+        parsed = []
+        for name, target in conditions.items():
+            field, _, operator = name.partition("__")
+            field = self._field(field)
+            operator = operator or "eq"
+            if operator not in OPERATORS:
+                raise ValueError(f"Operador desconocido: {operator}")
+            parsed.append((field, operator,
+                           self._target(field, operator, target)))
+        return self._copy(conditions=self._conditions + tuple(parsed))
+
+    def order_by(self, *fields):
+        """
+        Define el orden de los resultados. Un campo con '-' al inicio se
+        ordena de forma descendente.
+
+        :param fields: Nombres de los campos.
+        :return: Nueva consulta.
+        :raises ValueError: Si un campo no es válido.
+        """
+        order = []
+        for name in fields:
+            descending = name.startswith("-")
+            order.append((self._field(name.lstrip("-")), descending))
+        return self._copy(order=tuple(order))
+
+    def limit(self, count):
+        """
+        Limita el número de resultados.
+
+        :param count: Número máximo de resultados, al menos 1.
+        :return: Nueva consulta.
+        :raises ValueError: Si el número es menor que 1.
+        """
+        if count < 1:
+            raise ValueError("El límite debe ser al menos 1.")
+        return self._copy(count=count)
+
+    def after(self, cursor):
+        """
+        Continúa después del registro de un cursor.
+
+        :param cursor: Cursor de Page.cursor o cursor_of(), o None para
+            empezar desde el inicio.
+        :return: Nueva consulta.
+        :raises ValueError: Si el cursor no es válido.
+        """
+        return self._copy(cursor=None if cursor is None
+                          else _decode(cursor))
+
+    def __iter__(self):
+        """
+        Evalúa la consulta y recorre los resultados.
+
+        :return: Generador de diccionarios (copias de los registros).
+        """
+        for record in self._evaluate(self._count):
+            yield dict(record)
+
+    def first(self):
+        """
+        Obtiene el primer resultado.
+
+        :return: Diccionario o None si no hay resultados.
+        """
+        return next(iter(self.limit(1)), None)
+
+    def page(self):
+        """
+        Evalúa la consulta y obtiene una página con el cursor de la
+        siguiente.
+
+        :return: Page con hasta limit() registros.
+        """
+        records = list(self._evaluate(
+            None if self._count is None else self._count + 1))
+        cursor = None
+        if self._count is not None and len(records) > self._count:
+            records = records[:self._count]
+            cursor = self.cursor_of(records[-1])
+        return Page([dict(record) for record in records], cursor)
+
+    def cursor_of(self, record):
+        """
+        Obtiene el cursor que continúa después de un registro.
+
+        :param record: Diccionario devuelto por la consulta.
+        :return: Cadena opaca para after().
+        """
+        ordering = self._ordering()
+        data = {"order": _order_names(ordering),
+                "values": [self._normalize(field, record.get(field))
+                           for field, _ in ordering]}
+        return base64.urlsafe_b64encode(
+            json.dumps(data).encode("utf-8")).decode("ascii")
+
+    def _repositories(self):
+        """
+        Obtiene los repositorios con los registros de la entidad.
+
+        :return: Lista de Repository.
+        """
+        raise NotImplementedError
+
+    def _stream(self, repository):
+        """
+        Obtiene los registros candidatos de un repositorio: los de una
+        igualdad sobre un campo indexado o, si no la hay, todos. Ninguno de
+        los dos viene ordenado, así que cada página los recorre completos.
+
+        :param repository: Repository de la entidad.
+        :return: Tupla (iterable de registros, True si vienen ordenados
+            de forma ascendente por el primer campo del orden).
+        """
+        lookup = self._lookup()
+        if lookup is None:
+            return repository.records(), False
+        index, keys = lookup
+        return [record for key in keys
+                for record in repository.find_all(index, key)], False
+
+    def _lookup(self, fields=None):
+        """
+        Busca una condición de igualdad o pertenencia que pueda resolverse
+        con un índice hash, en el orden de preferencia de INDEXES.
+
+        :param fields: Campos que pueden usarse (opcional; todos los de
+            INDEXES si se omite).
+        :return: Tupla (índice, claves sin repetir) o None.
+        """
+        for field, index in self.INDEXES.items():
+            if fields is not None and field not in fields:
+                continue
+            for name, operator, target in self._conditions:
+                if name == field and operator == "eq":
+                    return index, [target]
+                if name == field and operator == "in":
+                    return index, list(dict.fromkeys(target))
+        return None
+
+    def _evaluate(self, count):
+        """
+        Obtiene los registros de la consulta sin copiarlos.
+
+        :param count: Número máximo de registros o None.
+        :return: Iterable de diccionarios.
+        """
+        ordering = self._ordering()
+        after = self._after_key(ordering)
+        streams = [self._stream(repository)
+                   for repository in self._repositories()]
+        presorted = bool(streams) and all(sort for _, sort in streams)
+        if presorted:
+            field = ordering[0][0]
+
+            def primary_key(record):
+                """Obtiene la clave del campo principal."""
+                return self._sort_value(field, False, record.get(field))
+
+            records = heapq.merge(*(stream for stream, _ in streams),
+                                  key=primary_key)
+        else:
+            records = itertools.chain.from_iterable(
+                stream for stream, _ in streams)
+        records = metrics.scanned(records, entity=self.ENTITY,
+                                  operation="query")
+        records = (record for record in records if self._matches(record)
+                   and (after is None or self._key(record, ordering) > after))
+        key = functools.partial(self._key, ordering=ordering)
+        if presorted:
+            records = _sorted_runs(records, primary_key, key)
+        elif count is None:
+            records = sorted(records, key=key)
+        else:
+            records = heapq.nsmallest(count, records, key=key)
+        return itertools.islice(records, count)
+
+    def _matches(self, record):
+        """
+        Indica si un registro cumple todas las condiciones.
+
+        :param record: Diccionario con el registro.
+        :return: True si las cumple.
+        """
+        for field, operator, target in self._conditions:
+            value = record.get(field)
+            if operator not in TEXT_OPERATORS:
+                value = self._normalize(field, value)
+            if not OPERATORS[operator](value, target):
+                return False
+        return True
+
+    def _ordering(self):
+        """
+        Obtiene el orden completo: el pedido (o el de omisión) seguido de
+        los demás campos de la entidad como desempate.
+
+        :return: Lista de tuplas (campo, descendente).
+        """
+        ordering = list(self._order or [(field, False)
+                                        for field in self.DEFAULT_ORDER])
+        chosen = {field for field, _ in ordering}
+        ordering.extend((field, False) for field in self.FIELDS
+                        if field not in chosen)
+        return ordering
+
+    def _key(self, record, ordering):
+        """
+        Obtiene la clave de orden de un registro.
+
+        :param record: Diccionario con el registro.
+        :param ordering: Lista de tuplas (campo, descendente).
+        :return: Tupla comparable.
+        """
+        return tuple(self._sort_value(field, descending,
+                                      record.get(field))
+                     for field, descending in ordering)
+
+    def _sort_value(self, field, descending, value):
+        """
+        Obtiene la clave de orden de un valor.
+
+        :param field: Nombre del campo.
+        :param descending: True si el campo se ordena de forma descendente.
+        :param value: Valor del registro.
+        :return: Clave comparable.
+        """
+        key = _sortable(self._collate(field, self._normalize(field, value)))
+        return _Descending(key) if descending else key
+
+    def _collate(self, field, value):
+        """
+        Aplica a una cadena la colación del campo, si la tiene.
+
+        :param field: Nombre del campo.
+        :param value: Valor normalizado.
+        :return: Valor con el que se ordena.
+        """
+        collation = self.COLLATIONS.get(field)
+        if collation is None or not isinstance(value, str):
+            return value
+        return collation(value)
+
+    def _after_key(self, ordering):
+        """
+        Obtiene la clave del registro del cursor.
+
+        :param ordering: Lista de tuplas (campo, descendente).
+        :return: Tupla comparable o None si no hay cursor.
+        :raises ValueError: Si el cursor se obtuvo con otro orden.
+        """
+        if self._cursor is None:
+            return None
+        if self._cursor["order"] != _order_names(ordering):
+            raise ValueError("El cursor no corresponde al orden de la "
+                             "consulta.")
+        keys = (_sortable(self._collate(field, value)) for (field, _), value
+                in zip(ordering, self._cursor["values"]))
+        return tuple(_Descending(key) if descending else key
+                     for (_, descending), key in zip(ordering, keys))
+
+    def _field(self, name):
+        """
+        Obtiene el nombre del campo, resolviendo los alias.
+
+        :param name: Nombre o alias del campo.
+        :return: Nombre del campo.
+        :raises ValueError: Si el campo no existe.
+        """
+        field = self.ALIASES.get(name, name)
+        if field not in self.FIELDS:
+            raise ValueError(f"Campo desconocido: {name}")
+        return field
+
+    def _target(self, field, operator, target):
+        """
+        Prepara el valor de una condición para compararlo con los valores
+        normalizados de los registros.
+
+        :param field: Nombre del campo.
+        :param operator: Nombre del operador.
+        :param target: Valor de la condición.
+        :return: Valor preparado.
+        :raises ValueError: Si el valor no es válido para el campo.
+        """
+        if operator in TEXT_OPERATORS:
+            if not isinstance(target, str):
+                raise ValueError(f"El operador {operator} requiere una "
+                                 "cadena.")
+            return target.casefold()
+        if operator == "in":
+            return [self._normalize(field, value, strict=True)
+                    for value in target]
+        return self._normalize(field, target, strict=True)
+
+    def _normalize(self, field, value, strict=False):
+        """
+        Normaliza un valor como lo comparan los índices del campo.
+
+        :param field: Nombre del campo.
+        :param value: Valor a normalizar.
+        :param strict: Si es True, un valor que no puede normalizarse es
+            un error; si no, se trata como ausente.
+        :return: Valor normalizado.
+        :raises ValueError: Si strict es True y el valor no es válido.
+        """
+        normalizer = self.NORMALIZERS.get(field)
+        if normalizer is None or value is None:
+            return value
+        normalized = normalizer(value)
+        if strict and normalized is None:
+            raise ValueError(f"Valor no válido para {field}: {value!r}")
+        return normalized
+
+    def _copy(self, **attributes):
+        """
+        Obtiene una copia de la consulta con algunos atributos cambiados.
+
+        :param attributes: Atributos sin el guion bajo inicial.
+        :return: Nueva consulta.
+        """
+        query = copy.copy(self)
+        for name, value in attributes.items():
+            setattr(query, "_" + name, value)
+        return query
+
+
+def _order_names(ordering):
+    """
+    Obtiene los nombres de un orden, con '-' en los descendentes.
+
+    :param ordering: Lista de tuplas (campo, descendente).
+    :return: Lista de cadenas.
+    """
+    return [("-" if descending else "") + field
+            for field, descending in ordering]
+
+
+def _decode(cursor):
+    """
+    Interpreta un cursor.
+
+    :param cursor: Cadena obtenida de cursor_of().
+    :return: Diccionario con 'order' y 'values'.
+    :raises ValueError: Si el cursor no es válido.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (AttributeError, UnicodeError, binascii.Error, ValueError) as error:
+        raise ValueError("Cursor no válido.") from error
+    if (not isinstance(data, dict) or not isinstance(data.get("order"), list)
+            or not isinstance(data.get("values"), list)
+            or len(data["order"]) != len(data["values"])):
+        raise ValueError("Cursor no válido.")
+    return data
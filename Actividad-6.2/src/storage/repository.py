@@ -0,0 +1,536 @@
+"""
+Módulo para mantener en memoria los registros de un almacén junto con
+índices hash que permiten búsquedas y bajas en O(1).
+
+Además de los índices hash, un repositorio puede mantener vistas: objetos
+con los métodos add(record) y remove(record) que reciben cada cambio. Las
+altas, bajas y modificaciones hechas por el repositorio se notifican a
+on_change mientras se tiene el candado del almacén, de modo que el orden de
+las notificaciones es el de las escrituras. La notificación va antes de la
+escritura: todo cambio guardado queda notificado y, si la escritura falla,
+se notifican los cambios inversos.
+"""
+import os
+from contextlib import contextmanager
+from src.metrics import metrics
+
+_REPOSITORIES = {}
+
+
+class Repository:
+    """
+    Clase para representar una vista indexada de un almacén.
+    """
+
+    def __init__(self, store, indexes, views=None, on_change=None):
+        """
+        Inicializa un nuevo repositorio. Los datos se cargan en el primer
+        acceso y se vuelven a cargar si el almacén cambia por fuera.
+
+        :param store: Almacén (subclase de Store).
+        :param indexes: Diccionario nombre -> función que obtiene la clave
+            del índice a partir de un registro.
+        :param views: Diccionario nombre -> clase de la vista (opcional).
+        :param on_change: Función que recibe una lista de tuplas
+            (operación, anterior, nuevo) tras cada escritura (opcional).
+        """
+        self.store = store
+        self.on_change = on_change
+        self._indexes = _Indexes(indexes, views or {})
+        self._records = {}
+        self._next_id = 0
+        self._signature = None
+        self._position = None
+
+    @staticmethod
+    def get(store, indexes, views=None, on_change=None):
+        """
+        Obtiene el repositorio compartido del proceso para un almacén.
+
+        :param store: Almacén del repositorio.
+        :param indexes: Índices a mantener si el repositorio es nuevo.
+        :param views: Vistas a mantener si el repositorio es nuevo.
+        :param on_change: Notificación de cambios si el repositorio es
+            nuevo.
+        :return: Instancia de Repository.
+        """
+        identity = store.identity()
+        repository = _REPOSITORIES.get(identity)
+        if repository is None:
+            repository = Repository(store, indexes, views, on_change)
+            _REPOSITORIES[identity] = repository
+        else:
+            repository.store = store
+        return repository
+
+    def records(self):
+        """
+        Obtiene todos los registros en orden de inserción.
+
+        :return: Lista de diccionarios.
+        """
+        self._refresh()
+        return list(self._records.values())
+
+    def view(self, name):
+        """
+        Obtiene una vista actualizada del repositorio.
+
+        :param name: Nombre de la vista.
+        :return: Instancia de la vista.
+        """
+        self._refresh()
+        return self._indexes.views[name]
+
+    def find(self, index, key):
+        """
+        Busca el primer registro con una clave.
+
+        :param index: Nombre del índice.
+        :param key: Clave a buscar.
+        :return: Diccionario del registro o None.
+        """
+        self._refresh()
+        bucket = self._indexes.bucket(index, key)
+        if not bucket:
+            return None
+        return self._records[next(iter(bucket))]
+
+    def find_all(self, index, key):
+        """
+        Busca todos los registros con una clave.
+
+        :param index: Nombre del índice.
+        :param key: Clave a buscar.
+        :return: Lista de diccionarios.
+        """
+        self._refresh()
+        bucket = self._indexes.bucket(index, key)
+        return [self._records[record_id] for record_id in bucket]
+
+    def locked(self):
+        """
+        Obtiene el candado del almacén para agrupar una consulta y las
+        escrituras que dependen de ella.
+
+        :return: Administrador de contexto reentrante.
+        """
+        return self.store.locked()
+
+    def count(self, index, key):
+        """
+        Cuenta los registros con una clave.
+
+        :param index: Nombre del índice.
+        :param key: Clave a contar.
+        :return: Número de registros.
+        """
+        self._refresh()
+        return len(self._indexes.bucket(index, key))
+
+    def add(self, record):
+        """
+        Agrega un registro al almacén y a los índices. Si el repositorio
+        aún no se ha cargado, solo se escribe en el almacén.
+
+        :param record: Diccionario con el registro.
+        """
+        with self.store.locked():
+            loaded = self._is_current()
+            with self._announced([("create", None, record)]):
+                self.store.append(record)
+            if loaded:
+                self._insert(record)
+                self._mark_written()
+
+    def add_many(self, rows, prepare):
+        """
+        Agrega varios registros con una sola escritura en el almacén. Las
+        filas rechazadas no detienen el lote.
+
+        :param rows: Iterable con las filas de entrada.
+        :param prepare: Función (repositorio, fila) -> (registro, error) que
+            valida una fila; ve los registros del lote ya aceptados.
+        :return: Tupla (aceptados, errores) donde errores es una lista de
+            tuplas (posición, mensaje).
+        """
+        with self.store.locked():
+            self._refresh()
+            accepted = []
+            errors = []
+            for position, row in enumerate(rows):
+                record, error = prepare(self, row)
+                if error:
+                    errors.append((position, error))
+                    continue
+                self._insert(record)
+                accepted.append(record)
+            try:
+                with self._announced([("create", None, record)
+                                      for record in accepted]):
+                    self.store.extend(accepted)
+            except Exception:
+                self._signature = None
+                raise
+            self._mark_written()
+        return accepted, errors
+
+    def remove(self, record):
+        """
+        Elimina un registro obtenido de este repositorio.
+
+        :param record: Diccionario con el registro.
+        """
+        self.remove_many([record])
+
+    def remove_many(self, records):
+        """
+        Elimina varios registros distintos obtenidos de este repositorio con
+        una sola escritura en el almacén.
+
+        :param records: Lista de diccionarios con los registros.
+        """
+        with self.store.locked():
+            self._refresh()
+            record_ids = [self._id_of(record) for record in records]
+            with self._announced([("delete", record, None)
+                                  for record in records]):
+                self._write_changes([(record, None) for record in records])
+            for record_id in record_ids:
+                self._discard(record_id)
+            self._mark_written()
+
+    def remove_all(self, index, key):
+        """
+        Elimina todos los registros con una clave.
+
+        :param index: Nombre del índice.
+        :param key: Clave de los registros a eliminar.
+        :return: Número de registros eliminados.
+        """
+        with self.store.locked():
+            matches = self.find_all(index, key)
+            if matches:
+                self.remove_many(matches)
+        return len(matches)
+
+    def update(self, record, changes):
+        """
+        Modifica un registro obtenido de este repositorio.
+
+        :param record: Diccionario con el registro.
+        :param changes: Diccionario con los campos a modificar.
+        :return: Diccionario con el registro modificado.
+        """
+        return self.update_many([(record, changes)])[0]
+
+    def update_many(self, updates):
+        """
+        Modifica varios registros distintos obtenidos de este repositorio
+        con una sola escritura en el almacén.
+
+        :param updates: Lista de tuplas (registro, cambios) donde cambios
+            es un diccionario con los campos a modificar.
+        :return: Lista con los registros modificados, en el mismo orden.
+        """
+        with self.store.locked():
+            self._refresh()
+            record_ids = [self._id_of(record) for record, _ in updates]
+            new_records = [dict(record, **changes)
+                           for record, changes in updates]
+            with self._announced([("update", record, new_record)
+                                  for (record, _), new_record
+                                  in zip(updates, new_records)]):
+                self._write_changes([(record, new_record) for (record, _),
+                                     new_record in zip(updates, new_records)])
+            for record_id, new_record in zip(record_ids, new_records):
+                self._unindex(record_id)
+                self._records[record_id] = new_record
+                self._index(record_id)
+            self._mark_written()
+        return new_records
+
+    def _write_changes(self, changes):
+        """
+        Escribe bajas y modificaciones en el almacén. Si la escritura falla,
+        la memoria se vuelve a cargar en la siguiente consulta.
+
+        :param changes: Lista de tuplas (anterior, nuevo) donde nuevo es
+            None para una baja.
+        """
+        try:
+            self.store.change_many(changes)
+        except Exception:
+            self._signature = None
+            raise
+
+    @contextmanager
+    def _announced(self, changes):
+        """
+        Notifica cambios antes de escribirlos en el almacén. Si la escritura
+        falla, notifica los cambios inversos en orden contrario.
+
+        :param changes: Lista de tuplas (operación, anterior, nuevo).
+        """
+        self._notify(changes)
+        try:
+            yield
+        except Exception:
+            self._notify([_inverse(change) for change in reversed(changes)])
+            raise
+
+    def _notify(self, changes):
+        """
+        Notifica cambios del almacén.
+
+        :param changes: Lista de tuplas (operación, anterior, nuevo).
+        """
+        if self.on_change is not None and changes:
+            self.on_change(changes)
+
+    def _is_current(self):
+        """
+        Indica si los datos en memoria coinciden con el almacén.
+
+        :return: True si no es necesario recargar.
+        """
+        return (self._signature is not None
+                and self._signature == self.store.signature())
+
+    def _refresh(self):
+        """
+        Pone al día los registros y los índices si el almacén cambió. Si el
+        almacén lo permite solo se aplican los cambios nuevos; si no, se
+        recarga todo.
+        """
+        if self._is_current() or self._catch_up():
+            return
+        dataset = os.path.basename(self.store.identity())
+        with self.store.locked(), metrics.timer("load", dataset=dataset):
+            self._records = {}
+            self._indexes.reset()
+            self._next_id = 0
+            for record in self.store.iter_records():
+                self._insert(record)
+            self._mark_current()
+
+    def _mark_current(self):
+        """
+        Registra que la memoria coincide con el estado actual del almacén.
+        """
+        self._signature = self.store.signature()
+        self._position = self.store.position()
+
+    def _mark_written(self):
+        """
+        Registra que la memoria coincide con el almacén tras una escritura
+        hecha con el candado tomado. Si el almacén escribe después, al
+        soltar el candado, se vuelve a registrar entonces.
+        """
+        self._mark_current()
+        self.store.after_write(self._confirm_written)
+
+    def _confirm_written(self, before, after):
+        """
+        Registra la firma del almacén una vez escritas las líneas
+        encoladas, si nadie más escribió después de esta memoria.
+
+        :param before: Posición del almacén antes de escribir.
+        :param after: Posición después de escribir, o None si falló.
+        """
+        if after is None:
+            self._signature = None
+        elif self._position is not None and self._position == before:
+            self._signature = self.store.signature()
+            self._position = after
+
+    def _catch_up(self):
+        """
+        Aplica los cambios hechos en el almacén desde la última lectura.
+
+        :return: False si hay que recargar todo.
+        """
+        if self._signature is None:
+            return False
+        signature = self.store.signature()
+        result = self.store.tail(self._position)
+        if result is None:
+            return False
+        entries, self._position = result
+        for entry in entries:
+            self._apply(entry)
+        self._signature = signature
+        return True
+
+    def _apply(self, entry):
+        """
+        Aplica una entrada con el formato del diario.
+
+        :param entry: Registro agregado o diccionario con '$remove' o
+            '$replace'.
+        """
+        if "$remove" in entry:
+            record_id = self._find_equal(entry["$remove"])
+            if record_id is not None:
+                self._discard(record_id)
+        elif "$replace" in entry:
+            old, new = entry["$replace"]
+            record_id = self._find_equal(old)
+            if record_id is not None:
+                self._unindex(record_id)
+                self._records[record_id] = new
+                self._index(record_id)
+        else:
+            self._insert(entry)
+
+    def _insert(self, record):
+        """
+        Agrega un registro a la memoria y a los índices.
+
+        :param record: Diccionario con el registro.
+        """
+        record_id = self._next_id
+        self._next_id += 1
+        self._records[record_id] = record
+        self._index(record_id)
+
+    def _discard(self, record_id):
+        """
+        Quita un registro de la memoria y de los índices.
+
+        :param record_id: Identificador del registro.
+        """
+        self._unindex(record_id)
+        del self._records[record_id]
+
+    def _index(self, record_id):
+        """
+        Agrega un registro a todos los índices y vistas.
+
+        :param record_id: Identificador del registro.
+        """
+        self._indexes.add(record_id, self._records[record_id])
+
+    def _unindex(self, record_id):
+        """
+        Quita un registro de todos los índices y vistas.
+
+        :param record_id: Identificador del registro.
+        """
+        self._indexes.remove(record_id, self._records[record_id])
+
+    def _find_equal(self, record):
+        """
+        Obtiene el identificador del primer registro con el mismo contenido.
+
+        :param record: Diccionario con el contenido buscado.
+        :return: Identificador o None.
+        """
+        for record_id in self._indexes.candidates(record):
+            if self._records[record_id] == record:
+                return record_id
+        return None
+
+    def _id_of(self, record):
+        """
+        Obtiene el identificador interno de un registro.
+
+        :param record: Diccionario obtenido de este repositorio.
+        :return: Identificador del registro.
+        """
+        for record_id in self._indexes.candidates(record):
+            if self._records[record_id] is record:
+                return record_id
+        raise KeyError("El registro no pertenece al repositorio.")
+
+
+class _Indexes:
+    """
+    Clase para agrupar los índices hash y las vistas de un repositorio.
+    """
+
+    def __init__(self, key_functions, view_factories):
+        """
+        Inicializa índices y vistas vacíos.
+
+        :param key_functions: Diccionario nombre -> función que obtiene la
+            clave del índice a partir de un registro.
+        :param view_factories: Diccionario nombre -> clase de la vista.
+        """
+        self.key_functions = key_functions
+        self.view_factories = view_factories
+        self.buckets = {}
+        self.views = {}
+
+    def reset(self):
+        """
+        Vacía los índices y crea vistas nuevas.
+        """
+        self.buckets = {name: {} for name in self.key_functions}
+        self.views = {name: factory()
+                      for name, factory in self.view_factories.items()}
+
+    def bucket(self, name, key):
+        """
+        Obtiene los identificadores de los registros con una clave.
+
+        :param name: Nombre del índice.
+        :param key: Clave a buscar.
+        :return: Diccionario identificador -> None, en orden de inserción.
+        """
+        return self.buckets[name].get(key, {})
+
+    def candidates(self, record):
+        """
+        Obtiene los identificadores de los registros con la misma clave que
+        un registro en el primer índice.
+
+        :param record: Diccionario con el registro.
+        :return: Diccionario identificador -> None.
+        """
+        name = next(iter(self.key_functions))
+        return self.bucket(name, self.key_functions[name](record))
+
+    def add(self, record_id, record):
+        """
+        Agrega un registro a todos los índices y vistas.
+
+        :param record_id: Identificador del registro.
+        :param record: Diccionario con el registro.
+        """
+        for name, key_of in self.key_functions.items():
+            bucket = self.buckets[name].setdefault(key_of(record), {})
+            bucket[record_id] = None
+        for view in self.views.values():
+            view.add(record)
+
+    def remove(self, record_id, record):
+        """
+        Quita un registro de todos los índices y vistas.
+
+        :param record_id: Identificador del registro.
+        :param record: Diccionario con el registro.
+        """
+        for name, key_of in self.key_functions.items():
+            key = key_of(record)
+            bucket = self.buckets[name][key]
+            del bucket[record_id]
+            if not bucket:
+                del self.buckets[name][key]
+        for view in self.views.values():
+            view.remove(record)
+
+
+def _inverse(change):
+    """
+    Obtiene el cambio que deshace otro.
+
+    :param change: Tupla (operación, anterior, nuevo).
+    :return: Tupla (operación, anterior, nuevo).
+    """
+    operation, before, after = change
+    if operation == "create":
+        return ("delete", after, None)
+    if operation == "delete":
+        return ("create", None, before)
+    return ("update", after, before)
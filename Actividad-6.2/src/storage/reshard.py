@@ -0,0 +1,87 @@
+"""
+Herramienta para cambiar el número de particiones de las reservas.
+
+Uso: python -m src.storage.reshard N [--backend json|sqlite]
+
+Lee todas las reservas con el número de particiones vigente, las escribe
+en las N particiones nuevas (archivos con otro nombre, de modo que los
+vigentes no se tocan), reemplaza el manifiesto y al final borra las
+particiones anteriores. Si se interrumpe antes de reemplazar el manifiesto,
+los datos vigentes siguen intactos. Debe ejecutarse sin otros procesos
+escribiendo reservas: los candados de las particiones anteriores se
+mantienen durante la copia, pero un proceso que ya eligió una partición
+anterior podría escribir en ella después.
+"""
+import argparse
+import os
+import sys
+from src.storage import datasets
+from src.storage.journal import JournalStore
+from src.storage.sharding import ShardedStore, write_shard_count
+from src.storage.snapshot import SUFFIX
+
+
+def reshard(shards):
+    """
+    Reparte las reservas en un nuevo número de particiones.
+
+    :param shards: Número de particiones nuevo (1 deshace la partición).
+    :return: Número de reservas copiadas.
+    """
+    if shards < 1:
+        raise ValueError("El número de particiones debe ser al menos 1.")
+    current = datasets.reservation_shards()
+    old_store = datasets.reservations_store()
+    with old_store.locked():
+        records = old_store.load()
+        if shards == current:
+            return len(records)
+        stores = [datasets.reservation_shard_store(shard, shards)
+                  for shard in range(shards)]
+        new_store = stores[0] if shards == 1 else ShardedStore(stores)
+        new_store.rewrite(records)
+        write_shard_count(datasets.shards_manifest(), shards)
+        old_shards = (old_store.shards if isinstance(old_store, ShardedStore)
+                      else [old_store])
+        for store in old_shards:
+            _discard(store)
+    return len(records)
+
+
+def _discard(store):
+    """
+    Borra los datos de una partición anterior: los archivos del respaldo
+    JSON o las filas de la tabla en SQLite, cuya base puede compartirse con
+    otros conjuntos de datos.
+
+    :param store: Store de la partición.
+    """
+    if not isinstance(store, JournalStore):
+        store.rewrite([])
+        return
+    for path in (store.path, store.journal_path, store.path + SUFFIX):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def main(arguments=None):
+    """
+    Ejecuta el reparticionado desde la línea de comandos.
+
+    :param arguments: Lista de argumentos (opcional).
+    :return: 0 si terminó bien.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("shards", type=int)
+    parser.add_argument("--backend", choices=datasets.BACKENDS)
+    options = parser.parse_args(arguments)
+    if options.backend:
+        datasets.configure(backend=options.backend)
+    count = reshard(options.shards)
+    print(f"{count} reservas repartidas en {options.shards} particiones.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
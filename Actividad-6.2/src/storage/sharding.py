@@ -0,0 +1,303 @@
+"""
+Módulo para repartir las reservas en varios almacenes (particiones) según
+el hotel.
+
+Cada hotel pertenece siempre a la misma partición: crc32 de su nombre
+módulo el número de particiones. Así las escrituras de hoteles distintos
+toman candados y archivos distintos y no compiten entre sí. El número de
+particiones vigente se guarda en un archivo de manifiesto junto a los
+datos; solo lo cambia el reparticionado (src.storage.reshard), que escribe
+las particiones nuevas y después reemplaza el manifiesto.
+
+ShardedStore une las particiones como un solo Store para las lecturas que
+las recorren todas; fan_out ejecuta una función sobre cada partición en
+paralelo.
+"""
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from src.storage.concurrency import atomic_write
+from src.storage.store import Store
+
+MANIFEST_SUFFIX = ".shards"
+MAX_WORKERS = 8
+
+_MANIFESTS = {}
+_EXECUTOR = []
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def shard_of(hotel_name, shards):
+    """
+    Obtiene la partición de un hotel. El resultado no depende del proceso
+    (a diferencia de hash()).
+
+    :param hotel_name: Nombre del hotel.
+    :param shards: Número de particiones.
+    :return: Entero entre 0 y shards - 1.
+    """
+    if shards == 1:
+        return 0
+    return zlib.crc32(str(hotel_name).encode("utf-8")) % shards
+
+
+def shard_path(path, shard, shards):
+    """
+    Obtiene la ruta de una partición. Con una sola partición se usa la ruta
+    original; si no, la ruta incluye el número de particiones para que un
+    reparticionado nunca sobrescriba los archivos vigentes.
+
+    :param path: Ruta del archivo sin particionar (por ejemplo
+        'reservations.json').
+    :param shard: Número de la partición.
+    :param shards: Número de particiones.
+    :return: Ruta, por ejemplo 'reservations.3-of-8.json'.
+    """
+    if shards == 1:
+        return path
+    base, extension = os.path.splitext(path)
+    return f"{base}.{shard}-of-{shards}{extension}"
+
+
+def read_shard_count(manifest):
+    """
+    Lee el número de particiones de un manifiesto. La lectura se memoriza
+    mientras el archivo no cambie.
+
+    :param manifest: Ruta del manifiesto.
+    :return: Entero, 1 si el manifiesto no existe.
+    """
+    try:
+        stat = os.stat(manifest)
+    except FileNotFoundError:
+        return 1
+    key = os.path.abspath(manifest)
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    cached = _MANIFESTS.get(key)
+    if cached is None or cached[0] != signature:
+        with open(manifest, encoding="utf-8") as file:
+            cached = signature, int(file.read().strip() or 1)
+        _MANIFESTS[key] = cached
+    return cached[1]
+
+
+def write_shard_count(manifest, shards):
+    """
+    Reemplaza de forma atómica el número de particiones de un manifiesto.
+
+    :param manifest: Ruta del manifiesto.
+    :param shards: Número de particiones.
+    """
+    atomic_write(manifest, lambda file: file.write(f"{shards}\n"))
+
+
+def fan_out(function, items):
+    """
+    Aplica una función a cada elemento en paralelo, con un grupo de hilos
+    compartido por el proceso.
+
+    :param function: Función de un argumento.
+    :param items: Lista de elementos (por ejemplo, almacenes).
+    :return: Lista de resultados en el orden de items.
+    """
+    if len(items) <= 1:
+        return [function(item) for item in items]
+    return list(_executor().map(function, items))
+
+
+def _executor():
+    """
+    Obtiene el grupo de hilos de fan_out, creado en el primer uso.
+
+    :return: ThreadPoolExecutor.
+    """
+    with _EXECUTOR_LOCK:
+        if not _EXECUTOR:
+            _EXECUTOR.append(ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="shard"))
+        return _EXECUTOR[0]
+
+
+@contextmanager
+def _locked_all(stores):
+    """
+    Toma los candados de varios almacenes en orden.
+
+    :param stores: Lista de almacenes.
+    """
+    with ExitStack() as stack:
+        for store in stores:
+            stack.enter_context(store.locked())
+        yield
+
+
+class ShardedStore(Store):
+    """
+    Clase para representar varias particiones como un solo almacén. Las
+    lecturas recorren todas las particiones y las escrituras se envían a
+    la partición del hotel de cada registro.
+    """
+
+    def __init__(self, shards, path=None):
+        """
+        Inicializa el almacén.
+
+        :param shards: Lista de almacenes, uno por partición.
+        :param path: Ruta del conjunto sin particionar, usada para los
+            archivos derivados como la instantánea binaria (opcional).
+        """
+        self.shards = shards
+        self.path = path
+
+    def shard(self, hotel_name):
+        """
+        Obtiene la partición de un hotel.
+
+        :param hotel_name: Nombre del hotel.
+        :return: Store de la partición.
+        """
+        return self.shards[shard_of(hotel_name, len(self.shards))]
+
+    def identity(self):
+        """
+        Obtiene la identidad formada por las de las particiones.
+
+        :return: Cadena con la identidad del almacén.
+        """
+        return "|".join(shard.identity() for shard in self.shards)
+
+    def locked(self):
+        """
+        Obtiene los candados de todas las particiones, siempre en el mismo
+        orden para no provocar bloqueos mutuos.
+
+        :return: Administrador de contexto.
+        """
+        return _locked_all(self.shards)
+
+    def exists(self):
+        """
+        Indica si alguna partición tiene datos guardados.
+
+        :return: True si existen datos.
+        """
+        return any(shard.exists() for shard in self.shards)
+
+    def iter_records(self):
+        """
+        Recorre los registros partición por partición.
+
+        :return: Generador de diccionarios.
+        """
+        for shard in self.shards:
+            yield from shard.iter_records()
+
+    def load(self):
+        """
+        Carga las particiones en paralelo.
+
+        :return: Lista de diccionarios.
+        """
+        records = []
+        for shard_records in fan_out(lambda shard: shard.load(),
+                                     self.shards):
+            records.extend(shard_records)
+        return records
+
+    def append(self, record):
+        """
+        Agrega un registro a la partición de su hotel.
+
+        :param record: Diccionario con el registro.
+        """
+        self.shard(record["hotel_name"]).append(record)
+
+    def extend(self, records):
+        """
+        Agrega varios registros con una escritura por partición.
+
+        :param records: Lista de diccionarios.
+        """
+        for shard, shard_records in self._split(records):
+            shard.extend(shard_records)
+
+    def remove(self, record):
+        """
+        Elimina el primer registro con el mismo contenido.
+
+        :param record: Diccionario con el contenido a eliminar.
+        """
+        self.shard(record["hotel_name"]).remove(record)
+
+    def replace(self, old, new):
+        """
+        Reemplaza el primer registro con el mismo contenido. Si el hotel
+        cambia, el registro se mueve de partición.
+
+        :param old: Diccionario con el contenido anterior.
+        :param new: Diccionario con el contenido nuevo.
+        """
+        source = self.shard(old["hotel_name"])
+        target = self.shard(new["hotel_name"])
+        if source is target:
+            source.replace(old, new)
+        else:
+            source.remove(old)
+            target.append(new)
+
+    def change_many(self, changes):
+        """
+        Aplica varias bajas y modificaciones con una escritura por
+        partición. Un registro que cambia de hotel se mueve de partición.
+
+        :param changes: Lista de tuplas (anterior, nuevo) donde nuevo es
+            None para una baja.
+        """
+        groups = {}
+        moved = []
+        for old, new in changes:
+            source = self.shard(old["hotel_name"])
+            if new is not None and self.shard(new["hotel_name"]) is not source:
+                groups.setdefault(source, []).append((old, None))
+                moved.append(new)
+            else:
+                groups.setdefault(source, []).append((old, new))
+        for shard, shard_changes in groups.items():
+            shard.change_many(shard_changes)
+        self.extend(moved)
+
+    def rewrite(self, records):
+        """
+        Reemplaza todos los registros de todas las particiones.
+
+        :param records: Lista de diccionarios.
+        """
+        split = dict(self._split(records, include_empty=True))
+        for shard in self.shards:
+            shard.rewrite(split[shard])
+
+    def signature(self):
+        """
+        Obtiene la firma formada por las de las particiones.
+
+        :return: Tupla de firmas.
+        """
+        return tuple(shard.signature() for shard in self.shards)
+
+    def _split(self, records, include_empty=False):
+        """
+        Agrupa registros por partición.
+
+        :param records: Iterable de diccionarios.
+        :param include_empty: Si es True, incluye las particiones sin
+            registros.
+        :return: Lista de tuplas (partición, registros).
+        """
+        groups = [[] for _ in self.shards]
+        for record in records:
+            groups[shard_of(record["hotel_name"], len(self.shards))].append(
+                record)
+        return [(shard, group) for shard, group in zip(self.shards, groups)
+                if group or include_empty]
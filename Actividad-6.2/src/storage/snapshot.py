@@ -0,0 +1,487 @@
+"""
+Módulo con un formato binario de instantáneas que se lee con mmap.
+
+Un proceso nuevo puede abrir la instantánea y responder de inmediato: solo
+lee el pie del archivo y decodifica cada registro cuando se le pide, así
+que el tiempo de arranque no depende del número de registros.
+
+Estructura del archivo (enteros little-endian):
+
+- Firma MAGIC (8 bytes).
+- Tabla de cadenas: (k + 1) desplazamientos u64 y después las k cadenas
+  UTF-8 únicas, en orden de aparición.
+- Orden de las cadenas: k números u32 con las cadenas en orden alfabético,
+  para buscar una cadena con búsqueda binaria.
+- Registros de ancho fijo en dos arreglos paralelos: una etiqueta u8 con el
+  tipo de cada campo y un valor i64 por campo (número de cadena, entero,
+  bits del flotante o booleano).
+- Índices: por cada campo indexado, entradas u64 ordenadas con el número de
+  cadena en los 32 bits altos y el número de registro en los bajos.
+- Pie: metadatos JSON (campos, cantidades, desplazamientos y la firma del
+  almacén de origen) seguidos de su desplazamiento en u64.
+"""
+import json
+import mmap
+import os
+import struct
+from array import array
+from src.storage.concurrency import atomic_write
+from src.storage.journal import JournalStore
+from src.storage.sharding import ShardedStore
+
+MAGIC = b"MNASNAP1"
+SUFFIX = ".snap"
+
+ABSENT, NULL, STRING, INTEGER, FLOAT, BOOLEAN, JSON = range(7)
+
+_OFFSET = struct.Struct("<Q")
+_ORDER = struct.Struct("<I")
+_DOUBLE = struct.Struct("<d")
+_INT64 = struct.Struct("<q")
+_INT64_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+_OPEN = {}
+
+
+def write_snapshot(records, path, indexes=(), source=None):
+    """
+    Escribe una instantánea binaria de forma atómica.
+
+    :param records: Iterable de diccionarios.
+    :param path: Ruta del archivo a escribir.
+    :param indexes: Campos de texto por los que se podrá buscar.
+    :param source: Firma del almacén de origen (opcional, serializable en
+        JSON).
+    :return: Número de registros escritos.
+    """
+    fields, strings, tags, values, count = _encode_records(records)
+
+    def write(file):
+        """Escribe las secciones y el pie."""
+        meta = {"fields": fields, "count": count, "strings": len(strings),
+                "source": source}
+        file.write(MAGIC)
+        _write_strings(file, strings, meta)
+        meta["tags"] = file.tell()
+        file.write(tags)
+        meta["values"] = file.tell()
+        file.write(_little_endian(values))
+        meta["indexes"] = _write_indexes(file, indexes, fields, tags,
+                                         values)
+        footer = file.tell()
+        file.write(json.dumps(meta).encode("utf-8"))
+        file.write(_OFFSET.pack(footer))
+
+    atomic_write(path, write, binary=True)
+    return count
+
+
+def _encode_records(records):
+    """
+    Codifica los registros en filas de ancho fijo.
+
+    :param records: Iterable de diccionarios.
+    :return: Tupla (campos, tabla de cadenas, etiquetas, valores, número
+        de registros); la tabla asocia cada cadena a su número.
+    """
+    fields = []
+    positions = {}
+    strings = {}
+    tags = bytearray()
+    values = array("q")
+    count = 0
+    for record in records:
+        for field in record:
+            if field not in positions:
+                positions[field] = len(fields)
+                fields.append(field)
+                # Los registros previos no tienen el campo nuevo.
+                tags, values = _add_column(tags, values, len(fields), count)
+        row = len(tags)
+        tags.extend(bytes(len(fields)))
+        values.frombytes(bytes(8 * len(fields)))
+        for field, value in record.items():
+            cell = row + positions[field]
+            if value.__class__ is str:
+                number = strings.get(value)
+                if number is None:
+                    number = strings[value] = len(strings)
+                tags[cell] = STRING
+                values[cell] = number
+            else:
+                tags[cell], values[cell] = _encode(value, strings)
+        count += 1
+    return fields, strings, tags, values, count
+
+
+def _write_strings(file, strings, meta):
+    """
+    Escribe la tabla de cadenas y su orden alfabético, y anota sus
+    desplazamientos en los metadatos.
+
+    :param file: Archivo abierto en modo binario.
+    :param strings: Diccionario cadena -> número, en orden de aparición.
+    :param meta: Diccionario de metadatos.
+    """
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = array("Q", [0])
+    offset = 0
+    for data in encoded:
+        offset += len(data)
+        offsets.append(offset)
+    meta["string_offsets"] = file.tell()
+    file.write(_little_endian(offsets))
+    meta["string_data"] = file.tell()
+    file.write(b"".join(encoded))
+    meta["string_order"] = file.tell()
+    file.write(_little_endian(array(
+        "I", sorted(range(len(encoded)), key=encoded.__getitem__))))
+
+
+def _write_indexes(file, indexes, fields, tags, values):
+    """
+    Escribe los índices de los campos de texto.
+
+    :param file: Archivo abierto en modo binario.
+    :param indexes: Campos a indexar.
+    :param fields: Lista de campos de los registros.
+    :param tags: Etiquetas de las filas.
+    :param values: Valores de las filas.
+    :return: Diccionario campo -> [desplazamiento, entradas].
+    """
+    written = {}
+    width = len(fields)
+    for field in indexes:
+        if field not in fields:
+            continue
+        column = fields.index(field)
+        entries = array("Q", sorted(
+            values[cell] << 32 | number
+            for number, cell in enumerate(range(column, len(tags), width))
+            if tags[cell] == STRING))
+        written[field] = [file.tell(), len(entries)]
+        file.write(_little_endian(entries))
+    return written
+
+
+class BinarySnapshot:
+    """
+    Clase para leer una instantánea binaria. Se comporta como la lista
+    que devuelven los métodos load_*: admite len(), índices e iteración y
+    entrega diccionarios nuevos en cada acceso.
+    """
+
+    def __init__(self, path):
+        """
+        Abre la instantánea con mmap y lee solo sus metadatos.
+
+        :param path: Ruta del archivo.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} no es una instantánea binaria.")
+        footer = _OFFSET.unpack_from(self._map, len(self._map) - 8)[0]
+        self._meta = json.loads(self._map[footer:len(self._map) - 8])
+        self.fields = self._meta["fields"]
+        self.source = self._meta["source"]
+        self._count = self._meta["count"]
+        self._row = struct.Struct(f"<{len(self.fields)}q")
+
+    def __len__(self):
+        """
+        Obtiene el número de registros.
+
+        :return: Entero.
+        """
+        return self._count
+
+    def __getitem__(self, position):
+        """
+        Decodifica un registro o una rebanada de registros.
+
+        :param position: Índice o slice.
+        :return: Diccionario o lista de diccionarios.
+        """
+        if isinstance(position, slice):
+            return [self._record(number)
+                    for number in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("Registro fuera de rango.")
+        return self._record(position)
+
+    def __iter__(self):
+        """
+        Recorre los registros en orden.
+
+        :return: Generador de diccionarios.
+        """
+        for number in range(self._count):
+            yield self._record(number)
+
+    def close(self):
+        """
+        Libera el mapa de memoria y su descriptor de archivo.
+        """
+        self._map.close()
+
+    @property
+    def closed(self):
+        """
+        Indica si la instantánea ya se cerró.
+
+        :return: True si se liberó el mapa de memoria.
+        """
+        return self._map.closed
+
+    def find(self, field, value):
+        """
+        Busca los registros cuyo campo indexado tiene un valor, sin
+        recorrer los demás.
+
+        :param field: Campo indexado al escribir la instantánea.
+        :param value: Cadena buscada.
+        :return: Lista de diccionarios en orden de registro.
+        """
+        if field not in self._meta["indexes"]:
+            raise KeyError(f"El campo {field} no está indexado.")
+        number = self._find_string(value)
+        if number is None:
+            return []
+        start, size = self._meta["indexes"][field]
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            entry = _OFFSET.unpack_from(self._map, start + middle * 8)[0]
+            if entry >> 32 < number:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < size:
+            entry = _OFFSET.unpack_from(self._map, start + low * 8)[0]
+            if entry >> 32 != number:
+                break
+            found.append(self._record(entry & 0xFFFFFFFF))
+            low += 1
+        return found
+
+    def _record(self, number):
+        """
+        Decodifica un registro.
+
+        :param number: Número de registro.
+        :return: Diccionario.
+        """
+        width = len(self.fields)
+        start = self._meta["tags"] + number * width
+        tags = self._map[start:start + width]
+        values = self._row.unpack_from(
+            self._map, self._meta["values"] + number * self._row.size)
+        record = {}
+        for field, tag, value in zip(self.fields, tags, values):
+            if tag == ABSENT:
+                continue
+            if tag == STRING:
+                record[field] = self._string(value)
+            elif tag == INTEGER:
+                record[field] = value
+            elif tag == NULL:
+                record[field] = None
+            elif tag == FLOAT:
+                record[field] = _DOUBLE.unpack(_INT64.pack(value))[0]
+            elif tag == BOOLEAN:
+                record[field] = bool(value)
+            else:
+                record[field] = json.loads(self._string(value))
+        return record
+
+    def _string(self, number):
+        """
+        Decodifica una cadena de la tabla.
+
+        :param number: Número de la cadena.
+        :return: Cadena.
+        """
+        return self._encoded(number).decode("utf-8")
+
+    def _encoded(self, number):
+        """
+        Obtiene los bytes UTF-8 de una cadena de la tabla.
+
+        :param number: Número de la cadena.
+        :return: bytes.
+        """
+        start, end = struct.unpack_from(
+            "<QQ", self._map, self._meta["string_offsets"] + number * 8)
+        data = self._meta["string_data"]
+        return self._map[data + start:data + end]
+
+    def _find_string(self, value):
+        """
+        Busca una cadena en la tabla ordenada.
+
+        :param value: Cadena buscada.
+        :return: Número de la cadena o None si no está.
+        """
+        if not isinstance(value, str):
+            return None
+        value = value.encode("utf-8")
+        low, high = 0, self._meta["strings"]
+        while low < high:
+            middle = (low + high) // 2
+            if self._encoded(self._ordered(middle)) < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._meta["strings"]:
+            number = self._ordered(low)
+            if self._encoded(number) == value:
+                return number
+        return None
+
+    def _ordered(self, position):
+        """
+        Obtiene el número de la cadena en una posición del orden
+        alfabético.
+
+        :param position: Posición en el orden.
+        :return: Número de la cadena.
+        """
+        return _ORDER.unpack_from(
+            self._map, self._meta["string_order"] + position * 4)[0]
+
+
+def snapshot_path(store):
+    """
+    Obtiene la ruta de la instantánea binaria de un almacén JSON.
+
+    :param store: JournalStore o ShardedStore de particiones JSON.
+    :return: Ruta '<archivo>.snap'.
+    """
+    if (not isinstance(store, (JournalStore, ShardedStore))
+            or store.path is None):
+        raise ValueError("Las instantáneas binarias solo están disponibles "
+                         "con el respaldo 'json'.")
+    return store.path + SUFFIX
+
+
+def build_snapshot(store, indexes=()):
+    """
+    Regenera la instantánea binaria de un almacén a partir de sus datos
+    (instantánea JSON más diario).
+
+    :param store: JournalStore o ShardedStore.
+    :param indexes: Campos a indexar.
+    :return: Número de registros escritos.
+    """
+    with store.locked():
+        return write_snapshot(store.iter_records(), snapshot_path(store),
+                              indexes, _signature(store))
+
+
+def open_snapshot(store, indexes=(), rebuild=True):
+    """
+    Abre la instantánea binaria vigente de un almacén. La instancia abierta
+    se comparte en el proceso mientras el almacén no cambie; cuando cambia,
+    la anterior se cierra y deja de poder leerse.
+
+    :param store: JournalStore o ShardedStore.
+    :param indexes: Campos a indexar si hay que regenerarla.
+    :param rebuild: Si es True se regenera cuando falta o está vencida.
+    :return: BinarySnapshot o None si no hay una vigente y rebuild es
+        False.
+    """
+    path = os.path.abspath(snapshot_path(store))
+    signature = _signature(store)
+    snapshot = _OPEN.get(path)
+    if snapshot is not None:
+        if snapshot.source == signature:
+            return snapshot
+        del _OPEN[path]
+        snapshot.close()
+        snapshot = None
+    if os.path.exists(path):
+        snapshot = BinarySnapshot(path)
+        if snapshot.source != signature:
+            snapshot.close()
+            snapshot = None
+    if snapshot is None:
+        if not rebuild:
+            return None
+        build_snapshot(store, indexes)
+        snapshot = BinarySnapshot(path)
+    _OPEN[path] = snapshot
+    return snapshot
+
+
+def _signature(store):
+    """
+    Obtiene la firma del almacén tal como se guarda en los metadatos JSON.
+
+    :param store: Almacén de origen.
+    :return: Firma convertida a listas.
+    """
+    return json.loads(json.dumps(store.signature()))
+
+
+def _add_column(tags, values, width, count):
+    """
+    Ensancha las filas ya leídas con una columna vacía al final.
+
+    :param tags: Etiquetas de las filas leídas.
+    :param values: Valores de las filas leídas.
+    :param width: Número de campos contando el nuevo.
+    :param count: Número de filas leídas.
+    :return: Tupla (etiquetas, valores) ensanchadas.
+    """
+    if not count:
+        return tags, values
+    old = width - 1
+    new_tags = bytearray(width * count)
+    new_values = array("q", bytes(8 * width * count))
+    for number in range(count):
+        new_tags[number * width:number * width + old] = (
+            tags[number * old:(number + 1) * old])
+        new_values[number * width:number * width + old] = (
+            values[number * old:(number + 1) * old])
+    return new_tags, new_values
+
+
+def _encode(value, strings):
+    """
+    Codifica un valor como etiqueta y entero de 8 bytes.
+
+    :param value: Valor JSON.
+    :param strings: Diccionario cadena -> número provisional.
+    :return: Tupla (etiqueta, valor).
+    """
+    if value is None:
+        return NULL, 0
+    if isinstance(value, bool):
+        return BOOLEAN, int(value)
+    if isinstance(value, int) and _INT64_RANGE[0] <= value <= _INT64_RANGE[1]:
+        return INTEGER, value
+    if isinstance(value, float):
+        return FLOAT, _INT64.unpack(_DOUBLE.pack(value))[0]
+    if isinstance(value, str):
+        return STRING, strings.setdefault(value, len(strings))
+    text = json.dumps(value)
+    return JSON, strings.setdefault(text, len(strings))
+
+
+def _little_endian(numbers):
+    """
+    Obtiene los bytes little-endian de un arreglo.
+
+    :param numbers: array de enteros.
+    :return: bytes.
+    """
+    if struct.pack("=H", 1) != struct.pack("<H", 1):
+        numbers = array(numbers.typecode, numbers)
+        numbers.byteswap()
+    return numbers.tobytes()
@@ -0,0 +1,155 @@
+"""
+Módulo con un índice ordenado para buscar registros por prefijo.
+
+Es una vista de Repository: recibe cada alta y baja con add(record) y
+remove(record). Las altas se acumulan y se integran a la lista ordenada en
+la siguiente consulta, de modo que cargar un millón de registros cuesta un
+solo ordenamiento y no un millón de inserciones.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+_SEPARATOR = "\x00"
+INSERT_LIMIT = 16
+CHUNK_SIZE = 256
+
+
+def sort_key(value):
+    """
+    Obtiene la clave con la que el índice ordena una cadena: sin
+    mayúsculas seguida de la original, para que el orden sea total.
+
+    :param value: Cadena.
+    :return: Cadena ordenable.
+    """
+    return value.casefold() + _SEPARATOR + value
+
+
+class SortedIndex:
+    """
+    Clase para representar un índice ordenado sin distinguir mayúsculas.
+    """
+
+    def __init__(self, key_of):
+        """
+        Inicializa un índice vacío.
+
+        :param key_of: Función que obtiene del registro la cadena indexada.
+        """
+        self.key_of = key_of
+        self._keys = []
+        self._pending = []
+        self._unindexed = 0
+
+    def add(self, record):
+        """
+        Registra la clave de un registro.
+
+        :param record: Diccionario con el registro.
+        """
+        key = self._key(record)
+        if key is None:
+            self._unindexed += 1
+        else:
+            self._pending.append(key)
+
+    def remove(self, record):
+        """
+        Quita una aparición de la clave de un registro.
+
+        :param record: Diccionario con el registro.
+        """
+        key = self._key(record)
+        if key is None:
+            self._unindexed -= 1
+            return
+        self._merge()
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def search(self, prefix, limit=None):
+        """
+        Busca los valores que empiezan con un prefijo, en orden alfabético
+        y sin repetidos.
+
+        :param prefix: Prefijo a buscar, sin distinguir mayúsculas.
+        :param limit: Número máximo de resultados (opcional).
+        :return: Lista de cadenas.
+        """
+        self._merge()
+        folded = prefix.casefold()
+        results = []
+        for position in range(bisect_left(self._keys, folded),
+                              len(self._keys)):
+            key = self._keys[position]
+            if not key.startswith(folded):
+                break
+            value = key.split(_SEPARATOR, 1)[1]
+            if results and results[-1] == value:
+                continue
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(value)
+        return results
+
+    def iter_values(self, start=None):
+        """
+        Recorre los valores en orden alfabético y sin repetidos, desde el
+        primero que no va antes de start. Se avanza por bloques buscando
+        cada uno después de la última clave vista, de modo que las altas y
+        bajas hechas durante el recorrido no lo desordenan.
+
+        :param start: Cadena desde la que se empieza, incluida (opcional).
+        :return: Generador de cadenas.
+        """
+        last_seen = None
+        while True:
+            self._merge()
+            if last_seen is not None:
+                low = bisect_right(self._keys, last_seen)
+            elif start is not None:
+                low = bisect_left(self._keys, sort_key(start))
+            else:
+                low = 0
+            chunk = self._keys[low:low + CHUNK_SIZE]
+            if not chunk:
+                return
+            for position, key in enumerate(chunk):
+                if position == 0 or chunk[position - 1] != key:
+                    yield key.split(_SEPARATOR, 1)[1]
+            last_seen = chunk[-1]
+
+    def unindexed(self):
+        """
+        Obtiene cuántos registros no están en el índice porque su valor no
+        es una cadena.
+
+        :return: Entero.
+        """
+        return self._unindexed
+
+    def _key(self, record):
+        """
+        Obtiene la clave ordenable de un registro: la cadena sin
+        mayúsculas seguida de la original.
+
+        :param record: Diccionario con el registro.
+        :return: Cadena o None si el valor no es una cadena.
+        """
+        value = self.key_of(record)
+        if not isinstance(value, str):
+            return None
+        return sort_key(value)
+
+    def _merge(self):
+        """
+        Integra las altas pendientes a la lista ordenada: pocas se insertan
+        una por una y muchas con un solo ordenamiento.
+        """
+        if len(self._pending) <= INSERT_LIMIT:
+            for key in self._pending:
+                insort(self._keys, key)
+        else:
+            self._keys.extend(self._pending)
+            self._keys.sort()
+        self._pending = []
@@ -0,0 +1,285 @@
+"""
+Módulo para almacenar registros en una base de datos SQLite.
+
+Cada conjunto de datos es una tabla con una columna por campo. La base usa
+el modo WAL y las sentencias se construyen una sola vez por tabla a partir
+de las plantillas del módulo, de modo que sqlite3 las reutiliza ya
+preparadas. Un disparador por tabla incrementa
+un contador de versión en la misma transacción que cada cambio, lo que
+permite a otros procesos detectar modificaciones con una sola consulta.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+
+from src.metrics import metrics
+from src.storage.concurrency import FileLock
+from src.storage.store import Store
+
+_LOCAL = threading.local()
+_CREATED = set()
+
+SELECT_SQL = "SELECT {names} FROM {table} ORDER BY id"
+INSERT_SQL = "INSERT INTO {table} ({names}) VALUES ({marks})"
+FIRST_SQL = "SELECT id FROM {table} WHERE {match} ORDER BY id LIMIT 1"
+DELETE_SQL = "DELETE FROM {table} WHERE id = (" + FIRST_SQL + ")"
+UPDATE_SQL = ("UPDATE {table} SET {assignments} WHERE id = ("
+              + FIRST_SQL + ")")
+
+
+def _connect(path):
+    """
+    Obtiene la conexión del hilo actual a una base de datos.
+
+    :param path: Ruta absoluta de la base de datos.
+    :return: Conexión sqlite3.
+    """
+    connections = getattr(_LOCAL, "connections", None)
+    if connections is None:
+        connections = _LOCAL.connections = {}
+    connection = connections.get(path)
+    if connection is None:
+        connection = sqlite3.connect(path, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS versions ("
+            "name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        connections[path] = connection
+    return connection
+
+
+@contextmanager
+def _transaction(connection):
+    """
+    Agrupa sentencias en una transacción explícita que se revierte si hay
+    un error.
+
+    :param connection: Conexión sqlite3 en modo autocommit.
+    """
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    connection.execute("COMMIT")
+
+
+@lru_cache(maxsize=None)
+def _statement(template, table, columns):
+    """
+    Construye, una sola vez por tabla, una sentencia a partir de una de las
+    plantillas del módulo.
+
+    :param template: Plantilla SQL.
+    :param table: Nombre de la tabla.
+    :param columns: Tupla con las columnas de la tabla.
+    :return: Sentencia SQL.
+    """
+    return template.format(
+        table=table, names=", ".join(columns),
+        marks=", ".join("?" for _ in columns),
+        match=" AND ".join(f"{column} IS ?" for column in columns),
+        assignments=", ".join(f"{column} = ?" for column in columns))
+
+
+def close_connections():
+    """
+    Cierra las conexiones abiertas por el hilo actual.
+    """
+    for connection in getattr(_LOCAL, "connections", {}).values():
+        connection.close()
+    _LOCAL.connections = {}
+
+
+class SqliteStore(Store):
+    """
+    Clase para representar una tabla de SQLite como almacén de registros.
+    """
+
+    def __init__(self, path, table, columns, indexes=()):
+        """
+        Inicializa el almacén y crea la tabla si no existe.
+
+        :param path: Ruta del archivo de la base de datos.
+        :param table: Nombre de la tabla.
+        :param columns: Tupla con los campos de los registros.
+        :param indexes: Tuplas de columnas a indexar (opcional).
+        """
+        self.path = os.path.abspath(path)
+        self.table = table
+        self.columns = columns
+        self._dataset = os.path.basename(self.identity())
+        self._create(indexes)
+
+    def _create(self, indexes):
+        """
+        Crea la tabla, sus índices y el disparador de versión.
+
+        :param indexes: Tuplas de columnas a indexar.
+        """
+        if (self.path, self.table) in _CREATED:
+            return
+        connection = _connect(self.path)
+        with _transaction(connection):
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"(id INTEGER PRIMARY KEY, {', '.join(self.columns)})")
+            for columns in indexes:
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS "
+                    f"{self.table}_{'_'.join(columns)} "
+                    f"ON {self.table} ({', '.join(columns)})")
+            connection.execute(
+                "INSERT OR IGNORE INTO versions VALUES (?, 0)", (self.table,))
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                connection.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS "
+                    f"{self.table}_{event.lower()}_version "
+                    f"AFTER {event} ON {self.table} BEGIN "
+                    f"UPDATE versions SET version = version + 1 "
+                    f"WHERE name = '{self.table}'; END")
+        _CREATED.add((self.path, self.table))
+
+    def identity(self):
+        """
+        Obtiene la ruta de la base de datos junto con la tabla.
+
+        :return: Cadena con la identidad del almacén.
+        """
+        return f"{self.path}#{self.table}"
+
+    def _sql(self, template):
+        """
+        Obtiene la sentencia de esta tabla para una plantilla del módulo.
+
+        :param template: Plantilla SQL.
+        :return: Sentencia SQL.
+        """
+        return _statement(template, self.table, tuple(self.columns))
+
+    def locked(self):
+        """
+        Obtiene el candado entre procesos de la base de datos.
+
+        :return: FileLock reentrante.
+        """
+        return FileLock(self.path)
+
+    def exists(self):
+        """
+        Indica si la base de datos existe.
+
+        :return: True si el archivo de la base de datos existe.
+        """
+        return os.path.exists(self.path)
+
+    def iter_records(self):
+        """
+        Recorre los registros en orden de inserción.
+
+        :return: Generador de diccionarios.
+        """
+        cursor = _connect(self.path).execute(self._sql(SELECT_SQL))
+        columns = self.columns
+        return metrics.scanned((dict(zip(columns, row)) for row in cursor),
+                               dataset=self._dataset)
+
+    def append(self, record):
+        """
+        Agrega un registro.
+
+        :param record: Diccionario con el registro.
+        """
+        with metrics.timer("write", dataset=self._dataset):
+            _connect(self.path).execute(self._sql(INSERT_SQL),
+                                        self._values(record))
+
+    def extend(self, records):
+        """
+        Agrega varios registros en una sola transacción.
+
+        :param records: Lista de diccionarios.
+        """
+        connection = _connect(self.path)
+        with metrics.timer("write", dataset=self._dataset), \
+                _transaction(connection):
+            connection.executemany(
+                self._sql(INSERT_SQL),
+                [self._values(record) for record in records])
+
+    def remove(self, record):
+        """
+        Elimina el primer registro con el mismo contenido.
+
+        :param record: Diccionario con el contenido a eliminar.
+        """
+        with metrics.timer("write", dataset=self._dataset):
+            _connect(self.path).execute(self._sql(DELETE_SQL),
+                                        self._values(record))
+
+    def replace(self, old, new):
+        """
+        Reemplaza el primer registro con el mismo contenido.
+
+        :param old: Diccionario con el contenido anterior.
+        :param new: Diccionario con el contenido nuevo.
+        """
+        with metrics.timer("write", dataset=self._dataset):
+            _connect(self.path).execute(
+                self._sql(UPDATE_SQL), self._values(new) + self._values(old))
+
+    def change_many(self, changes):
+        """
+        Aplica varias bajas y modificaciones en una sola transacción.
+
+        :param changes: Lista de tuplas (anterior, nuevo) donde nuevo es
+            None para una baja.
+        """
+        connection = _connect(self.path)
+        with metrics.timer("write", dataset=self._dataset), \
+                _transaction(connection):
+            for old, new in changes:
+                if new is None:
+                    connection.execute(self._sql(DELETE_SQL),
+                                       self._values(old))
+                else:
+                    connection.execute(self._sql(UPDATE_SQL),
+                                       self._values(new) + self._values(old))
+
+    def rewrite(self, records):
+        """
+        Reemplaza todos los registros en una sola transacción.
+
+        :param records: Lista de diccionarios.
+        """
+        connection = _connect(self.path)
+        with metrics.timer("write", dataset=self._dataset), \
+                _transaction(connection):
+            connection.execute(f"DELETE FROM {self.table}")
+            connection.executemany(
+                self._sql(INSERT_SQL),
+                [self._values(record) for record in records])
+
+    def signature(self):
+        """
+        Obtiene la versión de la tabla.
+
+        :return: Entero que se incrementa con cada cambio.
+        """
+        row = _connect(self.path).execute(
+            "SELECT version FROM versions WHERE name = ?",
+            (self.table,)).fetchone()
+        return row[0]
+
+    def _values(self, record):
+        """
+        Ordena los valores de un registro según las columnas.
+
+        :param record: Diccionario con el registro.
+        :return: Tupla de valores.
+        """
+        return tuple(record.get(column) for column in self.columns)
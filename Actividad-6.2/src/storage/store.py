@@ -0,0 +1,146 @@
+"""
+Módulo que define la interfaz común de los almacenes de registros.
+"""
+from contextlib import nullcontext
+
+
+class Store:
+    """
+    Clase base de los almacenes. Un almacén guarda una lista ordenada de
+    diccionarios; las bajas y modificaciones afectan al primer registro con
+    el mismo contenido.
+    """
+
+    def identity(self):
+        """
+        Obtiene una clave que identifica los datos del almacén dentro del
+        proceso.
+
+        :return: Cadena con la identidad del almacén.
+        """
+        raise NotImplementedError
+
+    def locked(self):
+        """
+        Obtiene un contexto que excluye a otros escritores, para agrupar
+        una lectura y las escrituras que dependen de ella.
+
+        :return: Administrador de contexto reentrante.
+        """
+        return nullcontext()
+
+    def exists(self):
+        """
+        Indica si el almacén tiene datos guardados.
+
+        :return: True si existen datos.
+        """
+        raise NotImplementedError
+
+    def iter_records(self):
+        """
+        Recorre los registros en orden.
+
+        :return: Generador de diccionarios.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Carga todos los registros.
+
+        :return: Lista de diccionarios.
+        """
+        return list(self.iter_records())
+
+    def append(self, record):
+        """
+        Agrega un registro.
+
+        :param record: Diccionario con el registro.
+        """
+        raise NotImplementedError
+
+    def extend(self, records):
+        """
+        Agrega varios registros en una sola escritura.
+
+        :param records: Lista de diccionarios.
+        """
+        raise NotImplementedError
+
+    def remove(self, record):
+        """
+        Elimina el primer registro con el mismo contenido.
+
+        :param record: Diccionario con el contenido a eliminar.
+        """
+        raise NotImplementedError
+
+    def replace(self, old, new):
+        """
+        Reemplaza el primer registro con el mismo contenido.
+
+        :param old: Diccionario con el contenido anterior.
+        :param new: Diccionario con el contenido nuevo.
+        """
+        raise NotImplementedError
+
+    def change_many(self, changes):
+        """
+        Aplica varias bajas y modificaciones en orden. Los almacenes que
+        pueden hacerlo las escriben de una sola vez; por omisión se aplican
+        una por una.
+
+        :param changes: Lista de tuplas (anterior, nuevo) donde nuevo es
+            None para una baja.
+        """
+        for old, new in changes:
+            if new is None:
+                self.remove(old)
+            else:
+                self.replace(old, new)
+
+    def rewrite(self, records):
+        """
+        Reemplaza todos los registros.
+
+        :param records: Lista de diccionarios.
+        """
+        raise NotImplementedError
+
+    def position(self):
+        """
+        Obtiene una posición a partir de la cual tail() puede devolver los
+        cambios posteriores.
+
+        :return: Posición o None si el almacén no admite lecturas parciales.
+        """
+        return None
+
+    def tail(self, position):  # pylint: disable=unused-argument
+        """
+        Lee los cambios posteriores a una posición.
+
+        :param position: Posición devuelta por position() o por tail().
+        :return: Tupla (entradas, nueva posición) o None si hay que leer
+            todo de nuevo. Las entradas usan el formato del diario.
+        """
+        return None
+
+    def after_write(self, callback):
+        """
+        Programa una tarea para cuando las escrituras ya aceptadas lleguen
+        al archivo. Los almacenes que escriben al momento no la ejecutan.
+
+        :param callback: Función que recibe la posición antes de escribir
+            y la posición después, o None si la escritura falló.
+        """
+
+    def signature(self):
+        """
+        Obtiene un valor que cambia cada vez que se modifican los datos.
+
+        :return: Valor comparable.
+        """
+        raise NotImplementedError
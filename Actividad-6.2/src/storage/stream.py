@@ -0,0 +1,124 @@
+"""
+Módulo para leer incrementalmente un archivo con una lista JSON.
+"""
+import os
+import json
+from src.metrics import metrics
+
+CHUNK_SIZE = 64 * 1024
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE):
+    """
+    Recorre los elementos de una lista JSON leyendo el archivo por bloques,
+    de modo que la memoria usada no depende del tamaño de la lista.
+
+    :param path: Ruta del archivo.
+    :param chunk_size: Número de caracteres leídos por bloque.
+    :return: Generador con los elementos de la lista.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        reader = _Reader(file, chunk_size, os.path.basename(path))
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.decode()
+            if reader.next_char() == "]":
+                return
+
+
+class _Reader:
+    """
+    Clase auxiliar que mantiene el búfer de lectura.
+    """
+
+    def __init__(self, file, chunk_size, dataset=None):
+        """
+        Inicializa el lector.
+
+        :param file: Archivo abierto en modo texto.
+        :param chunk_size: Número de caracteres leídos por bloque.
+        :param dataset: Nombre del archivo para las métricas (opcional).
+        """
+        self.file = file
+        self.chunk_size = chunk_size
+        self.dataset = dataset
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _fill(self):
+        """
+        Lee el siguiente bloque descartando lo ya consumido.
+
+        :return: False si el archivo se terminó.
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # json.dump escapa lo que no es ASCII: caracteres y bytes coinciden.
+        metrics.increment("bytes_read", len(chunk), dataset=self.dataset)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """
+        Obtiene el siguiente carácter que no es espacio sin consumirlo.
+
+        :return: Carácter o cadena vacía al final del archivo.
+        """
+        while True:
+            while (self.position < len(self.buffer)
+                   and self.buffer[self.position] in _WHITESPACE):
+                self.position += 1
+            if self.position < len(self.buffer) or not self._fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def next_char(self):
+        """
+        Consume el separador entre elementos.
+
+        :return: ',' o ']'.
+        """
+        char = self.peek()
+        if char not in (",", "]"):
+            raise ValueError("Se esperaba ',' o ']' en la lista JSON.")
+        self.position += 1
+        return char
+
+    def expect(self, char):
+        """
+        Consume un carácter obligatorio.
+
+        :param char: Carácter esperado.
+        """
+        if self.peek() != char:
+            raise ValueError(f"Se esperaba '{char}' en la lista JSON.")
+        self.position += 1
+
+    def decode(self):
+        """
+        Decodifica el siguiente elemento, leyendo más bloques si está
+        incompleto.
+
+        :return: Elemento decodificado.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            if end < len(self.buffer) or not self._fill():
+                self.position = end
+                return value
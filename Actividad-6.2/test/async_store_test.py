@@ -0,0 +1,139 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+from src.reservation import async_store
+from src.reservation.async_store import AsyncReservationStore
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from test.helpers import enter_temp_dir
+
+ROWS = [("Ana", "Hotel A", 1, "2024-01-01", "2024-01-03"),
+        ("Beto", "Hotel A", 1, "2024-01-02", "2024-01-04"),
+        ("Beto", "Hotel A", 2, "2024-01-02", "2024-01-04"),
+        ("Caro", "Hotel B", 1, "2024-01-01", None)]
+
+
+class AsyncStoreTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Clase de prueba para la interfaz asíncrona de las reservas.
+    """
+
+    def setUp(self):
+        """
+        Cambia a un directorio temporal vacío.
+        """
+        enter_temp_dir(self)
+
+    def tearDown(self):
+        """
+        Restaura la configuración.
+        """
+        datasets.configure(backend="json")
+
+    async def test_matches_sync_api(self):
+        """
+        Prueba que los resultados coinciden con los métodos síncronos y que
+        las altas de la misma vuelta se guardan en un solo lote.
+        """
+        with mock.patch.object(async_store, "book_reservations",
+                               wraps=async_store.book_reservations) as batch:
+            async with AsyncReservationStore() as store:
+                created = await asyncio.gather(
+                    *(store.create(*row) for row in ROWS))
+        self.assertEqual(batch.call_count, 1)
+        async_data = Reservation.load_reservations_data()
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            expected = [Reservation.create_reservation(*row) for row in ROWS]
+            sync_data = Reservation.load_reservations_data()
+        self.assertEqual(async_data, sync_data)
+        self.assertEqual([item and item.to_dict() for item in created],
+                         [item and item.to_dict() for item in expected])
+
+    async def test_operations_keep_order(self):
+        """
+        Prueba que una cancelación encolada después de un alta se aplica
+        después de ella.
+        """
+        async with AsyncReservationStore() as store:
+            await asyncio.gather(store.create(*ROWS[0]),
+                                 store.cancel(*ROWS[0][:4]),
+                                 store.create(*ROWS[1]))
+        self.assertEqual(len(Reservation.load_reservations_data()), 1)
+
+    async def test_timeout_before_flush(self):
+        """
+        Prueba que una operación vencida antes de escribirse no se aplica.
+        """
+        async with AsyncReservationStore() as store:
+            with self.assertRaises(asyncio.TimeoutError):
+                await store.create(*ROWS[0], timeout=0)
+            self.assertIsNotNone(await store.create(*ROWS[2]))
+        self.assertEqual(Reservation.load_reservations_data(),
+                         [Reservation(*ROWS[2]).to_dict()])
+
+    async def test_iter(self):
+        """
+        Prueba el recorrido por lotes con filtro.
+        """
+        for row in ROWS:
+            Reservation.create_reservation(*row)
+        async with AsyncReservationStore() as store:
+            names = [record["customer_name"] async for record in store.iter(
+                lambda record: record["hotel_name"] == "Hotel A",
+                batch_size=1)]
+        self.assertEqual(names, ["Ana", "Beto"])
+
+    async def test_create_returns_stored_dates(self):
+        """
+        Prueba que el alta devuelve las fechas como quedaron guardadas,
+        igual que create_reservation.
+        """
+        async with AsyncReservationStore() as store:
+            created = await store.create("Ana", "Hotel A", 1, date(2024, 3, 1))
+        self.assertEqual(created.check_in_date, "2024-03-01")
+        self.assertEqual(created.to_dict(),
+                         Reservation.load_reservations_data()[0])
+
+    async def test_create_accepts_keywords(self):
+        """
+        Prueba que el alta acepta los mismos argumentos con nombre que
+        create_reservation.
+        """
+        async with AsyncReservationStore() as store:
+            created = await store.create(
+                customer_name="Ana", hotel_name="Hotel A", room_number=1,
+                check_in_date="2024-03-01", check_out_date="2024-03-04")
+        self.assertEqual(created.check_out_date, "2024-03-04")
+
+    async def test_close_writes_queued_operations(self):
+        """
+        Prueba que close escribe las operaciones encoladas en la misma
+        vuelta del ciclo antes de liberar el hilo escritor.
+        """
+        store = AsyncReservationStore()
+        pending = asyncio.ensure_future(store.create(*ROWS[0]))
+        await asyncio.sleep(0)
+        await store.close()
+        self.assertIsNotNone(await pending)
+        self.assertEqual(len(Reservation.load_reservations_data()), 1)
+
+    async def test_iter_sqlite(self):
+        """
+        Prueba el recorrido por lotes con el respaldo SQLite, cuyos
+        cursores solo pueden usarse en el hilo que los creó.
+        """
+        datasets.configure(backend="sqlite")
+        for row in ROWS:
+            Reservation.create_reservation(*row)
+        async with AsyncReservationStore() as store:
+            names = [record["customer_name"]
+                     async for record in store.iter(batch_size=1)]
+        self.assertEqual(names, ["Ana", "Beto", "Caro"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+from src.availability.availability import RoomAvailability, night_range
+
+
+class RoomAvailabilityTest(unittest.TestCase):
+    """
+    Clase de prueba para la clase RoomAvailability.
+    """
+
+    def setUp(self):
+        """
+        Prepara una ocupación con dos reservas en la habitación 1.
+        """
+        self.availability = RoomAvailability()
+        self.availability.add(self._record(1, "2024-02-10", "2024-02-12"))
+        self.availability.add(self._record(1, "2024-02-15", "2024-02-18"))
+
+    @staticmethod
+    def _record(room_number, check_in_date, check_out_date=None):
+        """
+        Construye una reserva de prueba en 'Test Hotel'.
+        """
+        return {"customer_name": "John Doe", "hotel_name": "Test Hotel",
+                "room_number": room_number, "check_in_date": check_in_date,
+                "check_out_date": check_out_date}
+
+    def test_night_range(self):
+        """
+        Prueba la conversión de fechas a intervalos.
+        """
+        start, end = night_range("2024-02-10", "2024-02-12")
+        self.assertEqual(end - start, 2)
+        start, end = night_range("2024-02-10")
+        self.assertEqual(end - start, 1)
+
+    def test_is_free(self):
+        """
+        Prueba la detección de traslapes con intervalos semiabiertos.
+        """
+        self.assertTrue(self.availability.is_free(
+            "Test Hotel", 1, "2024-02-12", "2024-02-15"))
+        self.assertFalse(self.availability.is_free(
+            "Test Hotel", 1, "2024-02-11", "2024-02-13"))
+        self.assertFalse(self.availability.is_free(
+            "Test Hotel", 1, "2024-02-17"))
+        self.assertTrue(self.availability.is_free(
+            "Test Hotel", 2, "2024-02-11", "2024-02-13"))
+
+    def test_free_rooms(self):
+        """
+        Prueba la lista de habitaciones libres de un hotel.
+        """
+        self.assertEqual(self.availability.free_rooms(
+            "Test Hotel", 3, "2024-02-11", "2024-02-13"), [2, 3])
+
+    def test_can_book_respects_room_count(self):
+        """
+        Prueba que un hotel lleno rechaza reservas en otras habitaciones.
+        """
+        record = self._record(2, "2024-02-11", "2024-02-13")
+        self.assertFalse(self.availability.can_book(record, rooms=1))
+        self.assertTrue(self.availability.can_book(record, rooms=2))
+
+    def test_capacity_is_checked_per_night(self):
+        """
+        Prueba que la capacidad se mide por noche y no sobre todo el
+        intervalo, y que el número de habitaciones no limita la numeración.
+        """
+        availability = RoomAvailability()
+        availability.add(self._record(1, "2024-01-01"))
+        availability.add(self._record(2, "2024-01-05"))
+        self.assertEqual(availability.peak_occupancy(
+            "Test Hotel", "2024-01-01", "2024-01-10"), 1)
+        self.assertIsNone(availability.booking_error(
+            self._record(2, "2024-01-02", "2024-01-04"), rooms=2))
+        self.assertTrue(availability.can_book(
+            self._record(101, "2024-01-02", "2024-01-04"), rooms=2))
+        availability.add(self._record(2, "2024-01-01", "2024-01-03"))
+        self.assertTrue(availability.can_book(
+            self._record(1, "2024-01-02", "2024-01-04"), rooms=2))
+        self.assertEqual(availability.free_rooms(
+            "Test Hotel", 2, "2024-01-01", "2024-01-03"), [])
+
+    def test_free_rooms_agree_with_can_book(self):
+        """
+        Prueba que las habitaciones libres siempre pueden reservarse, aun
+        con reservas en habitaciones fuera de la numeración del hotel.
+        """
+        availability = RoomAvailability()
+        availability.add(self._record(101, "2024-01-01"))
+        availability.add(self._record(102, "2024-01-01"))
+        self.assertEqual(availability.free_rooms(
+            "Test Hotel", 2, "2024-01-01"), [])
+        self.assertFalse(availability.is_bookable(
+            "Test Hotel", 1, "2024-01-01", rooms=2))
+        for room in availability.free_rooms("Test Hotel", 3, "2024-01-01"):
+            self.assertTrue(availability.can_book(
+                self._record(room, "2024-01-01"), rooms=3))
+
+    def test_overlapping_legacy_rows(self):
+        """
+        Prueba que una reserva larga guardada antes que otras traslapadas
+        en la misma habitación sigue bloqueándola y cuenta una sola vez.
+        """
+        availability = RoomAvailability()
+        availability.add(self._record(1, "2024-01-01", "2024-01-20"))
+        availability.add(self._record(1, "2024-01-02", "2024-01-04"))
+        availability.add(self._record(1, "2024-01-03", "2024-01-05"))
+        self.assertFalse(availability.is_free(
+            "Test Hotel", 1, "2024-01-10", "2024-01-12"))
+        self.assertEqual(availability.occupied_rooms(
+            "Test Hotel", "2024-01-15"), {1})
+        self.assertEqual(availability.peak_occupancy(
+            "Test Hotel", "2024-01-01", "2024-01-20"), 1)
+        self.assertTrue(availability.can_book(
+            self._record(2, "2024-01-03", "2024-01-04"), rooms=2))
+        self.assertTrue(availability.is_free(
+            "Test Hotel", 1, "2024-01-20", "2024-01-21"))
+
+    def test_remove(self):
+        """
+        Prueba que remove libera la habitación.
+        """
+        self.availability.remove(self._record(1, "2024-02-10", "2024-02-12"))
+        self.assertTrue(self.availability.is_free(
+            "Test Hotel", 1, "2024-02-11"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.reshard import reshard
+from test.helpers import enter_temp_dir
+
+
+class BatchTest(unittest.TestCase):
+    """
+    Clase de prueba para las cancelaciones y modificaciones en lote.
+    """
+
+    def setUp(self):
+        """
+        Crea un directorio temporal y se cambia a él.
+        """
+        enter_temp_dir(self)
+
+    def tearDown(self):
+        """
+        Restaura la configuración.
+        """
+        datasets.configure(backend="json", integrity="off", feed_path="")
+
+    def _journal_lines(self, name):
+        """
+        Cuenta las entradas del diario de un conjunto de datos.
+
+        :param name: Nombre del archivo sin extensión.
+        :return: Número de líneas.
+        """
+        with open(f"{name}.json.journal", encoding="utf-8") as file:
+            return len(file.readlines())
+
+    def test_cancel_reservations(self):
+        """
+        Prueba la cancelación en lote con claves repetidas y ausentes.
+        """
+        datasets.configure(feed_path="changes.log")
+        for room in (1, 2, 3):
+            Reservation.create_reservation("Ana", "Hotel A", room,
+                                           "2024-01-01")
+        events = datasets.change_feed().last_sequence()
+        outcomes = Reservation.cancel_reservations([
+            ("Ana", "Hotel A", 1, "2024-01-01"),
+            ("Ana", "Hotel A", 2, " 2024-01-01 "),
+            ("Ana", "Hotel A", 1, "2024-01-01"),
+            ("Beto", "Hotel A", 3, "2024-01-01")])
+        self.assertEqual(outcomes, [True, True, False, False])
+        self.assertEqual([record["room_number"] for record
+                          in Reservation.load_reservations_data()], [3])
+        self.assertEqual(datasets.change_feed().last_sequence(), events + 2)
+
+    def test_cancel_reservations_sharded(self):
+        """
+        Prueba la cancelación en lote con las reservas particionadas.
+        """
+        hotels = ["Hotel A", "Hotel B", "Hotel C", "Hotel D"]
+        for hotel in hotels:
+            Reservation.create_reservation("Ana", hotel, 1, "2024-01-01")
+        reshard(3)
+        outcomes = Reservation.cancel_reservations(
+            [("Ana", hotel, 1, "2024-01-01") for hotel in hotels[1:]])
+        self.assertEqual(outcomes, [True, True, True])
+        self.assertEqual([record["hotel_name"] for record
+                          in Reservation.load_reservations_data()],
+                         ["Hotel A"])
+
+    def test_modify_customers(self):
+        """
+        Prueba que un lote ve sus propios cambios de correo y anexa una
+        entrada por cliente modificado.
+        """
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        Customer.create_customer("Beto", "beto@example.com", "2")
+        lines = self._journal_lines("customers")
+        outcomes = Customer.modify_customers([
+            {"name": "Ana", "email": "Beto@example.com"},
+            {"name": "Beto", "email": "nuevo@example.com"},
+            {"name": "Ana", "email": "beto@example.com", "phone": "9"},
+            {"name": "Caro", "phone": "3"},
+            {"name": "Beto", "email": "ana@example.com"},
+            {"name": "Beto", "email": "BETO@example.com"}])
+        self.assertEqual(outcomes, [False, True, True, False, True, False])
+        self.assertEqual(self._journal_lines("customers"), lines + 2)
+        ana = Customer.find_by_email("beto@example.com")
+        self.assertEqual((ana.name, ana.phone), ("Ana", "9"))
+        self.assertEqual(Customer.find_by_email("ana@example.com").name,
+                         "Beto")
+        self.assertIsNone(Customer.find_by_email("nuevo@example.com"))
+
+    def test_delete_hotels(self):
+        """
+        Prueba el borrado en lote con la integridad referencial.
+        """
+        for hotel in ("Hotel A", "Hotel B", "Hotel C"):
+            Hotel.create_hotel(hotel, "Ciudad", 5)
+        Reservation.create_reservation("Ana", "Hotel B", 1, "2024-01-01")
+        datasets.configure(integrity="restrict")
+        outcomes = Hotel.delete_hotels(["Hotel A", "Hotel B", "Hotel A",
+                                        "Hotel C", "Hotel Z"])
+        self.assertEqual(outcomes, [True, False, False, True, False])
+        self.assertEqual([hotel["name"] for hotel in Hotel.iter_hotels()],
+                         ["Hotel B"])
+
+    def test_sqlite(self):
+        """
+        Prueba los lotes con el respaldo SQLite.
+        """
+        datasets.configure(backend="sqlite")
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        Customer.create_customer("Beto", "beto@example.com", "2")
+        self.assertEqual(Customer.modify_customers(
+            [{"name": "Ana", "phone": "5"}, {"name": "Beto", "phone": "6"}]),
+            [True, True])
+        self.assertEqual(sorted(customer["phone"] for customer
+                                in Customer.iter_customers()), ["5", "6"])
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+        self.assertEqual(Hotel.delete_hotels(["Hotel A"]), [True])
+        self.assertEqual(list(Hotel.iter_hotels()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
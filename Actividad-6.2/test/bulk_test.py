@@ -0,0 +1,80 @@
+import os
+import json
+import unittest
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from test.helpers import enter_temp_dir
+
+
+class BulkTest(unittest.TestCase):
+    """
+    Clase de prueba para las cargas y exportaciones en lote.
+    """
+
+    def setUp(self):
+        """
+        Cambia a un directorio temporal vacío.
+        """
+        enter_temp_dir(self)
+
+    def test_create_customers(self):
+        """
+        Prueba que las filas inválidas se reportan sin abortar el lote.
+        """
+        result = Customer.create_customers([
+            {"name": "A", "email": "a@example.com", "phone": "1"},
+            {"name": "B", "email": "b@example.com"},
+            {"name": "C", "email": "c@example.com", "phone": "3"},
+        ])
+        self.assertEqual([c.name for c in result.created], ["A", "C"])
+        self.assertEqual(result.errors, [(1, "Falta el campo 'phone'.")])
+        self.assertEqual(len(Customer.load_customers_data()), 2)
+
+    def test_create_hotels_validates_rooms(self):
+        """
+        Prueba la validación del número de habitaciones.
+        """
+        result = Hotel.create_hotels([
+            {"name": "H1", "location": "L", "rooms": 2},
+            {"name": "H2", "location": "L", "rooms": "dos"},
+        ])
+        self.assertEqual(len(result.created), 1)
+        self.assertEqual(result.errors[0][0], 1)
+
+    def test_create_reservations_checks_batch_overlap(self):
+        """
+        Prueba que una fila que se traslapa con otra del lote se rechaza.
+        """
+        Hotel.create_hotel("H1", "L", 2)
+        result = Reservation.create_reservations([
+            {"customer_name": "A", "hotel_name": "H1", "room_number": 1,
+             "check_in_date": "2024-01-01", "check_out_date": "2024-01-03"},
+            {"customer_name": "B", "hotel_name": "H1", "room_number": 1,
+             "check_in_date": "2024-01-02", "check_out_date": "2024-01-04"},
+            {"customer_name": "C", "hotel_name": "H1", "room_number": 2,
+             "check_in_date": "no es fecha"},
+        ])
+        self.assertEqual(len(result.created), 1)
+        self.assertEqual([position for position, _ in result.errors], [1, 2])
+        self.assertEqual(len(Reservation.load_reservations_data()), 1)
+
+    def test_export_and_import(self):
+        """
+        Prueba que una exportación puede volver a importarse.
+        """
+        Customer.create_customer("A", "a@example.com", "1")
+        Customer.create_customer("B", "b@example.com", "2")
+        self.assertEqual(Customer.export_customers("export.json"), 2)
+        with open("export.json", "r", encoding="utf-8") as file:
+            exported = json.load(file)
+        self.assertEqual([row["name"] for row in exported], ["A", "B"])
+        os.remove("customers.json")
+        os.remove("customers.json.journal")
+        result = Customer.import_customers("export.json")
+        self.assertEqual(len(result.created), 2)
+        self.assertEqual(Customer.load_customers_data(), exported)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import json
+import unittest
+from src.storage.cache import CACHE, FileCache, cached_records
+from src.storage.journal import JournalStore
+from test.helpers import enter_temp_dir
+
+
+class CacheTest(unittest.TestCase):
+    """
+    Clase de prueba para la caché de lectura.
+    """
+
+    def setUp(self):
+        """
+        Prepara un almacén temporal y vacía la caché del proceso.
+        """
+        self.directory = enter_temp_dir(self)
+        self.path = os.path.join(self.directory, "data.json")
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"name": "A"}], file)
+        self.store = JournalStore(self.path)
+        CACHE.invalidate()
+        CACHE.reset_stats()
+
+    def tearDown(self):
+        """
+        Vacía la caché del proceso.
+        """
+        CACHE.invalidate()
+
+    def test_hits_while_unchanged(self):
+        """
+        Prueba que la segunda lectura no vuelve a interpretar el archivo.
+        """
+        first = cached_records(self.store)
+        second = cached_records(self.store)
+        self.assertIs(first, second)
+        self.assertEqual(CACHE.stats()["hits"], 1)
+        self.assertEqual(CACHE.stats()["misses"], 1)
+
+    def test_records_are_read_only(self):
+        """
+        Prueba que los aciertos entregan los mismos registros, sin copiar,
+        y que no se pueden modificar.
+        """
+        record = cached_records(self.store)[0]
+        self.assertIs(cached_records(self.store)[0], record)
+        with self.assertRaises(TypeError):
+            record["name"] = "B"
+        copy = dict(record)
+        copy["name"] = "B"
+        self.assertEqual(list(cached_records(self.store)), [{"name": "A"}])
+
+    def test_invalidated_by_writes(self):
+        """
+        Prueba que una escritura del proceso invalida la entrada.
+        """
+        cached_records(self.store)
+        self.store.append({"name": "B"})
+        self.assertEqual(list(cached_records(self.store)),
+                         [{"name": "A"}, {"name": "B"}])
+        self.store.rewrite([{"name": "C"}])
+        self.assertEqual(list(cached_records(self.store)), [{"name": "C"}])
+        self.assertEqual(CACHE.stats()["misses"], 3)
+
+    def test_detects_external_changes(self):
+        """
+        Prueba que un archivo reemplazado por otro proceso se vuelve a leer.
+        """
+        cached_records(self.store)
+        replacement = self.path + ".new"
+        with open(replacement, "w", encoding="utf-8") as file:
+            json.dump([{"name": "Z"}], file)
+        os.replace(replacement, self.path)
+        self.assertEqual(list(cached_records(self.store)), [{"name": "Z"}])
+
+    def test_explicit_invalidation(self):
+        """
+        Prueba la invalidación explícita de una clave.
+        """
+        cache = FileCache()
+        loads = []
+        cache.get("k", 1, lambda: loads.append(1))
+        cache.get("k", 1, lambda: loads.append(1))
+        cache.invalidate("k")
+        cache.get("k", 1, lambda: loads.append(1))
+        self.assertEqual(len(loads), 2)
+        self.assertEqual(cache.stats(),
+                         {"hits": 1, "misses": 2, "entries": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
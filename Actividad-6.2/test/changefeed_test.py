@@ -0,0 +1,107 @@
+import os
+import unittest
+from unittest import mock
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.changefeed import ChangeFeed
+from test.helpers import enter_temp_dir
+
+
+class ChangeFeedTest(unittest.TestCase):
+    """
+    Clase de prueba para el registro de cambios.
+    """
+
+    def setUp(self):
+        """
+        Crea un directorio temporal, se cambia a él y activa el registro.
+        """
+        enter_temp_dir(self)
+        datasets.configure(feed_path="changes.log")
+
+    def tearDown(self):
+        """
+        Restaura la configuración.
+        """
+        datasets.configure(feed_path="")
+
+    def test_mutations_emit_events(self):
+        """
+        Prueba que cada operación anexa un evento en orden.
+        """
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        Customer.modify_customer_info("Ana", phone="2")
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+        Reservation.create_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Reservation.cancel_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Hotel.delete_hotel("Hotel A")
+        Customer.delete_customer("Ana")
+        events = list(datasets.change_feed().read())
+        self.assertEqual([(event["seq"], event["entity"], event["op"])
+                          for event in events],
+                         [(1, "customer", "create"), (2, "customer", "update"),
+                          (3, "hotel", "create"), (4, "reservation", "create"),
+                          (5, "reservation", "delete"), (6, "hotel", "delete"),
+                          (7, "customer", "delete")])
+        self.assertEqual(events[1]["before"]["phone"], "1")
+        self.assertEqual(events[1]["after"]["phone"], "2")
+        self.assertIsNone(events[6]["after"])
+
+    def test_event_precedes_write(self):
+        """
+        Prueba que el evento se anexa antes de escribir en el almacén y que
+        una escritura fallida anexa el evento inverso.
+        """
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+        repository = datasets.hotels_repository()
+        seen = []
+
+        def fail(changes):
+            seen.append(datasets.change_feed().last_sequence())
+            raise OSError("Disco lleno")
+
+        with mock.patch.object(repository.store, "change_many",
+                               side_effect=fail):
+            with self.assertRaises(OSError):
+                repository.remove(repository.find("name", "Hotel A"))
+        self.assertEqual(seen, [2])
+        events = list(datasets.change_feed().read())
+        self.assertEqual([event["op"] for event in events],
+                         ["create", "delete", "create"])
+        self.assertEqual(events[2]["after"], events[1]["before"])
+        self.assertIsNotNone(repository.find("name", "Hotel A"))
+
+    def test_read_from_offset(self):
+        """
+        Prueba la lectura desde una secuencia y las líneas incompletas.
+        """
+        feed = ChangeFeed("feed.log")
+        for number in range(200):
+            feed.append("hotel", [("create", None, {"name": str(number)})])
+        with open("feed.log", "ab") as file:
+            file.write(b'{"seq": 201, "ent')
+        feed.append("hotel", [("create", None, {"name": "x"}),
+                              ("delete", {"name": "x"}, None)])
+        self.assertEqual(feed.last_sequence(), 202)
+        for after in (0, 1, 57, 199, 200, 202):
+            self.assertEqual([event["seq"] for event in feed.read(after)],
+                             list(range(after + 1, 203)))
+        self.assertEqual(len(list(feed.read(10, limit=5))), 5)
+        self.assertEqual([event["seq"] for event in
+                          feed.tail(200, poll_interval=0.01,
+                                    idle_timeout=0.05)], [201, 202])
+
+    def test_disabled(self):
+        """
+        Prueba que con una ruta vacía no se registra nada.
+        """
+        datasets.configure(feed_path="")
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+        self.assertIsNone(datasets.change_feed())
+        self.assertFalse(os.path.exists("changes.log"))
+
+
+if __name__ == "__main__":
+    unittest.main()
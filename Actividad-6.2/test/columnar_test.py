@@ -0,0 +1,51 @@
+import unittest
+from src.customer.customer import Customer
+from src.reservation.columnar import ReservationTable
+from src.reservation.reservation import Reservation
+
+
+class ReservationTableTest(unittest.TestCase):
+    """
+    Clase de prueba para la clase ReservationTable.
+    """
+
+    RECORDS = [
+        {"customer_name": "Bob", "hotel_name": "Yet Another Hotel",
+         "room_number": 103, "check_in_date": "2024-04-01",
+         "check_out_date": "2024-04-05"},
+        {"customer_name": "Alice", "hotel_name": "Yet Another Hotel",
+         "room_number": 104, "check_in_date": "2024-04-02",
+         "check_out_date": None},
+    ]
+
+    def test_round_trip(self):
+        """
+        Prueba que la tabla conserva el formato de 'reservations.json'.
+        """
+        table = ReservationTable.from_records(self.RECORDS)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.to_records(), self.RECORDS)
+        self.assertEqual(table.hotel_ids[0], table.hotel_ids[1])
+
+    def test_rejects_non_canonical_values(self):
+        """
+        Prueba que se rechazan valores que no podrían reconstruirse.
+        """
+        table = ReservationTable()
+        with self.assertRaises(ValueError):
+            table.append(dict(self.RECORDS[0], check_in_date="20240401"))
+        with self.assertRaises(ValueError):
+            table.append(dict(self.RECORDS[0], room_number="103"))
+        self.assertEqual(len(table), 0)
+
+    def test_records_are_slotted(self):
+        """
+        Prueba que los objetos de dominio no tienen __dict__.
+        """
+        self.assertFalse(hasattr(Customer("A", "a@example.com", "1"),
+                                 "__dict__"))
+        self.assertFalse(hasattr(Reservation(**self.RECORDS[0]), "__dict__"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+import unittest
+from multiprocessing import Process
+from src.customer.customer import Customer
+from src.storage.concurrency import FileLock, GroupCommit, atomic_write
+from src.storage.journal import JournalStore, _group_commit
+from test.helpers import enter_temp_dir
+
+
+def _create_customers(directory, prefix, count):
+    """
+    Crea clientes desde otro proceso.
+    """
+    os.chdir(directory)
+    for index in range(count):
+        Customer.create_customer(f"{prefix}{index}",
+                                 f"{prefix}{index}@example.com", "1")
+
+
+class ConcurrencyTest(unittest.TestCase):
+    """
+    Clase de prueba para las primitivas de concurrencia.
+    """
+
+    def setUp(self):
+        """
+        Cambia a un directorio temporal vacío.
+        """
+        self.directory = enter_temp_dir(self)
+
+    def test_file_lock_is_reentrant_and_defers(self):
+        """
+        Prueba que las tareas diferidas corren al soltar el último nivel.
+        """
+        calls = []
+        with FileLock("data.json") as lock:
+            with FileLock("data.json") as inner:
+                inner.defer(lambda: calls.append("hecho"))
+            self.assertEqual(calls, [])
+            self.assertIs(lock._state, inner._state)
+        self.assertEqual(calls, ["hecho"])
+
+    def test_group_commit_merges_writes(self):
+        """
+        Prueba que los hilos que esperan el candado mientras otro escribe
+        reciben el candado sin soltar el de fcntl y que todas sus líneas
+        van en una sola escritura y un solo fsync.
+        """
+        store = JournalStore("data.json", durable=True)
+        store.rewrite([])
+        lock = store.locked()
+        with lock:
+            store.append({"name": "A"})
+            threads = [threading.Thread(target=store.append,
+                                        args=({"name": f"B{index}"},))
+                       for index in range(3)]
+            for thread in threads:
+                thread.start()
+            while lock._state.waiting < len(threads):
+                time.sleep(0.001)
+        for thread in threads:
+            thread.join()
+        commit = _group_commit(store.journal_path)
+        self.assertEqual((commit.writes, commit.syncs), (1, 1))
+        self.assertEqual(sorted(record["name"] for record in store.load()),
+                         ["A", "B0", "B1", "B2"])
+
+    def test_group_commit_reports_failures(self):
+        """
+        Prueba que si la escritura del lote falla, cada turno del lote lo
+        ve al esperar.
+        """
+        commit = GroupCommit()
+        tickets = [commit.queue(b"x\n") for _ in range(2)]
+
+        def fail(data):
+            raise OSError(f"disco lleno ({len(data)} bytes)")
+
+        with self.assertRaises(OSError):
+            commit.flush(fail, lambda: None)
+        for ticket in tickets:
+            with self.assertRaises(OSError):
+                commit.wait(ticket)
+        self.assertFalse(commit.flush(fail, lambda: None))
+
+    def test_pending_lines_are_read(self):
+        """
+        Prueba que las lecturas con el candado tomado incluyen las líneas
+        aún encoladas y que position() las cuenta.
+        """
+        store = JournalStore("data.json")
+        store.rewrite([])
+        with store.locked():
+            store.append({"name": "A"})
+            position = store.position()
+            self.assertEqual(store.load(), [{"name": "A"}])
+            self.assertEqual(store.tail(position), ([], position))
+
+    def test_atomic_write(self):
+        """
+        Prueba que atomic_write reemplaza el archivo sin dejar temporales.
+        """
+        with open("data.json", "w", encoding="utf-8") as file:
+            file.write("[1]")
+        atomic_write("data.json", lambda file: file.write("[2]"))
+        with open("data.json", "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), "[2]")
+        self.assertEqual(os.listdir("."), ["data.json"])
+
+    def test_concurrent_processes_lose_nothing(self):
+        """
+        Prueba que varios procesos escribiendo a la vez no pierden datos.
+        """
+        processes = [Process(target=_create_customers,
+                             args=(self.directory, prefix, 50))
+                     for prefix in ("A", "B", "C")]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(len(Customer.load_customers_data()), 150)
+
+
+if __name__ == '__main__':
+    unittest.main()
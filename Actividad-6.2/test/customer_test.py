@@ -1,6 +1,8 @@
 import unittest
 import logging
+from unittest import mock
 from src.customer.customer import Customer
+from src.storage.repository import Repository
 
 logging.basicConfig(level=logging.INFO)
 
@@ -60,6 +62,63 @@ class CustomerTest(unittest.TestCase):
         self.assertEqual(
             Customer.load_customers_data()[0]["phone"], "1112233445")
 
+    def test_modify_missing_or_unchanged(self):
+        """
+        Prueba que modificar un cliente inexistente o sin cambios no
+        escribe nada.
+        """
+        Customer.create_customer("Bob", "bob@example.com", "9998887776")
+        with self.assertLogs(level="INFO") as cm:
+            Customer.modify_customer_info("Nadie", email="bob@example.com")
+        self.assertEqual(cm.output,
+                         ["INFO:root:Cliente Nadie no encontrado."])
+        with mock.patch.object(Repository, "update") as update:
+            Customer.modify_customer_info("Bob")
+        update.assert_not_called()
+
+    def test_find_by_email_and_phone(self):
+        """
+        Prueba las búsquedas por correo y por teléfono normalizados.
+        """
+        Customer.create_customer("Eva", "Eva@Example.com", "(555) 123-4567")
+        Customer.create_customer("Eli", "eli@example.com", "555.123.4567")
+        self.assertEqual(Customer.find_by_email(" eva@example.COM").name,
+                         "Eva")
+        self.assertIsNone(Customer.find_by_email("nadie@example.com"))
+        self.assertEqual([c.name for c in Customer.find_by_phone(
+            "555-123-4567")], ["Eva", "Eli"])
+        Customer.modify_customer_info("Eva", email="eva@new.com")
+        self.assertIsNone(Customer.find_by_email("eva@example.com"))
+        self.assertEqual(Customer.find_by_email("EVA@new.com").name, "Eva")
+
+    def test_unique_email(self):
+        """
+        Prueba que un correo no puede pertenecer a dos clientes.
+        """
+        Customer.create_customer("Fer", "fer@example.com", "1")
+        Customer.create_customer("Gus", "gus@example.com", "2")
+        self.assertIsNone(
+            Customer.create_customer("Otro", "FER@example.com", "3"))
+        Customer.modify_customer_info("Gus", email="fer@example.com")
+        self.assertEqual(Customer.find_by_email("gus@example.com").name,
+                         "Gus")
+        Customer.delete_customer("Fer")
+        self.assertIsNotNone(
+            Customer.create_customer("Otro", "fer@example.com", "3"))
+
+    def test_search_names(self):
+        """
+        Prueba la búsqueda de nombres por prefijo.
+        """
+        for name in ("alma", "Alberto", "Beatriz", "Álvaro", "Alfa"):
+            Customer.create_customer(name, f"{name}@example.com", "1")
+        self.assertEqual(Customer.search_names("al"),
+                         ["Alberto", "Alfa", "alma"])
+        self.assertEqual(Customer.search_names("AL", limit=2),
+                         ["Alberto", "Alfa"])
+        Customer.delete_customer("Alfa")
+        self.assertEqual(Customer.search_names("alf"), [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from datetime import date
+from src.dates.dates import DateIndex, normalize_stay, to_ordinal
+from src.reservation.reservation import Reservation
+from test.helpers import enter_temp_dir
+
+
+class DatesTest(unittest.TestCase):
+    """
+    Clase de prueba para la normalización y el índice de fechas.
+    """
+
+    def setUp(self):
+        """
+        Crea un directorio temporal y se cambia a él.
+        """
+        enter_temp_dir(self)
+
+    def test_normalize_stay(self):
+        """
+        Prueba la forma canónica y la validación de las fechas.
+        """
+        self.assertEqual(normalize_stay(date(2024, 3, 1), "2024-03-04"),
+                         ("2024-03-01", "2024-03-04"))
+        self.assertEqual(normalize_stay("2024-03-01"), ("2024-03-01", None))
+        self.assertEqual(to_ordinal("2024-03-01"),
+                         date(2024, 3, 1).toordinal())
+        for check_in, check_out in [("2024-03-04", "2024-03-04"),
+                                    ("2024-03-04", "2024-03-01"),
+                                    ("mañana", None), (None, None)]:
+            with self.assertRaises(ValueError):
+                normalize_stay(check_in, check_out)
+
+    def test_date_index(self):
+        """
+        Prueba las consultas por rango y las bajas del índice.
+        """
+        index = DateIndex()
+        records = [{"hotel_name": hotel, "check_in_date": day}
+                   for hotel, day in [("A", "2024-01-03"), ("B", "2024-01-01"),
+                                      ("A", "2024-01-01"), ("A", "mañana")]]
+        for record in records:
+            index.add(record)
+        self.assertEqual(index.check_ins_between("2024-01-01", "2024-01-02"),
+                         [records[1], records[2]])
+        self.assertEqual(index.arrivals("A", date(2024, 1, 3)), [records[0]])
+        index.remove(records[2])
+        index.remove(records[3])
+        self.assertEqual(index.check_ins_between("2024-01-01", "2024-12-31",
+                                                 "A"), [records[0]])
+
+    def test_reservations(self):
+        """
+        Prueba que las reservas se guardan normalizadas y se consultan por
+        fecha de entrada.
+        """
+        reservation = Reservation.create_reservation(
+            "Ana", "Hotel A", 1, date(2024, 5, 1), "2024-05-03")
+        self.assertEqual(reservation.check_in_date, "2024-05-01")
+        Reservation.create_reservation("Beto", "Hotel B", 1, "2024-05-02")
+        with self.assertRaises(ValueError):
+            Reservation.create_reservation("Caro", "Hotel A", 2,
+                                           "2024-05-03", "2024-05-01")
+        self.assertEqual(
+            [record["customer_name"] for record
+             in Reservation.check_ins_between("2024-05-01", "2024-05-02")],
+            ["Ana", "Beto"])
+        self.assertEqual(len(Reservation.arrivals("Hotel A", "2024-05-01")), 1)
+        result = Reservation.create_reservations([
+            {"customer_name": "Caro", "hotel_name": "Hotel A",
+             "room_number": 2, "check_in_date": "2024-05-03",
+             "check_out_date": "2024-05-03"}])
+        self.assertEqual(result.errors, [
+            (0, "La fecha de salida debe ser posterior a la de entrada.")])
+        Reservation.cancel_reservation("Ana", "Hotel A", 1, date(2024, 5, 1))
+        self.assertEqual(Reservation.arrivals("Hotel A", "2024-05-01"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+"""
+Utilidades compartidas por las pruebas.
+"""
+import os
+import tempfile
+
+
+def enter_temp_dir(test):
+    """
+    Cambia a un directorio temporal vacío durante una prueba. Al terminar,
+    después de tearDown, se restaura el directorio de trabajo y se borra el
+    temporal.
+
+    :param test: Instancia de unittest.TestCase.
+    :return: Ruta del directorio temporal.
+    """
+    cwd = os.getcwd()
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    os.chdir(directory.name)
+    test.addCleanup(os.chdir, cwd)
+    return directory.name
@@ -76,6 +76,20 @@ class HotelTest(unittest.TestCase):
         self.test_hotel.cancel_reservation(reservation)
         self.assertNotIn(reservation, self.test_hotel.reservations)
 
+    def test_reservations_follow_store(self):
+        """
+        Prueba que Hotel.reservations refleja las reservas guardadas.
+        """
+        hotel = Hotel("View Hotel", "View Location", 2)
+        before = len(hotel.reservations)
+        reservation = Reservation.create_reservation(
+            "Eve", "View Hotel", 1, "2030-01-01", "2030-01-02")
+        self.assertIn(reservation, hotel.reservations)
+        self.assertEqual(len(hotel.reservations), before + 1)
+        Reservation.cancel_reservation("Eve", "View Hotel", 1, "2030-01-01")
+        self.assertNotIn(reservation, hotel.reservations)
+        self.assertEqual(len(hotel.reservations), before)
+
 
 if __name__ == '__main__':
     unittest.main()
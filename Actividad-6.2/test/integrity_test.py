@@ -0,0 +1,157 @@
+import os
+import unittest
+from unittest import mock
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.concurrency import FileLock
+from test.helpers import enter_temp_dir
+
+
+LOCK_ORDER = ("customers", "hotels", "reservations")
+
+
+def _nested_locks(action):
+    """
+    Ejecuta una acción y registra los candados que toma mientras tiene
+    otros tomados. Volver a tomar uno que ya se tiene no cuenta, porque
+    los candados son reentrantes.
+
+    :param action: Función sin argumentos.
+    :return: Conjunto de tuplas (candado tomado antes, candado tomado
+        después) con el nombre del archivo de cada uno.
+    """
+    held = []
+    pairs = set()
+    enter = FileLock.__enter__
+    leave = FileLock.__exit__
+
+    def name_of(lock):
+        return os.path.basename(lock.path).split(".")[0]
+
+    def record_enter(lock):
+        if name_of(lock) not in held:
+            pairs.update((outer, name_of(lock)) for outer in held)
+        held.append(name_of(lock))
+        return enter(lock)
+
+    def record_exit(lock, *exc_info):
+        held.remove(name_of(lock))
+        return leave(lock, *exc_info)
+
+    with mock.patch.object(FileLock, "__enter__", autospec=True,
+                           side_effect=record_enter), \
+            mock.patch.object(FileLock, "__exit__", autospec=True,
+                              side_effect=record_exit):
+        action()
+    return pairs
+
+
+class IntegrityTest(unittest.TestCase):
+    """
+    Clase de prueba para la integridad referencial.
+    """
+
+    def setUp(self):
+        """
+        Crea un cliente y un hotel en un directorio temporal.
+        """
+        enter_temp_dir(self)
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+
+    def tearDown(self):
+        """
+        Desactiva la integridad.
+        """
+        datasets.configure(integrity="off")
+
+    def test_rejects_unknown_references(self):
+        """
+        Prueba que una reserva con cliente u hotel desconocido se rechaza.
+        """
+        datasets.configure(integrity="restrict")
+        with self.assertLogs(level="WARNING") as cm:
+            self.assertIsNone(Reservation.create_reservation(
+                "Nadie", "Hotel A", 1, "2024-01-01"))
+        self.assertIn("El cliente Nadie no está registrado.", cm.output[0])
+        self.assertIsNone(Reservation.create_reservation(
+            "Ana", "Hotel Z", 1, "2024-01-01"))
+        result = Reservation.create_reservations([
+            {"customer_name": "Ana", "hotel_name": "Hotel Z",
+             "room_number": 1, "check_in_date": "2024-01-01"},
+            {"customer_name": "Ana", "hotel_name": "Hotel A",
+             "room_number": 1, "check_in_date": "2024-01-01"}])
+        self.assertEqual(result.errors,
+                         [(0, "El hotel Hotel Z no está registrado.")])
+        self.assertEqual(len(result.created), 1)
+
+    def test_restrict_blocks_deletes(self):
+        """
+        Prueba que no se borran clientes ni hoteles con reservas.
+        """
+        datasets.configure(integrity="restrict")
+        Reservation.create_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Customer.delete_customer("Ana")
+        Hotel.delete_hotel("Hotel A")
+        self.assertIsNotNone(Customer.find_by_email("ana@example.com"))
+        self.assertEqual(len(Hotel("Hotel A", "Ciudad", 5).reservations), 1)
+        Reservation.cancel_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Customer.delete_customer("Ana")
+        self.assertIsNone(Customer.find_by_email("ana@example.com"))
+
+    def test_cascade_deletes_reservations(self):
+        """
+        Prueba que borrar un hotel elimina sus reservas.
+        """
+        datasets.configure(integrity="cascade")
+        Hotel.create_hotel("Hotel B", "Ciudad", 5)
+        Reservation.create_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Reservation.create_reservation("Ana", "Hotel B", 1, "2024-01-01")
+        Hotel.delete_hotel("Hotel A")
+        self.assertEqual([record["hotel_name"] for record
+                          in Reservation.load_reservations_data()],
+                         ["Hotel B"])
+        Customer.delete_customer("Ana")
+        self.assertEqual(Reservation.load_reservations_data(), [])
+
+    def test_lock_order(self):
+        """
+        Prueba que las altas y los borrados toman los candados en el mismo
+        orden global: clientes, hoteles y reservas.
+        """
+        datasets.configure(integrity="cascade")
+        actions = [
+            lambda: Reservation.create_reservation("Ana", "Hotel A", 1,
+                                                   "2024-01-01"),
+            lambda: Reservation.create_reservations([
+                {"customer_name": "Ana", "hotel_name": "Hotel A",
+                 "room_number": 2, "check_in_date": "2024-01-01"}]),
+            lambda: Customer.delete_customer("Ana"),
+            lambda: Hotel.delete_hotel("Hotel A")]
+        pairs = set()
+        for action in actions:
+            # Como si otro proceso hubiera cambiado clientes y hoteles.
+            datasets.customers_repository()._signature = None
+            datasets.hotels_repository()._signature = None
+            pairs |= _nested_locks(action)
+        self.assertIn(("customers", "reservations"), pairs)
+        self.assertIn(("hotels", "reservations"), pairs)
+        self.assertEqual([(outer, inner) for outer, inner in pairs
+                          if {outer, inner} <= set(LOCK_ORDER)
+                          and LOCK_ORDER.index(outer)
+                          > LOCK_ORDER.index(inner)], [])
+
+    def test_off_allows_orphans(self):
+        """
+        Prueba que sin integridad se conserva el comportamiento anterior.
+        """
+        self.assertIsNotNone(Reservation.create_reservation(
+            "Nadie", "Hotel Z", 1, "2024-01-01"))
+        with self.assertRaises(ValueError):
+            datasets.configure(integrity="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import json
+import unittest
+from src.storage.journal import JournalStore
+from test.helpers import enter_temp_dir
+
+
+class JournalStoreTest(unittest.TestCase):
+    """
+    Clase de prueba para la clase JournalStore.
+    """
+
+    def setUp(self):
+        """
+        Prepara un directorio temporal para cada prueba.
+        """
+        self.directory = enter_temp_dir(self)
+        self.path = os.path.join(self.directory, "data.json")
+        self.store = JournalStore(self.path)
+
+    def test_append_does_not_rewrite_snapshot(self):
+        """
+        Prueba que append solo escribe en el diario.
+        """
+        self.store.rewrite([{"name": "A"}])
+        with open(self.path, "r", encoding="utf-8") as file:
+            before = file.read()
+        self.store.append({"name": "B"})
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), before)
+        self.assertEqual(self.store.load(), [{"name": "A"}, {"name": "B"}])
+
+    def test_compact(self):
+        """
+        Prueba que compact integra el diario en la instantánea.
+        """
+        self.store.append({"name": "A"})
+        self.store.append({"name": "B"})
+        self.store.compact()
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), [{"name": "A"}, {"name": "B"}])
+        self.assertEqual(self.store.load(), [{"name": "A"}, {"name": "B"}])
+
+    def test_automatic_compaction(self):
+        """
+        Prueba que el diario se compacta al superar el tamaño mínimo.
+        """
+        store = JournalStore(self.path, min_compact_bytes=0)
+        for index in range(10):
+            store.append({"name": str(index)})
+        self.assertEqual(len(store.load()), 10)
+        self.assertLess(os.path.getsize(store.journal_path),
+                        os.path.getsize(self.path))
+
+    def test_external_rewrite_discards_journal(self):
+        """
+        Prueba que un diario ligado a otra instantánea no se reproduce.
+        """
+        self.store.append({"name": "A"})
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write('[{"name": "Z"}]')
+        self.assertEqual(self.store.load(), [{"name": "Z"}])
+
+    def test_remove_and_replace(self):
+        """
+        Prueba que las bajas y modificaciones del diario se reproducen.
+        """
+        self.store.rewrite([{"name": "A"}, {"name": "B"}])
+        self.store.append({"name": "C"})
+        self.store.remove({"name": "A"})
+        self.store.replace({"name": "C"}, {"name": "D"})
+        self.assertEqual(self.store.load(), [{"name": "B"}, {"name": "D"}])
+
+    def test_iter_records_applies_entries_in_order(self):
+        """
+        Prueba que las entradas afectan al primer registro con el mismo
+        contenido, esté en la instantánea o en el diario.
+        """
+        self.store.rewrite([{"name": "A"}, {"name": "B"}, {"name": "A"}])
+        self.store.append({"name": "B"})
+        self.store.replace({"name": "B"}, {"name": "A"})
+        self.store.remove({"name": "A"})
+        self.store.remove({"name": "B"})
+        self.store.replace({"name": "A"}, {"name": "C"})
+        self.assertEqual(list(self.store.iter_records()),
+                         [{"name": "C"}, {"name": "A"}])
+
+    def test_truncated_line_is_ignored(self):
+        """
+        Prueba que una línea incompleta no impide leer las siguientes.
+        """
+        self.store.append({"name": "A"})
+        with open(self.store.journal_path, "a", encoding="utf-8") as file:
+            file.write('{"name": ')
+        self.store.append({"name": "B"})
+        self.assertEqual(self.store.load(), [{"name": "A"}, {"name": "B"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
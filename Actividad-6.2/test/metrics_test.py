@@ -0,0 +1,85 @@
+import unittest
+from src.customer.customer import Customer
+from src.metrics import metrics
+from src.storage.cache import CACHE
+from test.helpers import enter_temp_dir
+
+
+class MetricsTest(unittest.TestCase):
+    """
+    Clase de prueba para la instrumentación.
+    """
+
+    def setUp(self):
+        """
+        Cambia a un directorio temporal vacío.
+        """
+        enter_temp_dir(self)
+
+    def tearDown(self):
+        """
+        Apaga la instrumentación.
+        """
+        metrics.disable()
+
+    def test_disabled_is_passthrough(self):
+        """
+        Prueba que sin receptor no se envuelve nada.
+        """
+        records = iter([1, 2])
+        self.assertIs(metrics.scanned(records, dataset="x"), records)
+        self.assertIs(metrics.timer("write"), metrics.timer("load"))
+
+    def test_operations_and_storage(self):
+        """
+        Prueba los tiempos y contadores de una operación sobre JSON.
+        """
+        registry = metrics.enable()
+        Customer.create_customer("A", "a@example.com", "1")
+        Customer.modify_customer_info("A", email="b@example.com")
+        CACHE.invalidate()
+        Customer.load_customers_data()
+        self.assertEqual(registry.timer_stats(
+            "operation", entity="customer",
+            operation="create_customer")["count"], 1)
+        self.assertEqual(registry.timer_stats(
+            "serialize", dataset="customers.json")["count"], 2)
+        self.assertGreater(registry.counter(
+            "bytes_written", dataset="customers.json"), 0)
+        self.assertGreater(registry.counter(
+            "bytes_read", dataset="customers.json"), 0)
+        # El repositorio se cargó antes de existir el archivo; solo la
+        # lectura por la caché recorre al cliente.
+        self.assertEqual(registry.counter(
+            "records_scanned", dataset="customers.json"), 1)
+
+    def test_prometheus_file(self):
+        """
+        Prueba el formato de texto de Prometheus.
+        """
+        sink = metrics.enable(metrics.PrometheusFileSink("metrics.prom"))
+        with metrics.timer("write", dataset='a"b'):
+            pass
+        metrics.increment("bytes_read", 10, dataset="c")
+        sink.flush()
+        with open("metrics.prom", "r", encoding="utf-8") as file:
+            text = file.read()
+        self.assertIn("# TYPE mna_write_seconds summary", text)
+        self.assertIn('mna_write_seconds_count{dataset="a\\"b"} 1', text)
+        self.assertIn('mna_bytes_read_total{dataset="c"} 10', text)
+
+    def test_callback(self):
+        """
+        Prueba que el receptor de función recibe cada medición.
+        """
+        events = []
+        metrics.enable(metrics.CallbackSink(
+            lambda *event: events.append(event)))
+        list(metrics.scanned(iter([1, 2, 3]), dataset="x"))
+        self.assertEqual(events[1], ("count", "records_scanned",
+                                     {"dataset": "x"}, 3))
+        self.assertEqual(events[0][:3], ("timing", "scan", {"dataset": "x"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from src.hotel.hotel import Hotel
+from src.reporting import occupancy
+from src.reporting.occupancy import occupancy_report
+from src.reservation.reservation import Reservation
+from src.storage.datasets import reservations_store
+from test.helpers import enter_temp_dir
+
+
+class OccupancyTest(unittest.TestCase):
+    """
+    Clase de prueba para el reporte de ocupación.
+    """
+
+    def setUp(self):
+        """
+        Crea hoteles y reservas en un directorio temporal.
+        """
+        enter_temp_dir(self)
+        Hotel.create_hotel("Hotel A", "Ciudad", 2)
+        Reservation.create_reservation("Ana", "Hotel A", 1,
+                                       "2023-12-30", "2024-01-03")
+        Reservation.create_reservation("Beto", "Hotel A", 2,
+                                       "2024-01-02", "2024-01-04")
+        Reservation.create_reservation("Caro", "Hotel B", 7, "2024-01-05")
+        reservations_store().append({
+            "customer_name": "Dora", "hotel_name": "Hotel B",
+            "room_number": 8, "check_in_date": "mañana"})
+
+    def test_daily_occupancy(self):
+        """
+        Prueba la ocupación diaria, las noches y las proporciones.
+        """
+        report = occupancy_report("2024-01-01", "2024-01-06", workers=1)
+        hotel_a = report["Hotel A"]
+        self.assertEqual(hotel_a.daily, [1, 2, 1, 0, 0])
+        self.assertEqual(hotel_a.room_nights, 4)
+        self.assertEqual(hotel_a.occupancy_ratio(), 0.4)
+        self.assertEqual(hotel_a.daily_ratios()[1], 1.0)
+        hotel_b = report["Hotel B"]
+        self.assertEqual(hotel_b.by_date()["2024-01-05"], 1)
+        self.assertEqual(hotel_b.skipped, 1)
+        self.assertIsNone(hotel_b.occupancy_ratio())
+
+    def test_partitions_and_processes(self):
+        """
+        Prueba que el resultado no depende de la partición ni de los
+        procesos.
+        """
+        expected = {hotel: (item.daily, item.skipped) for hotel, item in
+                    occupancy_report("2023-12-01", "2024-02-01",
+                                     workers=1).items()}
+        for partition in occupancy.PARTITIONS:
+            report = occupancy_report("2023-12-01", "2024-02-01",
+                                      partition=partition, workers=2)
+            self.assertEqual({hotel: (item.daily, item.skipped)
+                              for hotel, item in report.items()}, expected)
+
+    def test_selected_hotels(self):
+        """
+        Prueba el filtro de hoteles, incluidos los que no tienen reservas.
+        """
+        report = occupancy_report("2024-01-01", "2024-01-03",
+                                  hotels=["Hotel A", "Hotel C"], workers=1)
+        self.assertEqual(sorted(report), ["Hotel A", "Hotel C"])
+        self.assertEqual(report["Hotel C"].daily, [0, 0])
+        with self.assertRaises(ValueError):
+            occupancy_report("2024-01-03", "2024-01-03")
+
+    @unittest.skipIf(occupancy.numpy is None, "NumPy no está instalado")
+    def test_vectorized_matches_python(self):
+        """
+        Prueba que el cálculo con NumPy coincide con el de Python puro.
+        """
+        check_ins = ["2023-12-30", "2024-01-02", "2024-01-05", "2024-02-01"]
+        check_outs = ["2024-01-03", "2024-01-02", None, "2024-02-03"]
+        first = 738886  # 2024-01-01
+        self.assertEqual(
+            occupancy._count_vectorized(first, 40, check_ins, check_outs),
+            occupancy._count_python(first, 40, check_ins, check_outs)[0])
+        self.assertIsNone(occupancy._count_vectorized(
+            first, 40, ["2024-01"], [None]))
+
+
+if __name__ == "__main__":
+    unittest.main()
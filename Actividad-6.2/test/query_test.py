@@ -0,0 +1,172 @@
+import unittest
+from unittest import mock
+from datetime import date
+from src.customer.customer import Customer
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.repository import Repository
+from src.storage.reshard import reshard
+from test.helpers import enter_temp_dir
+
+
+def _all_pages(query):
+    """
+    Recorre todas las páginas de una consulta con sus cursores.
+
+    :param query: Consulta con límite.
+    :return: Lista con los registros de todas las páginas.
+    """
+    records = []
+    cursor = None
+    while True:
+        page = query.after(cursor).page()
+        records.extend(page.records)
+        cursor = page.cursor
+        if cursor is None:
+            return records
+
+
+class QueryTest(unittest.TestCase):
+    """
+    Clase de prueba para las consultas paginadas.
+    """
+
+    def setUp(self):
+        """
+        Crea reservas y clientes en un directorio temporal.
+        """
+        enter_temp_dir(self)
+        Reservation.create_reservations([
+            {"customer_name": f"Cliente {number % 4}",
+             "hotel_name": f"Hotel {'ABC'[number % 3]}",
+             "room_number": number % 10,
+             "check_in_date": f"2024-0{1 + number % 5}-{1 + number % 7:02d}"}
+            for number in range(60)])
+        self.reservations = sorted(
+            Reservation.load_reservations_data(),
+            key=lambda record: (record["check_in_date"],
+                                record["hotel_name"], record["room_number"],
+                                record["customer_name"]))
+
+    def tearDown(self):
+        """
+        Restaura la configuración.
+        """
+        datasets.configure(backend="json")
+
+    def test_default_order_pages(self):
+        """
+        Prueba que las páginas recorren todas las reservas en orden de
+        entrada, sin repetir ni omitir ninguna.
+        """
+        query = Reservation.query().limit(7)
+        self.assertEqual(_all_pages(query), self.reservations)
+        page = query.page()
+        self.assertEqual(len(page.records), 7)
+        self.assertEqual(query.after(page.cursor).first(),
+                         self.reservations[7])
+
+    def test_where(self):
+        """
+        Prueba los operadores, los alias y las fechas como date.
+        """
+        query = Reservation.query().where(hotel="Hotel B",
+                                          check_in__gte=date(2024, 2, 1),
+                                          check_in__lt="2024-04-01")
+        self.assertEqual(list(query), [
+            record for record in self.reservations
+            if record["hotel_name"] == "Hotel B"
+            and "2024-02-01" <= record["check_in_date"] < "2024-04-01"])
+        self.assertEqual(
+            list(Reservation.query().where(customer__in=["Cliente 1"],
+                                           room__gt=7)),
+            [record for record in self.reservations
+             if record["customer_name"] == "Cliente 1"
+             and record["room_number"] > 7])
+        self.assertEqual(
+            len(list(Reservation.query().where(hotel__contains="c"))), 20)
+        with self.assertRaises(ValueError):
+            Reservation.query().where(room__near=3)
+        with self.assertRaises(ValueError):
+            Reservation.query().where(price=3)
+        with self.assertRaises(ValueError):
+            Reservation.query().where(check_in__gte="ayer")
+
+    def test_order_by_and_shards(self):
+        """
+        Prueba el orden descendente y la paginación sobre particiones.
+        """
+        expected = sorted(self.reservations,
+                          key=lambda record: -record["room_number"])
+        query = Reservation.query().order_by("-room").limit(8)
+        self.assertEqual(_all_pages(query), expected)
+        cursor = query.page().cursor
+        with self.assertRaises(ValueError):
+            list(Reservation.query().after(cursor))
+        with self.assertRaises(ValueError):
+            Reservation.query().after("no es un cursor")
+        reshard(3)
+        self.assertEqual(_all_pages(Reservation.query().limit(9)),
+                         self.reservations)
+        self.assertEqual(
+            _all_pages(Reservation.query().where(hotel="Hotel C").limit(4)),
+            [record for record in self.reservations
+             if record["hotel_name"] == "Hotel C"])
+
+    def test_lazy(self):
+        """
+        Prueba que la consulta se evalúa al recorrerla y no al armarla.
+        """
+        query = Reservation.query().where(hotel="Hotel A")
+        Reservation.create_reservation("Cliente 9", "Hotel A", 1,
+                                       "2023-12-31")
+        self.assertEqual(query.first()["customer_name"], "Cliente 9")
+
+    def test_customers(self):
+        """
+        Prueba las consultas de clientes por prefijo y por correo.
+        """
+        self.assertEqual(list(Customer.query()), [])
+        Customer.create_customer("Ana", "ANA@example.com", "555-0101")
+        Customer.create_customer("andrés", "andres@example.com", "5550102")
+        Customer.create_customer("Beto", "beto@example.com", "5550103")
+        self.assertEqual(
+            [customer["name"] for customer
+             in Customer.query().where(name__startswith="an")],
+            ["Ana", "andrés"])
+        self.assertEqual(
+            Customer.query().where(email=" ana@example.com").first()["name"],
+            "Ana")
+        self.assertEqual(
+            Customer.query().where(phone="5550101").first()["name"], "Ana")
+        page = Customer.query().order_by("-name").limit(2).page()
+        self.assertEqual([customer["name"] for customer in page.records],
+                         ["Beto", "andrés"])
+        self.assertEqual(
+            [customer["name"] for customer in Customer.query().order_by(
+                "-name").limit(2).after(page.cursor)], ["Ana"])
+
+    def test_customers_by_name_index(self):
+        """
+        Prueba que el orden por nombre recorre el índice de nombres desde
+        el cursor, sin leer todos los clientes en cada página.
+        """
+        names = [f"{'aB'[number % 2]}{number % 7} {number}"
+                 for number in range(30)]
+        Customer.create_customers([
+            {"name": name, "email": f"c{number}@example.com",
+             "phone": str(number)} for number, name in enumerate(names)])
+        expected = sorted(names, key=lambda name: (name.casefold(), name))
+        with mock.patch.object(Repository, "records",
+                               side_effect=AssertionError):
+            self.assertEqual([customer["name"] for customer
+                              in _all_pages(Customer.query().limit(4))],
+                             expected)
+            self.assertEqual(
+                [customer["name"] for customer in _all_pages(
+                    Customer.query().where(name__startswith="b").limit(3))],
+                [name for name in expected if name.startswith("B")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import unittest
+from src.storage.journal import JournalStore
+from src.storage.repository import Repository
+from test.helpers import enter_temp_dir
+
+
+class RepositoryTest(unittest.TestCase):
+    """
+    Clase de prueba para la clase Repository.
+    """
+
+    def setUp(self):
+        """
+        Prepara un repositorio sobre un almacén temporal.
+        """
+        self.directory = enter_temp_dir(self)
+        self.store = JournalStore(os.path.join(self.directory, "data.json"))
+        self.store.rewrite([{"name": "A", "email": "a@example.com"},
+                            {"name": "B", "email": "b@example.com"}])
+        self.repository = Repository(
+            self.store, {"name": lambda record: record["name"]})
+
+    def test_find(self):
+        """
+        Prueba la búsqueda por índice.
+        """
+        self.assertEqual(self.repository.find("name", "B")["email"],
+                         "b@example.com")
+        self.assertIsNone(self.repository.find("name", "Z"))
+
+    def test_add_updates_index(self):
+        """
+        Prueba que add mantiene el índice al día.
+        """
+        self.repository.records()
+        self.repository.add({"name": "C", "email": "c@example.com"})
+        self.assertEqual(self.repository.find("name", "C")["email"],
+                         "c@example.com")
+        self.assertEqual(len(self.store.load()), 3)
+
+    def test_remove_all(self):
+        """
+        Prueba la eliminación por clave y su persistencia.
+        """
+        self.assertEqual(self.repository.remove_all("name", "A"), 1)
+        self.assertIsNone(self.repository.find("name", "A"))
+        self.assertEqual(self.store.load(),
+                         [{"name": "B", "email": "b@example.com"}])
+
+    def test_update(self):
+        """
+        Prueba la modificación de un registro y su persistencia.
+        """
+        record = self.repository.find("name", "A")
+        self.repository.update(record, {"email": "new@example.com"})
+        self.assertEqual(self.repository.find("name", "A")["email"],
+                         "new@example.com")
+        self.assertEqual(self.store.load()[0]["email"], "new@example.com")
+
+    def test_reload_after_external_change(self):
+        """
+        Prueba que el repositorio se recarga si el almacén cambia por fuera.
+        """
+        self.repository.records()
+        self.store.append({"name": "D", "email": "d@example.com"})
+        self.assertIsNotNone(self.repository.find("name", "D"))
+
+    def test_catch_up_with_other_writer(self):
+        """
+        Prueba que otro repositorio sobre el mismo almacén ve los cambios.
+        """
+        other = Repository(JournalStore(self.store.path),
+                           {"name": lambda record: record["name"]})
+        self.repository.records()
+        other.add({"name": "E", "email": "e@example.com"})
+        other.remove(other.find("name", "A"))
+        self.assertIsNotNone(self.repository.find("name", "E"))
+        self.assertIsNone(self.repository.find("name", "A"))
+        self.assertEqual(self.repository.records(), other.records())
+
+
+if __name__ == '__main__':
+    unittest.main()
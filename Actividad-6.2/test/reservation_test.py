@@ -29,6 +29,20 @@ class ReservationTest(unittest.TestCase):
         self.assertEqual(reservation.check_in_date, "2024-02-14")
         self.assertEqual(reservation.check_out_date, "2024-02-18")
 
+    def test_create_overlapping_reservation(self):
+        """
+        Prueba que create_reservation rechaza una habitación ocupada.
+        """
+        Reservation.create_reservation("Carol", "Overlap Hotel", 201,
+                                       "2024-05-01", "2024-05-05")
+        overlapping = Reservation.create_reservation(
+            "Dave", "Overlap Hotel", 201, "2024-05-04", "2024-05-06")
+        self.assertIsNone(overlapping)
+        self.assertFalse(Reservation.is_room_free(
+            "Overlap Hotel", 201, "2024-05-02", "2024-05-03"))
+        self.assertIsNotNone(Reservation.create_reservation(
+            "Dave", "Overlap Hotel", 201, "2024-05-05", "2024-05-06"))
+
     def test_cancel_reservation(self):
         """
         Prueba la función cancel_reservation de la clase Reservation.
@@ -0,0 +1,123 @@
+import contextlib
+import io
+import os
+import unittest
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.reshard import main, reshard
+from src.storage.sharding import shard_of
+from test.helpers import enter_temp_dir
+
+HOTELS = ["Hotel A", "Hotel B", "Hotel C", "Hotel D", "Hotel E"]
+
+
+class ShardingTest(unittest.TestCase):
+    """
+    Clase de prueba para las reservas particionadas por hotel.
+    """
+
+    def setUp(self):
+        """
+        Crea hoteles y reservas en un directorio temporal.
+        """
+        enter_temp_dir(self)
+        for number, hotel in enumerate(HOTELS):
+            Hotel.create_hotel(hotel, "Ciudad", 5)
+            Reservation.create_reservation("Ana", hotel, 1,
+                                           f"2024-01-0{number + 1}")
+
+    def tearDown(self):
+        """
+        Restaura la configuración.
+        """
+        datasets.configure(backend="json", integrity="off")
+
+    def test_shard_of(self):
+        """
+        Prueba que la partición de un hotel es estable y está en rango.
+        """
+        self.assertEqual(shard_of("Hotel A", 1), 0)
+        self.assertEqual(shard_of("Hotel A", 4), 3323100977 % 4)
+        self.assertTrue(all(0 <= shard_of(hotel, 3) < 3 for hotel in HOTELS))
+
+    def test_reshard_and_route(self):
+        """
+        Prueba el reparticionado y que las operaciones van a la partición
+        del hotel.
+        """
+        expected = Reservation.load_reservations_data()
+        self.assertEqual(reshard(4), 5)
+        self.assertEqual(datasets.reservation_shards(), 4)
+        self.assertFalse(os.path.exists("reservations.json"))
+        self.assertCountEqual(Reservation.load_reservations_data(), expected)
+        with self.assertRaises(ValueError):
+            datasets.reservations_repository()
+
+        Reservation.create_reservation("Beto", "Hotel C", 2, "2024-01-03")
+        store = datasets.reservation_shard_store(shard_of("Hotel C", 4), 4)
+        self.assertIn("Beto", [record["customer_name"]
+                               for record in store.iter_records()])
+        self.assertFalse(Reservation.is_room_free("Hotel C", 2, "2024-01-03"))
+        self.assertEqual(len(Hotel("Hotel C", "Ciudad", 5).reservations), 2)
+        self.assertEqual(
+            [record["hotel_name"] for record
+             in Reservation.check_ins_between("2024-01-02", "2024-01-04")],
+            ["Hotel B", "Hotel C", "Hotel C", "Hotel D"])
+        result = Reservation.create_reservations([
+            {"customer_name": "Caro", "hotel_name": hotel, "room_number": 3,
+             "check_in_date": "2024-02-01"} for hotel in HOTELS] + [{}])
+        self.assertEqual(len(result.created), 5)
+        self.assertEqual([error[0] for error in result.errors], [5])
+        Reservation.cancel_reservation("Beto", "Hotel C", 2, "2024-01-03")
+        self.assertEqual(len(Reservation.load_reservations_data()), 10)
+
+        self.assertEqual(reshard(1), 10)
+        self.assertEqual(datasets.reservation_shards(), 1)
+        self.assertEqual(len(Reservation.load_reservations_data()), 10)
+        self.assertFalse([name for name in os.listdir(".")
+                          if "-of-" in name
+                          and name.endswith((".json", ".journal"))])
+
+    def test_command_line(self):
+        """
+        Prueba que la herramienta de línea de comandos informa el
+        resultado por la salida estándar, como las demás herramientas.
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["2"]), 0)
+        self.assertEqual(output.getvalue(),
+                         "5 reservas repartidas en 2 particiones.\n")
+        self.assertEqual(datasets.reservation_shards(), 2)
+
+    def test_integrity_across_shards(self):
+        """
+        Prueba que borrar un cliente revisa las reservas de todas las
+        particiones.
+        """
+        reshard(3)
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        datasets.configure(integrity="restrict")
+        Customer.delete_customer("Ana")
+        self.assertIsNotNone(Customer.find_by_email("ana@example.com"))
+        datasets.configure(integrity="cascade")
+        Customer.delete_customer("Ana")
+        self.assertEqual(Reservation.load_reservations_data(), [])
+
+    def test_sqlite_shards(self):
+        """
+        Prueba el reparticionado con el respaldo SQLite.
+        """
+        datasets.configure(backend="sqlite")
+        for hotel in HOTELS:
+            Reservation.create_reservation("Ana", hotel, 1, "2024-03-01")
+        self.assertEqual(reshard(2), 5)
+        self.assertTrue(os.path.exists("reservations.1-of-2.db"))
+        Reservation.create_reservation("Beto", "Hotel A", 2, "2024-03-01")
+        self.assertEqual(len(Reservation.load_reservations_data()), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from src.customer.customer import Customer
+from src.hotel.hotel import Hotel
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.snapshot import BinarySnapshot, write_snapshot
+from test.helpers import enter_temp_dir
+
+
+class SnapshotTest(unittest.TestCase):
+    """
+    Clase de prueba para las instantáneas binarias.
+    """
+
+    def setUp(self):
+        """
+        Crea un directorio temporal y se cambia a él.
+        """
+        enter_temp_dir(self)
+
+    def test_round_trip(self):
+        """
+        Prueba que los registros se leen igual que se escribieron.
+        """
+        records = [
+            {"name": "Ana", "rooms": 5, "price": 9.5, "active": True},
+            {"name": "Ñandú ✓", "rooms": None, "tags": ["a", 1]},
+            {"email": "b@example.com", "rooms": 2 ** 70, "active": False},
+            {"name": "Ana", "rooms": -3},
+        ]
+        self.assertEqual(write_snapshot(records, "data.snap", ("name",)), 4)
+        snapshot = BinarySnapshot("data.snap")
+        self.assertEqual(len(snapshot), 4)
+        self.assertEqual(list(snapshot), records)
+        self.assertEqual(snapshot[-1], records[-1])
+        self.assertEqual(snapshot[1:3], records[1:3])
+        self.assertEqual(snapshot.find("name", "Ana"),
+                         [records[0], records[3]])
+        self.assertEqual(snapshot.find("name", "Beto"), [])
+        with self.assertRaises(KeyError):
+            snapshot.find("email", "b@example.com")
+        with self.assertRaises(IndexError):
+            snapshot[4]  # pylint: disable=pointless-statement
+        snapshot.close()
+
+    def test_rebuilds_when_stale(self):
+        """
+        Prueba que la instantánea se regenera cuando cambian los datos.
+        """
+        Customer.create_customer("Ana", "ana@example.com", "1")
+        Customer.create_customer("Beto", "beto@example.com", "2")
+        snapshot = Customer.load_customers_snapshot()
+        self.assertEqual(list(snapshot), Customer.load_customers_data())
+        self.assertIs(Customer.load_customers_snapshot(), snapshot)
+        Customer.delete_customer("Ana")
+        old = snapshot
+        snapshot = Customer.load_customers_snapshot()
+        self.assertIsNot(snapshot, old)
+        self.assertTrue(old.closed)
+        self.assertFalse(snapshot.closed)
+        self.assertEqual(list(snapshot), Customer.load_customers_data())
+        self.assertEqual(snapshot.find("email", "ana@example.com"), [])
+
+    def test_datasets(self):
+        """
+        Prueba las instantáneas de hoteles y reservas.
+        """
+        Hotel.create_hotel("Hotel A", "Ciudad", 5)
+        Reservation.create_reservation("Ana", "Hotel A", 1, "2024-01-01")
+        Reservation.create_reservation("Beto", "Hotel A", 2, "2024-01-01")
+        self.assertEqual(Hotel.load_hotels_snapshot().find("name", "Hotel A"),
+                         [{"name": "Hotel A", "location": "Ciudad",
+                           "rooms": 5}])
+        reservations = Reservation.load_reservations_snapshot()
+        self.assertEqual(list(reservations),
+                         Reservation.load_reservations_data())
+        self.assertEqual(len(reservations.find("hotel_name", "Hotel A")), 2)
+
+    def test_requires_json_backend(self):
+        """
+        Prueba que las instantáneas no están disponibles con SQLite.
+        """
+        datasets.configure(backend="sqlite")
+        try:
+            with self.assertRaises(ValueError):
+                Hotel.load_hotels_snapshot()
+        finally:
+            datasets.configure(backend="json")
+
+
+if __name__ == "__main__":
+    unittest.main()
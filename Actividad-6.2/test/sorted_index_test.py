@@ -0,0 +1,35 @@
+import unittest
+from src.storage.sorted_index import SortedIndex
+
+
+def _name(record):
+    """
+    Obtiene el nombre de un registro de prueba.
+    """
+    return record["name"]
+
+
+class SortedIndexTest(unittest.TestCase):
+    """
+    Clase de prueba para el índice ordenado.
+    """
+
+    def test_search_after_changes(self):
+        """
+        Prueba la búsqueda después de altas y bajas, con nombres repetidos.
+        """
+        index = SortedIndex(_name)
+        for name in ("Ana", "ana", "Anabel", "Bruno", "Ana"):
+            index.add({"name": name})
+        index.add({"name": None})
+        self.assertEqual(index.search("an"), ["Ana", "ana", "Anabel"])
+        index.remove({"name": "Ana"})
+        self.assertEqual(index.search("ana"), ["Ana", "ana", "Anabel"])
+        index.remove({"name": "Ana"})
+        self.assertEqual(index.search("ana", limit=1), ["ana"])
+        self.assertEqual(index.search("z"), [])
+        self.assertEqual(index.search(""), ["ana", "Anabel", "Bruno"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from src.customer.customer import Customer
+from src.reservation.reservation import Reservation
+from src.storage import datasets
+from src.storage.sqlite_store import SqliteStore, close_connections
+from test.helpers import enter_temp_dir
+
+
+class SqliteStoreTest(unittest.TestCase):
+    """
+    Clase de prueba para la clase SqliteStore.
+    """
+
+    def setUp(self):
+        """
+        Prepara una base de datos temporal.
+        """
+        enter_temp_dir(self)
+        self.store = SqliteStore("test.db", "items", ("name", "value"),
+                                 [("name",)])
+
+    def tearDown(self):
+        """
+        Restaura la configuración y cierra las conexiones.
+        """
+        datasets.configure(backend="json")
+        close_connections()
+
+    def test_round_trip(self):
+        """
+        Prueba que los valores conservan su tipo.
+        """
+        self.store.extend([{"name": "A", "value": 1},
+                           {"name": "B", "value": "1"},
+                           {"name": "C", "value": None}])
+        self.assertEqual(self.store.load(), [{"name": "A", "value": 1},
+                                             {"name": "B", "value": "1"},
+                                             {"name": "C", "value": None}])
+
+    def test_remove_and_replace_first_match(self):
+        """
+        Prueba que las bajas y modificaciones afectan al primer registro.
+        """
+        self.store.rewrite([{"name": "A", "value": 1},
+                            {"name": "A", "value": 1}])
+        self.store.replace({"name": "A", "value": 1},
+                           {"name": "A", "value": 2})
+        self.store.remove({"name": "A", "value": 1})
+        self.assertEqual(self.store.load(), [{"name": "A", "value": 2}])
+
+    def test_signature_changes(self):
+        """
+        Prueba que la firma cambia con cada escritura.
+        """
+        before = self.store.signature()
+        self.store.append({"name": "A", "value": 1})
+        self.assertNotEqual(self.store.signature(), before)
+
+    def test_configured_backend(self):
+        """
+        Prueba que las clases usan SQLite solo con configurarlo.
+        """
+        datasets.configure(backend="sqlite", sqlite_path="hotel.db")
+        Customer.create_customer("Bob", "bob@example.com", "1")
+        Customer.modify_customer_info("Bob", email="new@example.com")
+        Reservation.create_reservation("Bob", "H", 1, "2024-01-01",
+                                       "2024-01-02")
+        Reservation.cancel_reservation("Bob", "H", 1, "2024-01-01")
+        self.assertEqual(Customer.load_customers_data()[0]["email"],
+                         "new@example.com")
+        self.assertEqual(Reservation.load_reservations_data(), [])
+        self.assertFalse(os.path.exists("customers.json"))
+        self.assertTrue(os.path.exists("hotel.db"))
+
+
+if __name__ == '__main__':
+    unittest.main()
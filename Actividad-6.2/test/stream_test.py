@@ -0,0 +1,57 @@
+import os
+import json
+import unittest
+from src.storage.stream import iter_json_array
+from test.helpers import enter_temp_dir
+
+
+class StreamTest(unittest.TestCase):
+    """
+    Clase de prueba para la función iter_json_array.
+    """
+
+    def setUp(self):
+        """
+        Prepara un directorio temporal para cada prueba.
+        """
+        self.directory = enter_temp_dir(self)
+        self.path = os.path.join(self.directory, "data.json")
+
+    def _write(self, text):
+        """
+        Escribe el contenido del archivo de prueba.
+        """
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_matches_json_load(self):
+        """
+        Prueba que el resultado coincide con json.load con bloques pequeños.
+        """
+        data = [{"name": f"Cliente {index}", "text": "á, ]\"x"}
+                for index in range(50)]
+        self._write(json.dumps(data, indent=2))
+        self.assertEqual(list(iter_json_array(self.path, chunk_size=7)),
+                         data)
+
+    def test_empty_list(self):
+        """
+        Prueba una lista vacía con espacios.
+        """
+        self._write(" [ ] ")
+        self.assertEqual(list(iter_json_array(self.path)), [])
+
+    def test_is_lazy(self):
+        """
+        Prueba que los elementos se entregan antes de leer un error final.
+        """
+        self._write('[{"a": 1}, {"a": 2}, oops')
+        records = iter_json_array(self.path, chunk_size=4)
+        self.assertEqual(next(records), {"a": 1})
+        self.assertEqual(next(records), {"a": 2})
+        with self.assertRaises(ValueError):
+            next(records)
+
+
+if __name__ == '__main__':
+    unittest.main()